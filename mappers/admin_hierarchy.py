@@ -0,0 +1,147 @@
+import csv
+import numpy as np
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+HIERARCHY_NPZ_PATH = "psgc_hierarchy.npz"
+HIERARCHY_CSV_PATH = "psgc_hierarchy.csv"
+
+LEVELS = ["Region", "Province", "Municipality", "Barangay"]
+LEVEL_CODE = {level: i for i, level in enumerate(LEVELS)}
+NO_PARENT = -1
+
+
+# -----------------------------------------------------------------------
+# Build: PSGC nodes → integer ids, parent pointers, Euler-tour intervals
+# -----------------------------------------------------------------------
+def build_hierarchy(nodes: dict) -> dict:
+    """
+    `nodes` maps PSGC code → (parent PSGC code or None, level, name).
+
+    Every code gets a compact integer id (its position in a depth-first walk), a parent id,
+    and an Euler-tour interval [tin, tout] so that
+        X is inside Y  ⇔  tin[Y] <= tin[X] and tout[X] <= tout[Y]
+    Parents that are not themselves nodes are kept as roots and reported.
+    """
+    children = {}
+    roots = []
+    orphans = []
+    for code, (parent, level, _) in nodes.items():
+        if parent is None or parent == code:
+            roots.append(code)
+        elif parent not in nodes:
+            orphans.append(code)
+            roots.append(code)
+        else:
+            children.setdefault(parent, []).append(code)
+
+    for code in orphans:
+        print(f"⚠️  {nodes[code][2]} ({code}): parent {nodes[code][0]} not found, kept as a root")
+
+    n = len(nodes)
+    psgc = np.zeros(n, dtype=np.int64)
+    parent = np.full(n, NO_PARENT, dtype=np.int32)
+    level = np.zeros(n, dtype=np.int8)
+    depth = np.zeros(n, dtype=np.int8)
+    tin = np.zeros(n, dtype=np.int32)
+    tout = np.zeros(n, dtype=np.int32)
+    names = []
+
+    # iterative DFS, ids assigned in visiting order so tin[id] == id
+    next_id = 0
+    stack = [(code, NO_PARENT, 0, False) for code in sorted(roots, reverse=True)]
+    id_of = {}
+    while stack:
+        code, parent_id, d, done = stack.pop()
+        if done:
+            tout[id_of[code]] = next_id - 1
+            continue
+
+        node_id = next_id
+        next_id += 1
+        id_of[code] = node_id
+        psgc[node_id] = code
+        parent[node_id] = parent_id
+        level[node_id] = LEVEL_CODE[nodes[code][1]]
+        depth[node_id] = d
+        tin[node_id] = node_id
+        names.append(nodes[code][2])
+
+        stack.append((code, parent_id, d, True))
+        for child in sorted(children.get(code, ()), reverse=True):
+            stack.append((child, node_id, d + 1, False))
+
+    # ancestor at each level, so roll-ups are a single array lookup
+    rollup = np.full((len(LEVELS), n), NO_PARENT, dtype=np.int32)
+    for node_id in range(n):
+        p = parent[node_id]
+        if p != NO_PARENT:
+            rollup[:, node_id] = rollup[:, p]
+        rollup[level[node_id], node_id] = node_id
+
+    order = np.argsort(psgc)
+    return {
+        "psgc": psgc,
+        "parent": parent,
+        "level": level,
+        "depth": depth,
+        "tin": tin,
+        "tout": tout,
+        "rollup_ids": rollup,
+        "sorted_psgc": psgc[order],
+        "sorted_ids": order.astype(np.int32),
+        "names": np.array(names, dtype=str),
+    }
+
+def save_hierarchy(table: dict, npz_path: str = HIERARCHY_NPZ_PATH, csv_path: str = HIERARCHY_CSV_PATH):
+    np.savez(npz_path, **table)
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "psgc", "name", "level", "parent", "tin", "tout"])
+        for i in range(len(table["psgc"])):
+            writer.writerow([
+                i, table["psgc"][i], table["names"][i], LEVELS[table["level"][i]],
+                table["parent"][i], table["tin"][i], table["tout"][i],
+            ])
+
+    print(f"✔ Saved hierarchy: {npz_path}, {csv_path} ({len(table['psgc'])} locations)")
+
+
+# -----------------------------------------------------------------------
+# Consumer side
+# -----------------------------------------------------------------------
+class AdminHierarchy:
+    """Array-backed PSGC hierarchy loaded from psgc_hierarchy.npz; all lookups are vectorized."""
+
+    def __init__(self, path: str = HIERARCHY_NPZ_PATH):
+        data = np.load(path)
+        for key in data.files:
+            setattr(self, key, data[key])
+
+    def ids(self, codes) -> np.ndarray:
+        """PSGC codes → integer ids (-1 for unknown codes)."""
+        codes = np.asarray(codes, dtype=np.int64)
+        pos = np.searchsorted(self.sorted_psgc, codes).clip(0, len(self.sorted_psgc) - 1)
+        return np.where(self.sorted_psgc[pos] == codes, self.sorted_ids[pos], NO_PARENT)
+
+    def is_within(self, inner, outer) -> np.ndarray:
+        """Element-wise "inner is inside (or equal to) outer" over id arrays; False for unknown (-1) ids."""
+        inner, outer = np.asarray(inner), np.asarray(outer)
+        known = (inner != NO_PARENT) & (outer != NO_PARENT)
+        inner, outer = np.where(known, inner, 0), np.where(known, outer, 0)    # -1 would index the last row
+        return known & (self.tin[outer] <= self.tin[inner]) & (self.tout[inner] <= self.tout[outer])
+
+    def rollup(self, ids, level: str = "Region") -> np.ndarray:
+        """Ancestor id at `level` for each id (-1 where the location sits above that level or is unknown)."""
+        ids = np.asarray(ids)
+        known = ids != NO_PARENT
+        return np.where(known, self.rollup_ids[LEVEL_CODE[level], np.where(known, ids, 0)], NO_PARENT)
+
+    def descendants(self, node_id: int) -> np.ndarray:
+        """Ids of every location inside `node_id` (a contiguous id range in Euler-tour order)."""
+        if node_id == NO_PARENT:
+            return np.empty(0, dtype=np.int64)
+        return np.arange(self.tin[node_id] + 1, self.tout[node_id] + 1)
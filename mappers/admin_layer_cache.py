@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+
+import pandas as pd
+import geopandas as gpd
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+CACHE_DIR = "../shapefiles/.cache"
+SHAPEFILE_PARTS = (".shp", ".shx", ".dbf", ".prj", ".cpg")
+HASH_INDEX_NAME = "hashes.json"     # file stat signature → content hash, so unchanged files are not re-read
+
+# attribute columns the mappers use from each PH_Adm* layer
+LAYER_ATTRIBUTES = {
+    "PH_Adm1_Regions": ["adm1_en", "adm1_psgc"],
+    "PH_Adm2_ProvDists": ["adm1_psgc", "adm2_en", "adm2_psgc", "geo_level"],
+    "PH_Adm3_MuniCities": ["adm1_psgc", "adm2_psgc", "adm3_en", "adm3_psgc", "geo_level"],
+}
+
+
+# -----------------------------------------------------------------------
+# Helper function → content hash of a shapefile and its sidecar files
+# -----------------------------------------------------------------------
+def shapefile_parts(shp_path: str) -> list:
+    base = os.path.splitext(shp_path)[0]
+    return [base + ext for ext in SHAPEFILE_PARTS if os.path.exists(base + ext)]
+
+def shapefile_hash(shp_path: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    SHA-1 over the shapefile parts. The hash is remembered per (path, size, mtime) so a
+    warm start only stats the files instead of reading hundreds of MB.
+    """
+    parts = shapefile_parts(shp_path)
+    signature = "|".join(f"{os.path.abspath(p)}:{os.path.getsize(p)}:{os.stat(p).st_mtime_ns}" for p in parts)
+
+    index_path = os.path.join(cache_dir, HASH_INDEX_NAME)
+    known = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            known = json.load(f)
+    if signature in known:
+        return known[signature]
+
+    digest = hashlib.sha1()
+    for part in parts:
+        with open(part, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    known[signature] = digest.hexdigest()
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, "w") as f:
+        json.dump(known, f, indent=4)
+    return known[signature]
+
+
+# -----------------------------------------------------------------------
+# Cached admin layer: attributes now, geometry on demand
+# -----------------------------------------------------------------------
+class AdminLayer:
+    """
+    One PH_Adm* layer backed by two Parquet files in CACHE_DIR:
+        <layer>.<hash>.attributes.parquet   → the attribute columns the mappers use
+        <layer>.<hash>.geometry.parquet     → GeoParquet, read only when `geometry` is touched
+    """
+
+    def __init__(self, shp_path: str, columns=None, cache_dir: str = CACHE_DIR):
+        self.shp_path = shp_path
+        self.name = os.path.splitext(os.path.basename(shp_path))[0]
+        self.columns = columns or LAYER_ATTRIBUTES.get(self.name)
+        self.key = shapefile_hash(shp_path, cache_dir)
+
+        stem = os.path.join(cache_dir, f"{self.name}.{self.key[:16]}")
+        self.attributes_path = f"{stem}.attributes.parquet"
+        self.geometry_path = f"{stem}.geometry.parquet"
+
+        if not (os.path.exists(self.attributes_path) and os.path.exists(self.geometry_path)):
+            self._convert()
+
+        # missing names stay None, as gpd.read_file returned them (the mappers test `is None`)
+        attributes = pd.read_parquet(self.attributes_path)
+        self.attributes = attributes.astype(object).where(attributes.notna(), None)
+        self._geometry = None
+
+    def _convert(self):
+        print(f"🔎 Converting {self.shp_path} → GeoParquet cache")
+        gdf = gpd.read_file(self.shp_path, columns=self.columns)
+
+        columns = self.columns or [c for c in gdf.columns if c != "geometry"]
+        pd.DataFrame(gdf[columns]).to_parquet(self.attributes_path, index=False)
+        gdf[["geometry"]].to_parquet(self.geometry_path, index=False)
+
+        print(f"   ✔ Saved: {self.attributes_path}")
+        print(f"   ✔ Saved: {self.geometry_path}")
+
+    @property
+    def geometry(self) -> gpd.GeoSeries:
+        if self._geometry is None:
+            self._geometry = gpd.read_parquet(self.geometry_path).geometry
+        return self._geometry
+
+    def with_geometry(self) -> gpd.GeoDataFrame:
+        """Attributes and geometry as one GeoDataFrame (loads the geometry file)."""
+        return gpd.GeoDataFrame(self.attributes, geometry=self.geometry.values, crs=self.geometry.crs)
+
+def load_admin_layer(shp_path: str, columns=None, cache_dir: str = CACHE_DIR) -> AdminLayer:
+    return AdminLayer(shp_path, columns, cache_dir)
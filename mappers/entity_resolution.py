@@ -0,0 +1,229 @@
+import os
+import re
+import sys
+import csv
+from difflib import SequenceMatcher
+
+from rdflib import Graph, URIRef, Namespace
+from rdflib.namespace import OWL
+
+from event_store import EventStore, STORE_PATH, NO_DATE
+from psgc_gazetteer import region_of
+
+PARSERS_DIR = "../parsers"
+sys.path.insert(0, PARSERS_DIR)
+from NDRRMC_cleaned_table_names_output_directory_parallel import normalize_subject
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+SAMEAS_TTL_PATH = "sameas_links.ttl"
+SAMEAS_CSV_PATH = "sameas_links.csv"
+DATE_SLACK_DAYS = 3         # sources disagree by a few days on when an event started/ended
+MATCH_THRESHOLD = 0.75      # minimum combined score for a sameAs link
+NAME_WEIGHT = 0.7
+TIME_WEIGHT = 0.2
+PLACE_WEIGHT = 0.1
+
+SKG = Namespace("https://sakuna.ph/")
+
+# Hazard prefixes that carry no identity once both names are abbreviated ("TY Ibiang" vs "Typhoon Ibiang")
+HAZARD_PREFIXES = r"\b(TY|TS|TD|TC|STS|STY|Super|Severe|Tropical|Depression|Storm|Effects of|Combined Effects of)\b"
+
+# Tokens that say nothing about which event it was: "Smallpox in Manila" and "Bubonic Plague
+# in Manila" share only these (the events' own location names are left out as well)
+STOPWORDS = {"in", "of", "the", "and", "at", "on", "for", "to", "a", "an", "with", "from", "by", "over", "near"}
+PLACE_WORDS = {
+    "city", "province", "provinces", "region", "regions", "municipality", "barangay", "island", "islands",
+    "metro", "north", "south", "east", "west", "northern", "southern", "eastern", "western", "central",
+}
+
+
+# -----------------------------------------------------------------------
+# Helper function → comparable core of an event name
+# -----------------------------------------------------------------------
+def name_key(name: str) -> str:
+    """'Typhoon “Ibiang” (Ketsana)' → 'ibiang ketsana'."""
+    text = normalize_subject(str(name or ""))
+    text = re.sub(HAZARD_PREFIXES, " ", text, flags=re.IGNORECASE)
+    text = re.sub(r"[^\w\s]", " ", text.casefold())
+    return re.sub(r"\s+", " ", text).strip()
+
+def distinctive_tokens(key: str, place_tokens=frozenset()) -> list:
+    return [t for t in key.split() if t not in STOPWORDS and t not in PLACE_WORDS and t not in place_tokens]
+
+def name_similarity(a: str, b: str, place_tokens=frozenset()) -> float:
+    """
+    Similarity of two name keys on their distinctive tokens (stopwords, generic place words and
+    `place_tokens` left out); names without a distinctive token in common score 0.
+    """
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    tokens_a, tokens_b = set(distinctive_tokens(a, place_tokens)), set(distinctive_tokens(b, place_tokens))
+    # a shared token, singular or plural ("flooding" / "floodings")
+    shared = {t.rstrip("s") for t in tokens_a} & {t.rstrip("s") for t in tokens_b}
+    if not shared:
+        return 0.0
+    ratio = SequenceMatcher(None, " ".join(sorted(tokens_a)), " ".join(sorted(tokens_b))).ratio()
+    # one name contained in the other ("odette" vs "odette rai")
+    containment = len(shared) / min(len(tokens_a), len(tokens_b))
+    return max(ratio, containment)
+
+def time_overlap(a: tuple, b: tuple) -> float:
+    """Overlap of two [start, end] day ranges relative to the shorter one."""
+    lo, hi = max(a[0], b[0]), min(a[1], b[1])
+    shortest = min(a[1] - a[0], b[1] - b[0]) + 1
+    return max(0.0, min(1.0, (hi - lo + 1 + DATE_SLACK_DAYS) / (shortest + DATE_SLACK_DAYS)))
+
+
+# -----------------------------------------------------------------------
+# Interval tree on [startDate, endDate]
+# -----------------------------------------------------------------------
+class IntervalTree:
+    """Static centered interval tree over (start, end, id) day ranges."""
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals):
+        # a few sources record endDate before startDate; treat the range as unordered
+        intervals = [(min(s, e), max(s, e), i) for s, e, i in intervals]
+        points = sorted(p for s, e, _ in intervals for p in (s, e))
+        self.center = points[len(points) // 2] if points else 0
+
+        here = [iv for iv in intervals if iv[0] <= self.center <= iv[1]]
+        left = [iv for iv in intervals if iv[1] < self.center]
+        right = [iv for iv in intervals if iv[0] > self.center]
+
+        self.by_start = sorted(here, key=lambda iv: iv[0])
+        self.by_end = sorted(here, key=lambda iv: iv[1], reverse=True)
+        self.left = IntervalTree(left) if left else None
+        self.right = IntervalTree(right) if right else None
+
+    def overlapping(self, lo: int, hi: int) -> list:
+        """Ids of every interval that overlaps [lo, hi]."""
+        found = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if hi < node.center:
+                for s, _, i in node.by_start:
+                    if s > hi:
+                        break
+                    found.append(i)
+                if node.left:
+                    stack.append(node.left)
+            elif lo > node.center:
+                for _, e, i in node.by_end:
+                    if e < lo:
+                        break
+                    found.append(i)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                found.extend(i for _, _, i in node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+
+# -----------------------------------------------------------------------
+# Entity resolution over an EventStore
+# -----------------------------------------------------------------------
+def event_regions(store: EventStore, event_id: int) -> set:
+    """PSGC region codes an event touches (the hierarchy block used to prune candidates)."""
+    l0, l1 = store.location_offsets[event_id], store.location_offsets[event_id + 1]
+    return {region_of(psgc) for code in store.location_codes[l0:l1] for psgc in store.location_psgc[code]}
+
+def candidate_pairs(store: EventStore, same_source: bool = False):
+    """
+    Pairs (i, j) whose date ranges overlap within DATE_SLACK_DAYS and that share a region
+    (events without a resolved location are compared on dates alone).
+    """
+    # a few sources record endDate before startDate; the tree stores (min, max), so query with it too
+    dated = [
+        (min(store.start[i], store.end[i]), max(store.start[i], store.end[i]), i)
+        for i in range(len(store)) if store.start[i] != NO_DATE
+    ]
+    if not dated:
+        return
+    tree = IntervalTree(dated)
+    regions = [event_regions(store, i) for i in range(len(store))]
+
+    for start, end, i in dated:
+        for j in tree.overlapping(start - DATE_SLACK_DAYS, end + DATE_SLACK_DAYS):
+            if j <= i:
+                continue
+            if not same_source and store.source[i] == store.source[j]:
+                continue
+            if regions[i] and regions[j] and not regions[i] & regions[j]:
+                continue
+            yield i, j
+
+def event_place_tokens(store: EventStore, event_id: int) -> set:
+    """Tokens of the event's own location names ("Manila" in "Smallpox in Manila" names no event)."""
+    l0, l1 = store.location_offsets[event_id], store.location_offsets[event_id + 1]
+    return {token for code in store.location_codes[l0:l1] for token in name_key(store.locations.decode(code)).split()}
+
+def score_pair(store: EventStore, keys: list, regions: list, i: int, j: int) -> float:
+    name = name_similarity(keys[i], keys[j], event_place_tokens(store, i) | event_place_tokens(store, j))
+    when = time_overlap((store.start[i], store.end[i]), (store.start[j], store.end[j]))
+    if regions[i] and regions[j]:
+        where = len(regions[i] & regions[j]) / len(regions[i] | regions[j])
+    else:
+        where = 0.5
+    return NAME_WEIGHT * name + TIME_WEIGHT * when + PLACE_WEIGHT * where
+
+def resolve_events(store: EventStore, threshold: float = MATCH_THRESHOLD, same_source: bool = False) -> list:
+    """Scored sameAs links [(i, j, score)] between events that describe the same disaster."""
+    keys = [name_key(n) for n in store.names]
+    regions = [event_regions(store, i) for i in range(len(store))]
+
+    links = []
+    for i, j in candidate_pairs(store, same_source):
+        score = score_pair(store, keys, regions, i, j)
+        if score >= threshold:
+            links.append((i, j, score))
+    return links
+
+
+# -----------------------------------------------------------------------
+# Output
+# -----------------------------------------------------------------------
+def event_uri(store: EventStore, event_id: int) -> URIRef:
+    source = store.sources.decode(store.source[event_id])
+    record = store.record(event_id)
+    name = re.sub(r"[^\w-]+", "_", str(record.name)).strip("_")
+    return URIRef(SKG[f"{source}_{name}_{record.startDate}"])
+
+def write_links(store: EventStore, links: list, ttl_path: str = SAMEAS_TTL_PATH, csv_path: str = SAMEAS_CSV_PATH):
+    g = Graph()
+    g.bind("", SKG)
+    g.bind("owl", OWL)
+
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["left", "right", "leftName", "rightName", "score"])
+        for i, j, score in links:
+            left, right = event_uri(store, i), event_uri(store, j)
+            g.add((left, OWL.sameAs, right))
+            writer.writerow([left, right, store.names[i], store.names[j], f"{score:.3f}"])
+
+    g.serialize(destination=ttl_path)
+    print(f"✔ Saved {len(links)} sameAs links: {ttl_path}, {csv_path}")
+
+
+# -----------------------------------------------------------------------
+# Run → link events across sources in the saved event store
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    if not os.path.exists(STORE_PATH):
+        raise SystemExit(f"❌ {STORE_PATH} not found — run event_store.py first")
+
+    store = EventStore.load(STORE_PATH)
+    links = resolve_events(store)
+    write_links(store, links)
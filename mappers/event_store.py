@@ -0,0 +1,439 @@
+import os
+import re
+import json
+import glob
+from array import array
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from impact_coercion import coerce_gda_frame
+from psgc_gazetteer import (
+    load_gazetteer, psgc_level, region_of, province_of,
+    MUNICIPALITY_DIVISOR, LEVEL_RANK,
+)
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+GDA_PATH = "gda.csv"
+NDRRMC_OUTPUT_FOLDER = "../parsers/NDRRMC_PARSED_VER1"
+STORE_PATH = "event_store.npz"
+
+# Impact measures held as columnar arrays (NaN = not reported)
+IMPACT_MEASURES = [
+    "dead", "injured", "missing",
+    "affectedFamilies", "affectedPersons",
+    "displacedFamilies", "displacedPersons",
+    "totallyDamagedHouses", "partiallyDamagedHouses",
+    "infraDamageAmount", "agricultureDamageAmount", "commercialDamageAmount",
+]
+
+NO_DATE = np.iinfo(np.int32).min
+
+# NDRRMC event names carry the hazard only as an abbreviation (see abbrev_map in the NDRRMC parser)
+NDRRMC_HAZARDS = {
+    r"\b(TY|TS|TD|STS|TC|Super Typhoon)\b": "Tropical Cyclone",
+    r"\b(SWM|LPA|Shear Line|ITCZ|Monsoon|Amihan|Habagat)\b": "Severe Weather",
+    r"\bFlood": "Flood (General)",
+    r"\bEarthquake\b": "Earthquake (Ground Movement)",
+    r"\bVolcan|\bTaal\b|\bMayon\b": "Volcanic Activity (General)",
+    r"\bLandslide\b": "Landslide (Wet)",
+}
+
+
+# -----------------------------------------------------------------------
+# Helper function → day number (days since 1970-01-01)
+# -----------------------------------------------------------------------
+def to_day(value) -> int:
+    if pd.isna(value) or value == "":
+        return NO_DATE
+    if isinstance(value, (date, datetime)):
+        value = value.strftime("%Y-%m-%d")
+    try:
+        return int(np.datetime64(str(value)[:10], "D").astype(np.int64))
+    except ValueError:
+        return NO_DATE
+
+def from_day(day: int):
+    if day == NO_DATE:
+        return None
+    return str(np.datetime64(int(day), "D"))
+
+
+# -----------------------------------------------------------------------
+# Dictionary encoding
+# -----------------------------------------------------------------------
+class Vocabulary:
+    """Dictionary encoding of repeated strings (locations, hazard types, sources) into small ints."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+
+class EventRecord:
+    """Row view of one stored event, returned by EventStore queries."""
+
+    __slots__ = ("id", "source", "name", "startDate", "endDate", "hazards", "locations", "impacts")
+
+    def __init__(self, id, source, name, startDate, endDate, hazards, locations, impacts):
+        self.id = id
+        self.source = source
+        self.name = name
+        self.startDate = startDate
+        self.endDate = endDate
+        self.hazards = hazards
+        self.locations = locations
+        self.impacts = impacts
+
+    def __repr__(self):
+        return f"EventRecord({self.id}, {self.source!r}, {self.name!r}, {self.startDate}–{self.endDate})"
+
+
+# -----------------------------------------------------------------------
+# Event store
+# -----------------------------------------------------------------------
+class EventStore:
+    """
+    In-process columnar store of events from every source (NDRRMC, Geog Archive, DROMIC).
+
+    Events are appended into typed arrays; locations, hazard types and sources are
+    dictionary-encoded, and multi-valued fields (hazards, locations) are stored as
+    offset/code pairs. Indexes on date range, PSGC prefix and hazard type are rebuilt
+    lazily on the first query after an append.
+    """
+
+    def __init__(self, measures=IMPACT_MEASURES):
+        self.measures = list(measures)
+
+        self.sources = Vocabulary()
+        self.hazards = Vocabulary()
+        self.locations = Vocabulary()
+        self.location_psgc = []     # location code → tuple of PSGC codes
+
+        self.names = []
+        self.source = array("H")
+        self.start = array("i")
+        self.end = array("i")
+        self.hazard_offsets = array("I", [0])
+        self.hazard_codes = array("I")
+        self.location_offsets = array("I", [0])
+        self.location_codes = array("I")
+        self.impacts = {m: array("d") for m in self.measures}
+
+        self._dirty = True
+        self._by_start = None
+        self._hazard_index = {}
+        self._psgc_index = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    # ---------------- writing ----------------
+
+    def add_location(self, name: str, psgc_codes=()) -> int:
+        code = self.locations.encode(name)
+        if code == len(self.location_psgc):
+            self.location_psgc.append(tuple(psgc_codes))
+        return code
+
+    def add_event(self, source, name, startDate, endDate, hazards=(), locations=(), impacts=None, gazetteer=None) -> int:
+        """Append one event. `locations` are place names, resolved to PSGC codes through `gazetteer`."""
+        impacts = impacts or {}
+        start = to_day(startDate)
+        end = to_day(endDate)
+
+        self.names.append("" if pd.isna(name) else str(name))
+        self.source.append(self.sources.encode(source))
+        self.start.append(start)
+        self.end.append(end if end != NO_DATE else start)
+
+        for hazard in dict.fromkeys(h for h in hazards if not pd.isna(h) and h):
+            self.hazard_codes.append(self.hazards.encode(hazard))
+        self.hazard_offsets.append(len(self.hazard_codes))
+
+        for place in dict.fromkeys(l for l in locations if not pd.isna(l) and l):
+            codes = gazetteer.resolve(place) if gazetteer else ()
+            self.location_codes.append(self.add_location(place, codes))
+        self.location_offsets.append(len(self.location_codes))
+
+        for measure in self.measures:
+            value = impacts.get(measure)
+            self.impacts[measure].append(np.nan if value is None or pd.isna(value) else float(value))
+
+        self._dirty = True
+        return len(self.names) - 1
+
+    def remove_events(self, event_ids):
+        """Drop events (e.g. an NDRRMC event about to be loaded again); the ids after them shift down."""
+        drop = set(int(i) for i in event_ids)
+        if not drop:
+            return
+        keep = [i for i in range(len(self)) if i not in drop]
+
+        def regroup(offsets, codes):
+            new_offsets, new_codes = array("I", [0]), array("I")
+            for i in keep:
+                new_codes.extend(codes[offsets[i]:offsets[i + 1]])
+                new_offsets.append(len(new_codes))
+            return new_offsets, new_codes
+
+        self.names = [self.names[i] for i in keep]
+        self.source = array("H", (self.source[i] for i in keep))
+        self.start = array("i", (self.start[i] for i in keep))
+        self.end = array("i", (self.end[i] for i in keep))
+        self.hazard_offsets, self.hazard_codes = regroup(self.hazard_offsets, self.hazard_codes)
+        self.location_offsets, self.location_codes = regroup(self.location_offsets, self.location_codes)
+        for measure in self.measures:
+            values = self.impacts[measure]
+            self.impacts[measure] = array("d", (values[i] for i in keep))
+        self._dirty = True
+
+    # ---------------- indexes ----------------
+
+    def _build_indexes(self):
+        start = np.array(self.start, dtype=np.int32)
+        self._by_start = np.argsort(start, kind="stable")
+        self._sorted_start = start[self._by_start]
+        self._end = np.array(self.end, dtype=np.int32)
+
+        hazard_offsets = np.array(self.hazard_offsets, dtype=np.uint32)
+        hazard_codes = np.array(self.hazard_codes, dtype=np.uint32)
+        hazard_events = np.repeat(np.arange(len(self)), np.diff(hazard_offsets))
+        self._hazard_index = {
+            code: hazard_events[hazard_codes == code] for code in range(len(self.hazards))
+        }
+
+        psgc_index = {}
+        offsets = np.array(self.location_offsets, dtype=np.uint32)
+        for event_id in range(len(self)):
+            keys = set()
+            for code in self.location_codes[offsets[event_id]:offsets[event_id + 1]]:
+                for psgc in self.location_psgc[code]:
+                    keys.add(psgc)
+                    keys.add(region_of(psgc))
+                    if LEVEL_RANK[psgc_level(psgc)] >= LEVEL_RANK["Province"]:
+                        keys.add(province_of(psgc))
+                    if LEVEL_RANK[psgc_level(psgc)] >= LEVEL_RANK["Municipality"]:
+                        keys.add(psgc // MUNICIPALITY_DIVISOR * MUNICIPALITY_DIVISOR)
+            for key in keys:
+                psgc_index.setdefault(key, []).append(event_id)
+        self._psgc_index = {key: np.array(ids, dtype=np.int64) for key, ids in psgc_index.items()}
+
+        self._dirty = False
+
+    def impact_array(self, measure: str) -> np.ndarray:
+        return np.array(self.impacts[measure], dtype=np.float64)
+
+    # ---------------- reading ----------------
+
+    def query_ids(self, hazard=None, psgc=None, startDate=None, endDate=None, min_impact=None, source=None) -> np.ndarray:
+        """
+        Ids of events matching every given filter:
+            hazard      → substring of a hazard type/subtype ("flood" matches Flashflood, Flood (General))
+            psgc        → PSGC code of a region/province/municipality the event touches
+            startDate,
+            endDate     → events whose [startDate, endDate] overlaps the range
+            min_impact  → {measure: minimum value}, e.g. {"dead": 1}
+            source      → "NDRRMC", "GDA", "DROMIC"
+        """
+        if self._dirty:
+            self._build_indexes()
+
+        mask = np.ones(len(self), dtype=bool)
+
+        if startDate is not None or endDate is not None:
+            lo = to_day(startDate) if startDate is not None else np.iinfo(np.int32).min + 1
+            hi = to_day(endDate) if endDate is not None else np.iinfo(np.int32).max
+            candidates = self._by_start[:np.searchsorted(self._sorted_start, hi, side="right")]
+            candidates = candidates[self._end[candidates] >= lo]
+            in_range = np.zeros(len(self), dtype=bool)
+            in_range[candidates] = True
+            mask &= in_range
+
+        if hazard is not None:
+            needle = hazard.casefold()
+            matched = np.zeros(len(self), dtype=bool)
+            for code, value in enumerate(self.hazards.values):
+                if needle in value.casefold():
+                    matched[self._hazard_index[code]] = True
+            mask &= matched
+
+        if psgc is not None:
+            matched = np.zeros(len(self), dtype=bool)
+            matched[self._psgc_index.get(int(psgc), np.empty(0, dtype=np.int64))] = True
+            mask &= matched
+
+        for measure, minimum in (min_impact or {}).items():
+            values = self.impact_array(measure)
+            mask &= ~np.isnan(values) & (values >= minimum)
+
+        if source is not None:
+            code = self.sources.codes.get(source)
+            mask &= np.array(self.source, dtype=np.uint16) == code if code is not None else False
+
+        return np.flatnonzero(mask)
+
+    def record(self, event_id: int) -> EventRecord:
+        h0, h1 = self.hazard_offsets[event_id], self.hazard_offsets[event_id + 1]
+        l0, l1 = self.location_offsets[event_id], self.location_offsets[event_id + 1]
+        return EventRecord(
+            id=int(event_id),
+            source=self.sources.decode(self.source[event_id]),
+            name=self.names[event_id],
+            startDate=from_day(self.start[event_id]),
+            endDate=from_day(self.end[event_id]),
+            hazards=[self.hazards.decode(c) for c in self.hazard_codes[h0:h1]],
+            locations=[self.locations.decode(c) for c in self.location_codes[l0:l1]],
+            impacts={m: self.impacts[m][event_id] for m in self.measures if not np.isnan(self.impacts[m][event_id])},
+        )
+
+    def query(self, **filters) -> list:
+        return [self.record(i) for i in self.query_ids(**filters)]
+
+    # ---------------- persistence ----------------
+
+    def save(self, path: str = STORE_PATH):
+        """Write the store as one .npz so later sessions skip the CSV parsing entirely."""
+        np.savez_compressed(
+            path,
+            names=np.array(self.names, dtype=str),
+            source=np.array(self.source, dtype=np.uint16),
+            start=np.array(self.start, dtype=np.int32),
+            end=np.array(self.end, dtype=np.int32),
+            hazard_offsets=np.array(self.hazard_offsets, dtype=np.uint32),
+            hazard_codes=np.array(self.hazard_codes, dtype=np.uint32),
+            location_offsets=np.array(self.location_offsets, dtype=np.uint32),
+            location_codes=np.array(self.location_codes, dtype=np.uint32),
+            impacts=np.stack([self.impact_array(m) for m in self.measures]) if len(self) else np.empty((len(self.measures), 0)),
+            vocabularies=np.array(json.dumps({
+                "measures": self.measures,
+                "sources": self.sources.values,
+                "hazards": self.hazards.values,
+                "locations": self.locations.values,
+                "location_psgc": self.location_psgc,
+            })),
+        )
+
+    @classmethod
+    def load(cls, path: str = STORE_PATH) -> "EventStore":
+        data = np.load(path)
+        vocab = json.loads(str(data["vocabularies"]))
+
+        store = cls(measures=vocab["measures"])
+        store.sources = Vocabulary(vocab["sources"])
+        store.hazards = Vocabulary(vocab["hazards"])
+        store.locations = Vocabulary(vocab["locations"])
+        store.location_psgc = [tuple(codes) for codes in vocab["location_psgc"]]
+
+        store.names = data["names"].tolist()
+        store.source = array("H", data["source"].tobytes())
+        store.start = array("i", data["start"].tobytes())
+        store.end = array("i", data["end"].tobytes())
+        store.hazard_offsets = array("I", data["hazard_offsets"].tobytes())
+        store.hazard_codes = array("I", data["hazard_codes"].tobytes())
+        store.location_offsets = array("I", data["location_offsets"].tobytes())
+        store.location_codes = array("I", data["location_codes"].tobytes())
+        for measure, values in zip(store.measures, data["impacts"]):
+            store.impacts[measure] = array("d", values.tobytes())
+        return store
+
+
+# -----------------------------------------------------------------------
+# Loaders per source
+# -----------------------------------------------------------------------
+def split_multi(value) -> list:
+    if value is None or pd.isna(value):
+        return []
+    return [v.strip() for v in str(value).split("|") if v.strip()]
+
+def load_gda(store: EventStore, path: str = GDA_PATH, gazetteer=None):
+    """Append the Geog Archive events (gda.csv written by geog_archive_mapper.py)."""
+    df = coerce_gda_frame(pd.read_csv(path, dtype="string"))
+    measures = [m for m in store.measures if m in df.columns]
+
+    for row in df.itertuples(index=False):
+        row = row._asdict()
+        store.add_event(
+            source="GDA",
+            name=row["eventName"],
+            startDate=row["startDate"],
+            endDate=row["endDate"],
+            hazards=[row["hasType"]] + split_multi(row["hasSubtype"]),
+            locations=split_multi(row["hasLocation"]),
+            impacts={m: row[m] for m in measures},
+            gazetteer=gazetteer,
+        )
+
+def ndrrmc_hazards(event_name: str) -> list:
+    return [hazard for pattern, hazard in NDRRMC_HAZARDS.items() if re.search(pattern, event_name, flags=re.IGNORECASE)]
+
+def load_ndrrmc_event(store: EventStore, event_dir: str, gazetteer=None):
+    """
+    Append one NDRRMC event parsed into OUTPUT_FOLDER/<eventName>/ (metadata.json + table CSVs).
+    Locations are the distinct Region/Province/City_Muni cells across the event's tables.
+    """
+    with open(os.path.join(event_dir, "metadata.json")) as f:
+        metadata = json.load(f)
+
+    places = []
+    for csv_path in glob.glob(os.path.join(event_dir, "*.csv")):
+        table = pd.read_csv(csv_path, dtype="string", usecols=lambda c: c in ("Region", "Province", "City_Muni"))
+        for column in ("City_Muni", "Province", "Region"):
+            if column in table.columns:
+                places.extend(table[column].dropna().unique().tolist())
+
+    return store.add_event(
+        source="NDRRMC",
+        name=metadata["eventName"],
+        startDate=metadata.get("startDate"),
+        endDate=metadata.get("endDate"),
+        hazards=ndrrmc_hazards(metadata["eventName"]),
+        locations=places,
+        gazetteer=gazetteer,
+    )
+
+def load_ndrrmc(store: EventStore, output_folder: str = NDRRMC_OUTPUT_FOLDER, gazetteer=None):
+    """Append every NDRRMC event parsed into OUTPUT_FOLDER."""
+    for metadata_path in glob.glob(os.path.join(output_folder, "*", "metadata.json")):
+        load_ndrrmc_event(store, os.path.dirname(metadata_path), gazetteer)
+
+
+# -----------------------------------------------------------------------
+# Run → build the store from every source on disk
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    gazetteer = load_gazetteer()
+    store = EventStore()
+
+    load_gda(store, GDA_PATH, gazetteer)
+    if os.path.isdir(NDRRMC_OUTPUT_FOLDER):
+        load_ndrrmc(store, NDRRMC_OUTPUT_FOLDER, gazetteer)
+
+    store.save(STORE_PATH)
+    print(f"✔ Stored {len(store)} events → {STORE_PATH}")
+
+    # e.g. all flood events touching Region III between 2010 and 2020 with casualties
+    for record in store.query(hazard="flood", psgc=300000000, startDate="2010-01-01", endDate="2020-12-31", min_impact={"dead": 1}):
+        print(f"   {record}")
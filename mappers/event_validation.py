@@ -0,0 +1,305 @@
+import os
+import json
+import glob
+
+from rdflib import Graph, URIRef, Literal, Namespace
+from rdflib.collection import Collection
+from rdflib.namespace import RDF, RDFS, OWL, XSD
+
+from owl_inference import Schema, file_hash, load_state, save_state
+from query_service import EVENT_GRAPH_GLOB
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+ONTOLOGY_PATH = "../ontology/sakunagraph.ttl"
+PSGC_RDF_PATH = "psgc_rdf.ttl"
+REPORT_PATH = "validation_report.json"
+STATE_PATH = "validation_state.json"    # event file → content hash when last validated
+BATCH_SIZE = 5000                       # triples held (and checked) at a time while streaming a file
+MAX_EXAMPLES = 3                        # focus nodes kept per distinct violation
+
+SKG = Namespace("https://sakuna.ph/")
+
+# literal datatypes a range accepts besides itself (XSD derivation, plus Python-typed literals rdflib writes)
+DATATYPE_SUBTYPES = {
+    XSD.decimal: {XSD.integer, XSD.int, XSD.long, XSD.short, XSD.nonNegativeInteger, XSD.positiveInteger},
+    XSD.integer: {XSD.int, XSD.long, XSD.short, XSD.nonNegativeInteger, XSD.positiveInteger},
+    XSD.int: {XSD.short, XSD.byte},
+    XSD.string: {None},
+}
+INT_RANGE = (-2**31, 2**31 - 1)
+
+
+# -----------------------------------------------------------------------
+# Shapes → per-property constraints derived from the ontology
+# -----------------------------------------------------------------------
+def class_options(graph: Graph, node) -> set:
+    """A named class, or every member of an owl:unionOf class expression."""
+    if isinstance(node, URIRef):
+        return {node}
+    members = graph.value(node, OWL.unionOf)
+    if members is None:
+        return set()
+    return {m for m in Collection(graph, members) if isinstance(m, URIRef)}
+
+class Shapes:
+    """
+    SHACL-style constraints read from the ontology:
+
+        domain       → the subject of p has a (sub)type of one of the domain classes
+        range class  → the object of p is a resource with a (sub)type of one of the range classes
+        range datatype → the object of p is a well-formed literal of that datatype
+        disjointWith → no node has types on both sides
+        declared     → properties in the :  namespace exist in the ontology
+
+    Nodes with no stated type are reported as warnings (open world), not violations.
+    """
+
+    def __init__(self, ontology: Graph):
+        self.schema = Schema(ontology)
+        self.declared = set(ontology.subjects(RDF.type, OWL.ObjectProperty)) \
+            | set(ontology.subjects(RDF.type, OWL.DatatypeProperty)) \
+            | set(ontology.subjects(RDF.type, OWL.AnnotationProperty)) \
+            | set(ontology.subjects(RDF.type, RDF.Property))
+        datatypes = set(ontology.subjects(RDF.type, RDFS.Datatype)) | {RDFS.Literal}
+
+        self.domain, self.range_classes, self.range_datatypes = {}, {}, {}
+        for p, node in ontology.subject_objects(RDFS.domain):
+            self.domain.setdefault(p, set()).update(class_options(ontology, node))
+        for p, node in ontology.subject_objects(RDFS.range):
+            for option in class_options(ontology, node):
+                if option in datatypes or str(option).startswith(str(XSD)):
+                    self.range_datatypes.setdefault(p, set()).add(option)
+                else:
+                    self.range_classes.setdefault(p, set()).add(option)
+
+        self._constraints = {}
+        self.disjoint = set()
+        for a, b in ontology.subject_objects(OWL.disjointWith):
+            self.disjoint.update({(a, b), (b, a)})
+
+    def constraints(self, p, kind: str) -> list:
+        """Distinct allowed-sets of one kind that apply to p (its own and its superproperties')."""
+        key = (p, kind)
+        if key not in self._constraints:
+            sets = []
+            for q in self.schema.super_props.get(p, (p,)):
+                allowed = getattr(self, kind).get(q)
+                if allowed and allowed not in sets:
+                    sets.append(allowed)
+            self._constraints[key] = sets
+        return self._constraints[key]
+
+    def all_types(self, types: set) -> set:
+        closed = set()
+        for t in types:
+            closed |= self.schema.super_classes.get(t, {t})
+        return closed
+
+    def literal_ok(self, literal: Literal, datatypes: set) -> bool:
+        if literal.ill_typed:
+            return False
+        for datatype in datatypes:
+            if datatype == RDFS.Literal or literal.datatype == datatype:
+                return True
+            if datatype == XSD.string and literal.datatype is None and literal.language is None:
+                return True
+            if literal.datatype in DATATYPE_SUBTYPES.get(datatype, ()):
+                return True
+            if datatype == XSD.int and literal.datatype == XSD.integer and INT_RANGE[0] <= literal.toPython() <= INT_RANGE[1]:
+                return True
+        return False
+
+
+# -----------------------------------------------------------------------
+# Validation → one event graph, in batches
+# -----------------------------------------------------------------------
+class Report:
+    """Violations grouped by (severity, rule, property, detail) with a count and a few example nodes."""
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, severity: str, rule: str, prop, detail: str, focus):
+        key = (severity, rule, str(prop), detail)
+        group = self.groups.setdefault(key, {"count": 0, "examples": []})
+        group["count"] += 1
+        if len(group["examples"]) < MAX_EXAMPLES:
+            group["examples"].append(str(focus))
+
+    def rows(self) -> list:
+        return [
+            {"severity": s, "rule": r, "property": p, "detail": d, **group}
+            for (s, r, p, d), group in sorted(self.groups.items(), key=lambda item: -item[1]["count"])
+        ]
+
+class TripleStream(Graph):
+    """
+    Parser sink that never indexes: triples are buffered and handed to `handle` in batches of
+    at most `size`, so a file is checked without holding all of its triples as a Graph.
+    """
+
+    def __init__(self, handle, size: int = BATCH_SIZE):
+        super().__init__()
+        self.handle = handle
+        self.size = size
+        self.buffer = []
+        self.count = 0
+
+    def add(self, triple):
+        self.buffer.append(triple)
+        if len(self.buffer) >= self.size:
+            self.flush()
+        return self
+
+    def flush(self):
+        if self.buffer:
+            self.count += len(self.buffer)
+            self.handle(self.buffer)
+            self.buffer = []
+
+def stream_batches(path: str, handle, size: int = BATCH_SIZE) -> int:
+    """Parse `path`, calling `handle(batch)` for every batch of triples; returns the triple count."""
+    stream = TripleStream(handle, size)
+    stream.parse(path)
+    stream.flush()
+    return stream.count
+
+def add_types(types: dict, triples):
+    for node, p, cls in triples:
+        if p == RDF.type:
+            types.setdefault(node, set()).add(cls)
+
+def stated_types(graph: Graph) -> dict:
+    types = {}
+    add_types(types, graph.triples((None, RDF.type, None)))
+    return types
+
+def short(node) -> str:
+    return str(node).replace(str(SKG), ":").replace(str(XSD), "xsd:")
+
+def validate_file(path: str, shapes: Shapes, known_types: dict) -> tuple:
+    """
+    Check every triple of one event graph file; returns (triple count, Report). Types come from
+    the file itself plus `known_types` (PSGC locations, ontology individuals); inferred types are
+    deliberately not used, since domain/range inference would make every triple valid.
+
+    The file is streamed twice in bounded batches: once to collect its rdf:type statements
+    (a node may be typed after it is used), then to check the other triples.
+    """
+    local_types = {}
+    stream_batches(path, lambda batch: add_types(local_types, batch))
+    closed = {}
+
+    def types_of(node) -> set:
+        if node not in closed:
+            closed[node] = shapes.all_types(local_types.get(node, set()) | known_types.get(node, set()))
+        return closed[node]
+
+    def check_class(rule, prop, node, allowed):
+        types = types_of(node)
+        if rule == "range" and node in shapes.schema.super_classes:
+            types = types | shapes.schema.super_classes[node]   # taxonomy class used as a value (:hasType :Flood)
+        if not types:
+            report.add("Warning", rule, prop, "untyped node", node)
+        elif not types & allowed:
+            report.add("Violation", rule, prop, f"expected {' | '.join(sorted(map(short, allowed)))}", node)
+
+    def check_batch(batch):
+        for s, p, o in batch:
+            if p == RDF.type:
+                continue
+            if str(p).startswith(str(SKG)) and p not in shapes.declared:
+                report.add("Warning", "declared", p, "property not in ontology", s)
+
+            # constraints of p and of its superproperties, reported against p
+            for allowed in shapes.constraints(p, "domain"):
+                check_class("domain", p, s, allowed)
+            range_classes = shapes.constraints(p, "range_classes")
+            range_datatypes = shapes.constraints(p, "range_datatypes")
+            if isinstance(o, Literal):
+                if range_classes:
+                    report.add("Violation", "range", p, "literal where a resource is expected", s)
+                for allowed in range_datatypes:
+                    if not shapes.literal_ok(o, allowed):
+                        got = "ill-typed literal" if o.ill_typed else f"got {short(o.datatype or XSD.string)}"
+                        report.add("Violation", "range", p, f"expected {' | '.join(sorted(map(short, allowed)))}, {got}", s)
+            else:
+                if range_datatypes:
+                    report.add("Violation", "range", p, "resource where a literal is expected", s)
+                for allowed in range_classes:
+                    check_class("range", p, o, allowed)
+
+    report = Report()
+    count = stream_batches(path, check_batch)
+
+    for node in local_types:
+        types = types_of(node)
+        for a, b in shapes.disjoint:
+            if a in types and b in types and str(a) < str(b):
+                report.add("Violation", "disjoint", RDF.type, f"{short(a)} and {short(b)}", node)
+    return count, report
+
+
+# -----------------------------------------------------------------------
+# Incremental run → only event files that changed since the last report
+# -----------------------------------------------------------------------
+def schema_key() -> str:
+    """Changes with the ontology or the PSGC graph, i.e. whenever load_background() would."""
+    return file_hash(ONTOLOGY_PATH) + file_hash(PSGC_RDF_PATH)
+
+def load_background():
+    """(Shapes, known types): the ontology's constraints and the types of ontology / PSGC nodes."""
+    ontology = Graph().parse(ONTOLOGY_PATH)
+    known_types = stated_types(ontology)
+    for node, types in stated_types(Graph().parse(PSGC_RDF_PATH)).items():
+        known_types.setdefault(node, set()).update(types)
+    return Shapes(ontology), known_types
+
+def validate(paths=None, report_path: str = REPORT_PATH, state_path: str = STATE_PATH, background=None) -> dict:
+    """
+    `background` is a load_background() result kept by a long-running caller (watch.py), which
+    reloads it whenever schema_key() changes.
+    """
+    if paths is None:
+        paths = sorted(glob.glob(EVENT_GRAPH_GLOB))
+
+    # shapes and background types change only with the ontology / PSGC graph: recheck everything then
+    schema = schema_key()
+    state = load_state(state_path)
+    previous = {}
+    if os.path.exists(report_path):
+        with open(report_path) as f:
+            previous = json.load(f)
+    if state.get("schema") != schema:
+        state, previous = {"schema": schema}, {}
+
+    hashes = {path: file_hash(path) for path in paths}
+    changed = [path for path in paths if state.get(path) != hashes[path]]
+    results = {path: previous[path] for path in paths if path not in changed and path in previous}
+
+    if changed:
+        shapes, known_types = background or load_background()
+        for path in changed:
+            count, report = validate_file(path, shapes, known_types)
+            results[path] = {"triples": count, "issues": report.rows()}
+            state[path] = hashes[path]
+
+    tmp_path = f"{report_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(results, f, indent=4)
+    os.replace(tmp_path, report_path)
+    save_state({"schema": schema, **{path: hashes[path] for path in paths}}, state_path)
+
+    violations = sum(i["count"] for r in results.values() for i in r["issues"] if i["severity"] == "Violation")
+    warnings = sum(i["count"] for r in results.values() for i in r["issues"] if i["severity"] == "Warning")
+    print(f"✔ Validated {len(changed)} changed of {len(paths)} event graphs → {report_path}")
+    print(f"   {violations} violations, {warnings} warnings")
+    return results
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    validate()
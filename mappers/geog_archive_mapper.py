@@ -1,7 +1,14 @@
 import re
+import sys
 import pandas as pd
 from dateutil.parser import parse
 
+sys.path.insert(0, "..")     # repo root
+import pipeline_profiler
+
+WORKBOOK_PATH = "../../data/geog-archive-cleaned.xlsx"
+GDA_PATH = "gda.csv"
+
 COLUMN_MAPPING = {
     "Main Event Disaster Type": "hasType",
     "Disaster Name": "eventName",
@@ -252,21 +259,30 @@ def load_with_tiered_headers(path):
     df.columns = new_cols
     return df
 
-df = load_with_tiered_headers("../../data/geog-archive-cleaned.xlsx")
-df = df.rename(columns=COLUMN_MAPPING)
+def map_archive(workbook_path=WORKBOOK_PATH, csv_path=GDA_PATH):
+    """Workbook → gda.csv: mapped column names, rows without a usable date dropped."""
+    df = load_with_tiered_headers(workbook_path)
+    df = df.rename(columns=COLUMN_MAPPING)
+
+    # print("\n=== XLSX column names ===")
+    # for col in df.columns:
+    #     print(col)
 
-# print("\n=== XLSX column names ===")
-# for col in df.columns:
-#     print(col)
+    df = df[list(COLUMN_MAPPING.values())]
+    df = df.dropna(how='all')
+    df = df.dropna(axis=1, how='all')
+    df = df.dropna(subset=['date'])
 
-df = df[list(COLUMN_MAPPING.values())]
-df = df.dropna(how='all')
-df = df.dropna(axis=1, how='all')
-df = df.dropna(subset=['date'])
+    if "date" in df.columns:
+        df[["startDate", "endDate"]] = df["date"].apply(lambda v: pd.Series(clean_date_range(v)))
 
-if "date" in df.columns:
-    df[["startDate", "endDate"]] = df["date"].apply(lambda v: pd.Series(clean_date_range(v)))
+    df = df.dropna(subset=['startDate'])
+
+    df.to_csv(csv_path)
+    return df
 
-df = df.dropna(subset=['startDate'])
 
-df.to_csv('gda.csv')
\ No newline at end of file
+# === MAIN ===
+if __name__ == "__main__":
+    pipeline_profiler.enable_from_argv()
+    map_archive()
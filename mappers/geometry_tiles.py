@@ -0,0 +1,111 @@
+import os
+import json
+import geopandas as gpd
+from rdflib import URIRef, Literal, Namespace
+from rdflib.namespace import RDF, RDFS, GEO, XSD
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+GEOMETRY_DIR = "../geometry"                            # exported FlatGeobuf files
+GEOMETRY_BASE_URL = "https://sakuna.ph/geometry/"       # where GEOMETRY_DIR is published
+
+# simplification tolerance in degrees per resolution (~1 degree = 111 km)
+RESOLUTIONS = {
+    "high": 0.0001,
+    "medium": 0.001,
+    "low": 0.01,
+}
+DEFAULT_RESOLUTION = "medium"
+SOURCES_NAME = "sources.json"    # level → shapefile hash the files were exported from
+METERS_PER_DEGREE = 111_000
+
+SKG = Namespace("https://sakuna.ph/")
+
+# admin level → (shapefile code column, name column)
+LAYER_COLUMNS = {
+    "region": ("adm1_psgc", "adm1_en"),
+    "province": ("adm2_psgc", "adm2_en"),
+    "municipality": ("adm3_psgc", "adm3_en"),
+}
+
+
+# -----------------------------------------------------------------------
+# Export
+# -----------------------------------------------------------------------
+def tile_path(level: str, resolution: str, directory: str = GEOMETRY_DIR) -> str:
+    return os.path.join(directory, f"{level}_{resolution}.fgb")
+
+def export_layer(gdf: gpd.GeoDataFrame, level: str, directory: str = GEOMETRY_DIR):
+    """
+    Write one admin layer at every resolution as FlatGeobuf. Each file carries a packed
+    R-tree, so readers can pull a bounding box without scanning the whole file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    code_column, name_column = LAYER_COLUMNS[level]
+    layer = gdf[[code_column, name_column, "geometry"]].dropna(subset=[name_column])
+    layer = layer.rename(columns={code_column: "psgc", name_column: "name"})
+
+    for resolution, tolerance in RESOLUTIONS.items():
+        simplified = layer.copy()
+        simplified["geometry"] = simplified.simplify(tolerance=tolerance, preserve_topology=True)
+        path = tile_path(level, resolution, directory)
+        simplified.to_file(path, driver="FlatGeobuf", SPATIAL_INDEX="YES")
+        print(f"   ✔ Saved geometry: {path}")
+
+def export_admin_geometries(layers: dict, directory: str = GEOMETRY_DIR):
+    """
+    Export every level in `layers` (level → AdminLayer from admin_layer_cache) whose files are
+    missing or were built from a different shapefile. Up-to-date levels never load geometry.
+    """
+    sources_path = os.path.join(directory, SOURCES_NAME)
+    sources = {}
+    if os.path.exists(sources_path):
+        with open(sources_path) as f:
+            sources = json.load(f)
+
+    for level, layer in layers.items():
+        current = sources.get(level) == layer.key and all(
+            os.path.exists(tile_path(level, resolution, directory)) for resolution in RESOLUTIONS
+        )
+        if current:
+            continue
+
+        export_layer(layer.with_geometry(), level, directory)
+        sources[level] = layer.key
+        with open(sources_path, "w") as f:
+            json.dump(sources, f, indent=4)
+
+
+# -----------------------------------------------------------------------
+# RDF links: location → geo:Geometry per resolution → external file
+# -----------------------------------------------------------------------
+def add_geometry_links(g, uri: URIRef, level: str, psgc):
+    """
+    Link a location to its geometries instead of embedding WKT literals:
+        <loc> geo:hasGeometry <loc_geom_low|medium|high> ; geo:hasDefaultGeometry <loc_geom_medium>
+        <loc_geom_*> a geo:Geometry ; rdfs:seeAlso <GEOMETRY_BASE_URL/<level>_<res>.fgb#<psgc>>
+    """
+    for resolution, tolerance in RESOLUTIONS.items():
+        geom_uri = URIRef(f"{uri}_geom_{resolution}")
+        link = URIRef(f"{GEOMETRY_BASE_URL}{level}_{resolution}.fgb#{psgc}")
+
+        g.add((geom_uri, RDF.type, GEO.Geometry))
+        g.add((geom_uri, RDFS.seeAlso, link))
+        g.add((geom_uri, GEO.hasMetricSpatialResolution, Literal(tolerance * METERS_PER_DEGREE, datatype=XSD.double)))
+        g.add((uri, GEO.hasGeometry, geom_uri))
+
+        if resolution == DEFAULT_RESOLUTION:
+            g.add((uri, GEO.hasDefaultGeometry, geom_uri))
+
+
+# -----------------------------------------------------------------------
+# Reading
+# -----------------------------------------------------------------------
+def load_geometries(level: str, resolution: str = DEFAULT_RESOLUTION, bbox=None, directory: str = GEOMETRY_DIR):
+    """
+    Read one level at one resolution; with `bbox` (minx, miny, maxx, maxy) only the
+    features intersecting it are read, using the file's spatial index.
+    """
+    return gpd.read_file(tile_path(level, resolution, directory), bbox=bbox)
@@ -0,0 +1,196 @@
+import re
+import sys
+import pandas as pd
+import numpy as np
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+RESIDUE_SUFFIX = "_residue"     # side column holding text that could not be parsed
+MIN_PARSED_RATIO = 0.8          # share of non-empty NDRRMC cells that must parse for a column to be numeric
+FULL_PESO_THRESHOLD = 100_000   # a bare number this large in a millions column is already in pesos
+
+# Geog Archive impact columns (see COLUMN_MAPPING in geog_archive_mapper.py) → value kind
+#   count     → whole numbers (persons, families, houses, items)
+#   currency  → peso amounts as written
+#   millions  → peso amounts recorded "(in Millions)"; about a third of the cells were nonetheless
+#               typed in full pesos (up to 3.4e10), so bare numbers ≥ FULL_PESO_THRESHOLD are kept
+#               as pesos instead of scaled (no damage figure reaches 100,000 million pesos)
+GDA_IMPACT_COLUMNS = {
+    "evacuationCenters": "count",
+    "affectedBarangays": "count",
+    "dead": "count",
+    "injured": "count",
+    "missing": "count",
+    "affectedFamilies": "count",
+    "affectedPersons": "count",
+    "displacedFamilies": "count",
+    "displacedPersons": "count",
+    "totallyDamagedHouses": "count",
+    "partiallyDamagedHouses": "count",
+    "infraDamageAmount": "millions",
+    "agricultureDamageAmount": "millions",
+    "commercialDamageAmount": "millions",
+    "allocatedFunds": "currency",
+    "amoungNGOs": "currency",
+    "itemCostGoods": "currency",
+    "itemQtyGoods": "count",
+    "itemCostWater": "currency",
+    "itemQtyWater": "count",
+    "itemCostClothing": "currency",
+    "itemQtyClothing": "count",
+    "itemCostMedicine": "currency",
+    "itemQtyMedicine": "count",
+    "itemCostOthers1": "currency",
+    "itemCostOthers2": "currency",
+    "postStructureCost": "currency",
+}
+
+KIND_SCALE = {
+    "count": 1.0,
+    "currency": 1.0,
+    "millions": 1_000_000.0,
+}
+
+# Scale words written inside a cell override the column scale ("1.2 Billion" in a millions column)
+CELL_SCALE = {
+    "k": 1_000.0,
+    "thousand": 1_000.0,
+    "m": 1_000_000.0,
+    "mil": 1_000_000.0,
+    "million": 1_000_000.0,
+    "millions": 1_000_000.0,
+    "b": 1_000_000_000.0,
+    "bn": 1_000_000_000.0,
+    "billion": 1_000_000_000.0,
+    "billions": 1_000_000_000.0,
+}
+
+# A whole cell holding one number: optional peso sign, thousands separators, optional scale word
+NUMBER_PATTERN = re.compile(
+    r"^\s*(?:PHP|Php|P|₱)?\s*"
+    r"(?P<num>[-+]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?)"
+    r"\s*(?P<scale>thousand|millions?|mil|billions?|bn|k|m|b)?\.?\s*$",
+    flags=re.IGNORECASE,
+)
+
+# Cells that mean "nothing reported" rather than unparsed text
+EMPTY_PATTERN = re.compile(r"^\s*(?:[-–—]+|n/?\.?a\.?|none|nan|)\s*$", flags=re.IGNORECASE)
+
+NDRRMC_VALUE_COLUMN = re.compile(r"^Column_\d+$")
+
+
+# -----------------------------------------------------------------------
+# Helper function → smallest nullable integer dtype that holds the values
+# -----------------------------------------------------------------------
+def compact_integer_dtype(values: pd.Series) -> str:
+    if values.dropna().empty:
+        return "Int32"
+    low, high = values.min(), values.max()
+    info = np.iinfo(np.int32)
+    if info.min <= low and high <= info.max:
+        return "Int32"
+    return "Int64"
+
+
+# -----------------------------------------------------------------------
+# Parse one column → (numeric values, unparsed residue)
+# -----------------------------------------------------------------------
+def parse_numeric(series: pd.Series, kind: str = "count"):
+    """
+    Vectorized parse of a text column into numbers.
+    Returns (values, residue): values use a compact nullable dtype
+    (Int32/Int64 for counts, Float32 for peso amounts), residue keeps the
+    original text of every non-empty cell that did not parse.
+    """
+    text = series.astype("string").str.strip()
+    empty = text.isna() | text.str.fullmatch(EMPTY_PATTERN.pattern, case=False).fillna(True)
+
+    parts = text.str.extract(NUMBER_PATTERN)
+    number = pd.to_numeric(parts["num"].str.replace(",", "", regex=False), errors="coerce")
+    cell_scale = parts["scale"].str.lower().map(CELL_SCALE)
+    scale = cell_scale.astype("float64").fillna(KIND_SCALE[kind])
+    if kind == "millions":
+        scale = scale.mask(cell_scale.isna() & (number >= FULL_PESO_THRESHOLD), 1.0)
+    values = number * scale
+
+    if kind == "count":
+        # fractional "counts" are reported as residue instead of silently rounded
+        values = values.where(values.isna() | (values % 1 == 0))
+        values = values.astype(compact_integer_dtype(values))
+    else:
+        values = values.astype("Float32")
+
+    values = values.mask(empty)
+    residue = text.where(values.isna() & ~empty)
+
+    return values, residue
+
+
+# -----------------------------------------------------------------------
+# Coerce a whole frame
+# -----------------------------------------------------------------------
+def coerce_columns(df: pd.DataFrame, kinds: dict) -> pd.DataFrame:
+    """
+    Replace each column in `kinds` with its parsed numeric form.
+    A `<column>_residue` column is added next to it only when some cells did not parse.
+    """
+    out = df.copy()
+    for column, kind in kinds.items():
+        if column not in out.columns:
+            continue
+
+        values, residue = parse_numeric(out[column], kind)
+        out[column] = values
+
+        if residue.notna().any():
+            position = out.columns.get_loc(column) + 1
+            out.insert(position, f"{column}{RESIDUE_SUFFIX}", residue)
+
+    return out
+
+def coerce_gda_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Coerce the Geog Archive impact columns (gda.csv)."""
+    return coerce_columns(df, GDA_IMPACT_COLUMNS)
+
+def coerce_ndrrmc_table(df: pd.DataFrame, min_parsed_ratio: float = MIN_PARSED_RATIO) -> pd.DataFrame:
+    """
+    Coerce the `Column_N` cells of one parsed NDRRMC table.
+    A column is treated as numeric when most of its non-empty cells parse;
+    whole-number columns become counts, the rest peso amounts.
+    """
+    kinds = {}
+    for column in df.columns:
+        if not NDRRMC_VALUE_COLUMN.match(str(column)):
+            continue
+
+        values, residue = parse_numeric(df[column], "currency")
+        filled = values.notna().sum() + residue.notna().sum()
+        if filled == 0 or values.notna().sum() / filled < min_parsed_ratio:
+            continue
+
+        whole = values.dropna()
+        kinds[column] = "count" if (whole % 1 == 0).all() else "currency"
+
+    return coerce_columns(df, kinds)
+
+
+# -----------------------------------------------------------------------
+# Run → python impact_coercion.py <csv> [<csv> ...]
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        raw = pd.read_csv(path, dtype="string")
+        if any(column in raw.columns for column in GDA_IMPACT_COLUMNS):
+            coerced = coerce_gda_frame(raw)
+        else:
+            coerced = coerce_ndrrmc_table(raw)
+
+        numeric = [c for c in coerced.columns if pd.api.types.is_numeric_dtype(coerced[c])]
+        residues = [c for c in coerced.columns if c.endswith(RESIDUE_SUFFIX)]
+        unparsed = sum(int(coerced[c].notna().sum()) for c in residues)
+
+        print(f"📄 {path}")
+        print(f"   ✔ Numeric columns: {len(numeric)}")
+        print(f"   ✔ Unparsed cells kept as residue: {unparsed} in {len(residues)} columns")
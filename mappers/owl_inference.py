@@ -0,0 +1,322 @@
+import os
+import json
+import glob
+import hashlib
+
+from rdflib import Dataset, Graph, URIRef, Literal, Namespace
+from rdflib.namespace import RDF, RDFS, OWL
+
+from query_service import EVENT_GRAPH_GLOB
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+ONTOLOGY_PATH = "../ontology/sakunagraph.ttl"
+PSGC_RDF_PATH = "psgc_rdf.ttl"
+INFERRED_PATH = "inferred.ttl"          # the inferred graph alone; query_service.py loads it with the rest
+STATE_PATH = "inferred_state.json"      # source file → content hash, for incremental runs
+
+SKG = Namespace("https://sakuna.ph/")
+GRAPH = Namespace("https://sakuna.ph/graph/")
+INFERRED_GRAPH = GRAPH["inferred"]
+
+# predicates whose triples change the compiled schema (→ full rebuild instead of an increment)
+SCHEMA_PREDICATES = {
+    RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range,
+    OWL.equivalentClass, OWL.equivalentProperty, OWL.inverseOf,
+}
+SCHEMA_TYPES = {OWL.TransitiveProperty, OWL.SymmetricProperty}
+SCHEMA_CLASSES = SCHEMA_TYPES | {OWL.Class, RDFS.Class}
+TOP_PROPERTIES = {OWL.topObjectProperty, OWL.topDataProperty}     # hold between everything; never materialized
+
+
+# -----------------------------------------------------------------------
+# Helper function → closure of a relation given as {node: set(direct successors)}
+# -----------------------------------------------------------------------
+def reflexive_closure(edges: dict, nodes) -> dict:
+    closure = {}
+    for start in nodes:
+        seen, stack = {start}, [start]
+        while stack:
+            for nxt in edges.get(stack.pop(), ()):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        closure[start] = seen
+    return closure
+
+def graph_name(path: str) -> URIRef:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if os.path.abspath(path) == os.path.abspath(ONTOLOGY_PATH):
+        return GRAPH["ontology"]
+    if os.path.abspath(path) == os.path.abspath(PSGC_RDF_PATH):
+        return GRAPH["psgc"]
+    return GRAPH[f"events/{stem}"]
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# -----------------------------------------------------------------------
+# Compiled schema → one-step rules whose repeated application gives RDFS / OWL-RL entailments
+# -----------------------------------------------------------------------
+class Schema:
+    """
+    The ontology's class and property axioms, pre-closed so each data triple needs one lookup per rule:
+
+        subClassOf / equivalentClass      →  x a C        ⊢ x a D      (every superclass D)
+        subPropertyOf / equivalentProperty → x p y        ⊢ x q y      (every superproperty q)
+        inverseOf                          →  x p y        ⊢ y q x
+        domain / range (named classes)     →  x p y        ⊢ x a C / y a C
+        SymmetricProperty                  →  x p y        ⊢ y p x
+        TransitiveProperty                 →  x p y, y p z ⊢ x p z     (joined in the materializer)
+
+    Union (blank node) domains and ranges entail nothing about either member, so they are skipped.
+    """
+
+    def __init__(self, graph: Graph):
+        sub_class, sub_prop = {}, {}
+        for c, d in graph.subject_objects(RDFS.subClassOf):
+            sub_class.setdefault(c, set()).add(d)
+        for c, d in graph.subject_objects(OWL.equivalentClass):
+            sub_class.setdefault(c, set()).add(d)
+            sub_class.setdefault(d, set()).add(c)
+        for p, q in graph.subject_objects(RDFS.subPropertyOf):
+            sub_prop.setdefault(p, set()).add(q)
+        for p, q in graph.subject_objects(OWL.equivalentProperty):
+            sub_prop.setdefault(p, set()).add(q)
+            sub_prop.setdefault(q, set()).add(p)
+
+        classes = set(sub_class) | {d for ds in sub_class.values() for d in ds}
+        classes |= set(graph.subjects(RDF.type, OWL.Class)) | set(graph.subjects(RDF.type, RDFS.Class))
+        properties = set(sub_prop) | {q for qs in sub_prop.values() for q in qs}
+
+        self.super_classes = {
+            c: {d for d in ds if isinstance(d, URIRef)}
+            for c, ds in reflexive_closure(sub_class, classes).items() if isinstance(c, URIRef)
+        }
+        self.super_props = {
+            p: {q for q in qs if isinstance(q, URIRef) and q not in TOP_PROPERTIES}
+            for p, qs in reflexive_closure(sub_prop, properties).items() if isinstance(p, URIRef)
+        }
+
+        self.inverse = {}
+        for p, q in graph.subject_objects(OWL.inverseOf):
+            self.inverse.setdefault(p, set()).add(q)
+            self.inverse.setdefault(q, set()).add(p)
+
+        self.domain, self.range = {}, {}
+        for p, c in graph.subject_objects(RDFS.domain):
+            if isinstance(c, URIRef):
+                self.domain.setdefault(p, set()).add(c)
+        for p, c in graph.subject_objects(RDFS.range):
+            if isinstance(c, URIRef):
+                self.range.setdefault(p, set()).add(c)
+
+        self.symmetric = set(graph.subjects(RDF.type, OWL.SymmetricProperty))
+        self.transitive = set(graph.subjects(RDF.type, OWL.TransitiveProperty))
+
+    def schema_triples(self):
+        """subClassOf / subPropertyOf closures, so type roll-ups are single-triple lookups."""
+        for c, supers in self.super_classes.items():
+            for d in supers:
+                yield (c, RDFS.subClassOf, d)
+        for p, supers in self.super_props.items():
+            for q in supers:
+                yield (p, RDFS.subPropertyOf, q)
+
+    def consequences(self, triple):
+        """Everything one rule application derives from a single triple (transitivity aside)."""
+        s, p, o = triple
+        if p == RDF.type:
+            for c in self.super_classes.get(o, ()):
+                yield (s, RDF.type, c)
+            return
+        for q in self.super_props.get(p, (p,)):
+            yield (s, q, o)
+            if isinstance(o, Literal):
+                for c in self.domain.get(q, ()):
+                    yield (s, RDF.type, c)
+                continue
+            for c in self.domain.get(q, ()):
+                yield (s, RDF.type, c)
+            for c in self.range.get(q, ()):
+                yield (o, RDF.type, c)
+            for r in self.inverse.get(q, ()):
+                yield (o, r, s)
+            if q in self.symmetric:
+                yield (o, q, s)
+
+
+# -----------------------------------------------------------------------
+# Materializer → semi-naive evaluation into the inferred named graph
+# -----------------------------------------------------------------------
+class InferenceStore:
+    """
+    Ontology, PSGC and every event batch as named graphs of one Dataset, plus the graph
+    INFERRED_GRAPH holding everything they entail that they do not already state.
+
+    Adding an event graph only runs the rules on the new triples (semi-naive: each round
+    joins the previous round's new triples against everything known). A changed ontology
+    or a removed/changed graph needs a full rebuild, since entailments are never retracted.
+    """
+
+    def __init__(self):
+        self.dataset = Dataset()
+        self.dataset.bind("", SKG)
+        self.inferred = self.dataset.graph(INFERRED_GRAPH)
+        self.schema = Schema(Graph())
+        self.sources = {}           # source file → content hash, as loaded by materialize()
+        self.known = set()          # every stated or inferred triple
+        self.successors = {}        # transitive property → {x: {y}}
+        self.predecessors = {}      # transitive property → {y: {x}}
+
+    # ---------------- loading ----------------
+
+    def add_file(self, path: str, name: URIRef = None) -> int:
+        graph = self.dataset.graph(name or graph_name(path))
+        graph.parse(path)
+        return self.add_triples(graph)
+
+    def add_triples(self, triples) -> int:
+        """Materialize what `triples` (already stored in a named graph) entail; returns how many new triples."""
+        triples = list(triples)
+        if any(p in SCHEMA_PREDICATES or (p == RDF.type and o in SCHEMA_TYPES) for _, p, o in triples):
+            return self.rebuild()
+        return self._materialize(triples)
+
+    def stated_graphs(self):
+        return [g for g in self.dataset.graphs() if g.identifier != INFERRED_GRAPH]
+
+    def rebuild_index(self):
+        """Recompile the schema and index every stored triple (e.g. after loading a saved inferred graph)."""
+        schema_graph = Graph()
+        for graph in self.stated_graphs():
+            for triple in graph:
+                if triple[1] in SCHEMA_PREDICATES or (triple[1] == RDF.type and triple[2] in SCHEMA_CLASSES):
+                    schema_graph.add(triple)
+        self.schema = Schema(schema_graph)
+        self.known, self.successors, self.predecessors = set(), {}, {}
+        for graph in self.dataset.graphs():
+            for triple in graph:
+                self._remember(triple)
+
+    def rebuild(self) -> int:
+        self.inferred.remove((None, None, None))
+        self.rebuild_index()
+        stated = list(self.known)
+        self.known, self.successors, self.predecessors = set(), {}, {}
+        return self._materialize(list(self.schema.schema_triples()) + stated)
+
+    # ---------------- semi-naive evaluation ----------------
+
+    def _remember(self, triple) -> bool:
+        if triple in self.known:
+            return False
+        self.known.add(triple)
+        s, p, o = triple
+        if p in self.schema.transitive:
+            self.successors.setdefault(p, {}).setdefault(s, set()).add(o)
+            self.predecessors.setdefault(p, {}).setdefault(o, set()).add(s)
+        return True
+
+    def _derive(self, triple):
+        yield from self.schema.consequences(triple)
+        s, p, o = triple
+        if p in self.schema.transitive:
+            for z in self.successors[p].get(o, ()):
+                yield (s, p, z)
+            for w in self.predecessors[p].get(s, ()):
+                yield (w, p, o)
+
+    def _materialize(self, triples) -> int:
+        delta = [t for t in triples if self._remember(t)]
+        added = self._store_inferred(delta)
+        while delta:
+            new = []
+            for triple in delta:
+                for derived in self._derive(triple):
+                    if self._remember(derived):
+                        new.append(derived)
+            added += self._store_inferred(new)
+            delta = new
+        return added
+
+    def _store_inferred(self, triples) -> int:
+        # triples some named graph already states are not repeated in the inferred graph
+        added = 0
+        for triple in triples:
+            if not any(True for _ in self.dataset.quads(triple)):
+                self.inferred.add(triple)
+                added += 1
+        return added
+
+    # ---------------- persistence ----------------
+
+    def save(self, path: str = INFERRED_PATH):
+        self.inferred.serialize(destination=path, format="turtle")
+
+
+# -----------------------------------------------------------------------
+# Incremental run over the mapper outputs
+# -----------------------------------------------------------------------
+def load_state(path: str = STATE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state: dict, path: str = STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_path, path)
+
+def materialize(paths=None, inferred_path: str = INFERRED_PATH, state_path: str = STATE_PATH, store: InferenceStore = None) -> InferenceStore:
+    """
+    (Re)build inferred.ttl. When only new event files appeared since the last run, the old
+    inferred graph is reloaded and just the new files are reasoned over; any other change
+    (ontology, PSGC, an edited or deleted event file) rebuilds from scratch.
+
+    `store` is the result of an earlier call, kept by a long-running caller (watch.py): when it
+    still holds the previous state, nothing is reloaded.
+    """
+    if paths is None:
+        paths = [ONTOLOGY_PATH, PSGC_RDF_PATH] + sorted(glob.glob(EVENT_GRAPH_GLOB))
+    hashes = {path: file_hash(path) for path in paths}
+    previous = load_state(state_path)
+
+    unchanged = all(hashes.get(path) == digest for path, digest in previous.items())
+    new_paths = [path for path in paths if path not in previous]
+    warm = store is not None and bool(previous) and unchanged and store.sources == previous
+    if not warm:
+        store = InferenceStore()
+
+    if previous and unchanged and (warm or os.path.exists(inferred_path)):
+        if not warm:
+            for path in previous:
+                store.dataset.graph(graph_name(path)).parse(path)
+            store.inferred.parse(inferred_path)
+            store.rebuild_index()
+        added = sum(store.add_file(path) for path in new_paths)
+        print(f"✔ Inference: +{added} triples from {len(new_paths)} new graphs")
+    else:
+        for path in paths:
+            store.dataset.graph(graph_name(path)).parse(path)
+        added = store.rebuild()
+        print(f"✔ Inference: rebuilt {added} triples from {len(paths)} graphs")
+
+    store.save(inferred_path)
+    save_state(hashes, state_path)
+    store.sources = hashes
+    return store
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    materialize()
@@ -0,0 +1,170 @@
+import os
+import re
+import sys
+import pickle
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+from admin_layer_cache import load_admin_layer, CACHE_DIR
+from impact_coercion import RESIDUE_SUFFIX
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+MUNICITIES_SHP_PATH = "../shapefiles/PH_Adm3_MuniCities.shp"
+OUTPUT_PATH = "gda_psgc.csv"
+
+# One whole cell holding a coordinate: decimal degrees ("14.6", "16.0060° N") or degrees with
+# minutes and seconds ("10° 24.7' N", "17°21'4.34\"N", "13° 9′ 58″"), hemisphere optional
+COORDINATE_PATTERN = re.compile(
+    r"^\s*(?P<sign>[-+])?(?P<deg>\d+(?:\.\d+)?)\s*(?:°|degrees?)?\s*"
+    r"(?:(?P<min>\d+(?:\.\d+)?)\s*['′]\s*)?"
+    r"(?:(?P<sec>\d*\.?\d+)\s*(?:\"|″|''|['′])\s*)?"
+    r"(?P<hem>north|south|east|west|[NSEW])?\.?\s*$",
+    flags=re.IGNORECASE,
+)
+
+# hemispheres allowed per axis (a latitude typed into the longitude column stays residue)
+AXIS_HEMISPHERES = {
+    "latitude": {"N": 1.0, "S": -1.0},
+    "longitude": {"E": 1.0, "W": -1.0},
+}
+AXIS_LIMIT = {"latitude": 90.0, "longitude": 180.0}
+
+PSGC_COLUMNS = {
+    "adm3_psgc": "municipalityPsgc",
+    "adm2_psgc": "provincePsgc",
+    "adm1_psgc": "regionPsgc",
+}
+
+
+# -----------------------------------------------------------------------
+# Parse one coordinate column → (decimal degrees, unparsed residue)
+# -----------------------------------------------------------------------
+def parse_coordinate(series: pd.Series, axis: str):
+    """
+    Vectorized parse of latitude or longitude text into signed decimal degrees; S and W
+    negate. Returns (values, residue) like impact_coercion.parse_numeric: residue keeps the
+    text of every non-empty cell that did not parse ("(did not make landfall)", "127.7 N"
+    in the longitude column, values out of range).
+    """
+    text = pd.Series(series).astype("string").str.strip()
+    empty = text.isna() | text.str.fullmatch(r"[-–—]*").fillna(True)
+
+    parts = text.str.extract(COORDINATE_PATTERN)
+    degrees = pd.to_numeric(parts["deg"], errors="coerce")
+    minutes = pd.to_numeric(parts["min"], errors="coerce").fillna(0.0)
+    seconds = pd.to_numeric(parts["sec"], errors="coerce").fillna(0.0)
+    values = degrees + minutes / 60 + seconds / 3600
+
+    hemisphere = parts["hem"].str[0].str.upper()
+    sign = hemisphere.map(AXIS_HEMISPHERES[axis]).astype("float64")
+    sign = sign.mask(hemisphere.isna(), 1.0)        # no hemisphere: N / E, as written in decimals
+    sign = sign.mask(parts["sign"].eq("-").fillna(False), -sign)
+    values = (values * sign).where((minutes < 60) & (seconds < 60))
+    values = values.where(values.abs() <= AXIS_LIMIT[axis]).astype("float64")
+
+    values = values.mask(empty)
+    residue = text.where(values.isna() & ~empty)
+    return values, residue
+
+
+# -----------------------------------------------------------------------
+# STRtree over municipality/city polygons (cached between runs)
+# -----------------------------------------------------------------------
+class MunicipalityIndex:
+    """STRtree over PH_Adm3_MuniCities polygons plus the PSGC codes of each polygon."""
+
+    def __init__(self, tree: STRtree, codes: dict):
+        self.tree = tree
+        self.codes = codes      # adm3_psgc / adm2_psgc / adm1_psgc → int64 array aligned with the tree
+
+    @classmethod
+    def build(cls, layer):
+        gdf = layer.with_geometry()
+        gdf = gdf[gdf.geometry.notna()].to_crs(epsg=4326)
+        codes = {column: gdf[column].astype("int64").to_numpy() for column in PSGC_COLUMNS}
+        return cls(STRtree(gdf.geometry.values), codes)
+
+    @classmethod
+    def load(cls, shp_path: str = MUNICITIES_SHP_PATH, cache_dir: str = CACHE_DIR):
+        """Load the pickled tree for this exact shapefile, building (and caching) it on a miss."""
+        layer = load_admin_layer(shp_path, cache_dir=cache_dir)
+        cache_path = os.path.join(cache_dir, f"{layer.name}.{layer.key[:16]}.strtree.pkl")
+
+        if os.path.exists(cache_path):
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+
+        index = cls.build(layer)
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        print(f"✔ Cached municipality STRtree: {cache_path}")
+        return index
+
+    def resolve(self, lon, lat) -> pd.DataFrame:
+        """
+        Vectorized point-in-polygon: municipality/province/region PSGC codes for each
+        (lon, lat), as numbers or coordinate text. Points outside every polygon or with
+        missing or unparsed coordinates get <NA>.
+        """
+        lon = parse_coordinate(lon, "longitude")[0].to_numpy(dtype=float)
+        lat = parse_coordinate(lat, "latitude")[0].to_numpy(dtype=float)
+        valid = ~(np.isnan(lon) | np.isnan(lat))
+
+        hit = np.full(len(lon), -1, dtype=np.int64)
+        points = shapely.points(lon[valid], lat[valid])
+        point_idx, polygon_idx = self.tree.query(points, predicate="within")
+
+        # a point on a shared boundary can match two polygons; keep the first
+        first = np.unique(point_idx, return_index=True)[1]
+        hit[np.flatnonzero(valid)[point_idx[first]]] = polygon_idx[first]
+
+        result = {}
+        for column, name in PSGC_COLUMNS.items():
+            values = pd.array(self.codes[column][hit.clip(0)], dtype="Int64")
+            values[hit < 0] = pd.NA
+            result[name] = values
+        return pd.DataFrame(result)
+
+
+# -----------------------------------------------------------------------
+# Geog Archive: latitude/longitude → PSGC codes
+# -----------------------------------------------------------------------
+def resolve_gda(df: pd.DataFrame, index: MunicipalityIndex) -> pd.DataFrame:
+    """
+    Replace latitude/longitude with decimal degrees (a `<column>_residue` column keeps
+    coordinates that did not parse) and add the PSGC codes of each point.
+    """
+    df = df.copy()
+    for axis in ("latitude", "longitude"):
+        values, residue = parse_coordinate(df[axis], axis)
+        values.index = df.index
+        df[axis] = values
+        if residue.notna().any():
+            residue.index = df.index
+            df.insert(df.columns.get_loc(axis) + 1, f"{axis}{RESIDUE_SUFFIX}", residue)
+
+    codes = index.resolve(df["longitude"], df["latitude"])
+    codes.index = df.index
+    return pd.concat([df, codes], axis=1)
+
+
+# -----------------------------------------------------------------------
+# Run → python point_in_polygon.py [gda.csv] [output.csv]
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    input_path = sys.argv[1] if len(sys.argv) > 1 else "gda.csv"
+    output_path = sys.argv[2] if len(sys.argv) > 2 else OUTPUT_PATH
+
+    index = MunicipalityIndex.load()
+    df = pd.read_csv(input_path, index_col=0)
+    located = resolve_gda(df, index)
+    located.to_csv(output_path)
+
+    print(f"✔ Located {located['municipalityPsgc'].notna().sum()}/{len(located)} records → {output_path}")
@@ -1,15 +1,28 @@
-import geopandas as gpd
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import RDF, RDFS, GEO
+from admin_hierarchy import build_hierarchy, save_hierarchy
+from geometry_tiles import export_admin_geometries, add_geometry_links
+from admin_layer_cache import load_admin_layer
+from rdf_bundle import write_bundle
+
+import sys
+sys.path.insert(0, "..")     # repo root
+import pipeline_profiler
+pipeline_profiler.enable_from_argv()
 
 
 regions_shp_path = "../shapefiles/PH_Adm1_Regions.shp"
 provinces_shp_path = "../shapefiles/PH_Adm2_ProvDists.shp"
 municities_shp_path = "../shapefiles/PH_Adm3_MuniCities.shp"
 
-gdf_regions = gpd.read_file(regions_shp_path, layer='PH_Adm1_Regions.shp')
-gdf_provinces = gpd.read_file(provinces_shp_path, layer='PH_Adm2_ProvDists.shp')
-gdf_municities = gpd.read_file(municities_shp_path, layer='PH_Adm3_MuniCities.shp')
+# Attribute columns come from a GeoParquet cache keyed by shapefile hash; geometry loads only if needed
+regions_layer = load_admin_layer(regions_shp_path)
+provinces_layer = load_admin_layer(provinces_shp_path)
+municities_layer = load_admin_layer(municities_shp_path)
+
+gdf_regions = regions_layer.attributes
+gdf_provinces = provinces_layer.attributes
+gdf_municities = municities_layer.attributes
 
 
 g = Graph()
@@ -17,7 +30,15 @@ SKG = Namespace("https://sakuna.ph/")
 
 g.bind("", SKG)
 
-gdf_regions['geometry'] = gdf_regions.simplify(tolerance=0.001, preserve_topology=True)
+# Geometries live in external multi-resolution FlatGeobuf files, linked from each location
+export_admin_geometries({
+    "region": regions_layer,
+    "province": provinces_layer,
+    "municipality": municities_layer,
+})
+
+# PSGC code → (parent PSGC code, level, name), written out as the compact hierarchy table
+hierarchy_nodes = {}
 
 # print(gpd.list_layers(regions_shp_path))
 
@@ -40,6 +61,8 @@ for _, row in gdf_regions.iterrows():
     g.add((uri, URIRef(SKG["psgc"]), Literal(psgc)))
     g.add((uri, URIRef(SKG["admLevel"]), Literal(admLevel)))
 
+    hierarchy_nodes[int(psgc)] = (None, "Region", row['adm1_en'])
+
 
     # Too larege and unneccesary, just refer to an external file
     # geom_wkt = row['geometry'].wkt
@@ -50,6 +73,8 @@ for _, row in gdf_regions.iterrows():
 
     # g.add((uri, GEO.hasGeometry, geom_uri))
 
+    add_geometry_links(g, uri, "region", psgc)
+
 
 # ===================== PROVINCES
 
@@ -74,6 +99,8 @@ for _, row in gdf_provinces.iterrows():
     parentRegion = Literal(row['adm1_psgc'])
     for s, p, o in g.triples((None, URIRef(SKG["psgc"]), parentRegion)):
         g.add((uri, URIRef(SKG["isPartOf"]), s))
+
+    hierarchy_nodes[int(psgc)] = (int(row['adm1_psgc']), "Province", row['adm2_en'])
         
     # Too larege and unneccesary, just refer to an external file
 
@@ -85,6 +112,8 @@ for _, row in gdf_provinces.iterrows():
 
     # g.add((uri, GEO.hasGeometry, geom_uri))
 
+    add_geometry_links(g, uri, "province", psgc)
+
 # ===================== MUNICIPALITIES/CITIES
 
 for _, row in gdf_municities.iterrows():
@@ -132,4 +161,19 @@ for _, row in gdf_municities.iterrows():
     g.add((uri, URIRef(SKG["psgc"]), Literal(psgc)))
     g.add((uri, URIRef(SKG["admLevel"]), Literal(admLevel)))
 
-g.serialize(destination='psgc_rdf.ttl')
\ No newline at end of file
+    add_geometry_links(g, uri, "municipality", psgc)
+
+    # Independent cities (adm2_psgc == adm3_psgc) already appear in the province layer, and
+    # municipalities whose adm2_psgc is not a province in the layer (the Cotabato clusters)
+    # hang directly under their region instead of being left without a parent
+    parentCode = int(row['adm2_psgc'])
+    if int(psgc) in hierarchy_nodes:
+        continue
+    if parentCode == int(psgc) or parentCode not in hierarchy_nodes:
+        parentCode = int(row['adm1_psgc'])
+    hierarchy_nodes[int(psgc)] = (parentCode, "Municipality", row['adm3_en'])
+
+g.serialize(destination='psgc_rdf.ttl')
+write_bundle(g, 'psgc_rdf.rdfb')     # memory-mappable copy for consumers that only look triples up
+
+save_hierarchy(build_hierarchy(hierarchy_nodes))
\ No newline at end of file
@@ -0,0 +1,171 @@
+import re
+from rdflib import Graph, Namespace
+from rdflib.namespace import RDFS
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+PSGC_RDF_PATH = "psgc_rdf.ttl"
+SKG = Namespace("https://sakuna.ph/")
+
+# PSGC codes are RRPPPMMBBB → dividing by these gives the region/province/municipality prefix
+REGION_DIVISOR = 100_000_000
+PROVINCE_DIVISOR = 100_000
+MUNICIPALITY_DIVISOR = 1_000
+
+ROMAN_NUMERALS = {
+    "i": 1, "ii": 2, "iii": 3, "iv": 4, "v": 5, "vi": 6, "vii": 7,
+    "viii": 8, "ix": 9, "x": 10, "xi": 11, "xii": 12, "xiii": 13,
+}
+
+# Region spellings used in the sources that cannot be derived from the PSGC labels
+REGION_ALIASES = {
+    "ncr": 1300000000,
+    "metro manila": 1300000000,
+    "car": 1400000000,
+    "caraga": 1600000000,
+    "mimaropa": 1700000000,
+    "4b": 1700000000,
+    "4-b": 1700000000,
+    "iv-b": 1700000000,
+    "armm": 1900000000,
+    "barmm": 1900000000,
+}
+
+
+# -----------------------------------------------------------------------
+# Helper functions → PSGC prefix math
+# -----------------------------------------------------------------------
+def psgc_level(code: int) -> str:
+    if code % REGION_DIVISOR == 0:
+        return "Region"
+    if code % PROVINCE_DIVISOR == 0:
+        return "Province"
+    if code % MUNICIPALITY_DIVISOR == 0:
+        return "Municipality"
+    return "Barangay"
+
+def region_of(code: int) -> int:
+    return code // REGION_DIVISOR * REGION_DIVISOR
+
+def province_of(code: int) -> int:
+    return code // PROVINCE_DIVISOR * PROVINCE_DIVISOR
+
+LEVEL_RANK = {"Region": 0, "Province": 1, "Municipality": 2, "Barangay": 3}
+
+
+# -----------------------------------------------------------------------
+# Helper function → normalize a place name for lookup
+# -----------------------------------------------------------------------
+def normalize_place(text: str) -> str:
+    text = str(text).casefold()
+    text = re.sub(r"[^\w\s-]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+def label_aliases(label: str):
+    """All lookup keys for one PSGC label, e.g. 'Region III (Central Luzon)' → region iii, central luzon, region 3, iii, 3."""
+    aliases = set()
+    outer = re.sub(r"\(.*?\)", "", label)
+    aliases.add(normalize_place(outer))
+    for inner in re.findall(r"\((.*?)\)", label):
+        aliases.add(normalize_place(inner))
+
+    city = re.match(r"^City of (.+)$", outer.strip(), flags=re.IGNORECASE)
+    if city:
+        aliases.add(normalize_place(city.group(1)))
+        aliases.add(normalize_place(f"{city.group(1)} City"))
+
+    region = re.match(r"^region ([ivx]+|\d+)(-a)?$", normalize_place(outer))
+    if region:
+        numeral, suffix = region.groups()
+        number = ROMAN_NUMERALS.get(numeral, numeral)
+        suffix = suffix or ""
+        for key in (numeral, str(number)):
+            aliases.add(f"{key}{suffix}")
+            aliases.add(f"region {key}{suffix}")
+            if suffix:
+                aliases.add(f"{key}a")
+                aliases.add(f"region {key}a")
+
+    aliases.discard("")
+    return aliases
+
+
+# -----------------------------------------------------------------------
+# Gazetteer: place name → PSGC codes
+# -----------------------------------------------------------------------
+class Gazetteer:
+    """
+    Lookup from free-text place names (as written in gda.csv, NDRRMC and DROMIC tables)
+    to PSGC codes, built from the labels in psgc_rdf.ttl.
+    """
+
+    __slots__ = ("names", "labels")
+
+    def __init__(self):
+        self.names = {}     # alias → set of PSGC codes
+        self.labels = {}    # PSGC code → label
+
+    def add(self, label: str, code: int):
+        self.labels[code] = label
+        for alias in label_aliases(label):
+            self.names.setdefault(alias, set()).add(code)
+
+    def candidates(self, key: str) -> set:
+        if key in REGION_ALIASES:
+            return {REGION_ALIASES[key]}
+        # "4" / "IV" before the IV-A / IV-B split covers both regions
+        if key in ("4", "iv", "region 4", "region iv"):
+            return {400000000, 1700000000}
+        codes = self.names.get(key) or self.names.get(re.sub(r" (province|island)$", "", key))
+        return set(codes or ())
+
+    def resolve(self, text) -> tuple:
+        """
+        PSGC codes for a place name. Names shared across levels resolve to the highest level;
+        names shared by several municipalities are ambiguous and resolve to nothing.
+        Comma-separated names ("San Juan, La Union") are resolved inside their last component.
+        """
+        if text is None:
+            return ()
+        parts = [normalize_place(p) for p in str(text).split(",") if normalize_place(p)]
+        if not parts:
+            return ()
+
+        context = self.candidates(parts[-1])
+        for part in parts[:-1]:
+            codes = self.candidates(part)
+            if context:
+                codes = {c for c in codes if any(within(c, parent) for parent in context)}
+            if codes:
+                return pick_top(codes)
+        return pick_top(context)
+
+
+def within(code: int, parent: int) -> bool:
+    """True when `code` lies inside `parent` (or is it)."""
+    for divisor in (REGION_DIVISOR, PROVINCE_DIVISOR, MUNICIPALITY_DIVISOR, 1):
+        if parent % divisor == 0:
+            return code // divisor == parent // divisor
+    return False
+
+def pick_top(codes) -> tuple:
+    if not codes:
+        return ()
+    top = min(LEVEL_RANK[psgc_level(c)] for c in codes)
+    codes = sorted(c for c in codes if LEVEL_RANK[psgc_level(c)] == top)
+    if len(codes) > 1 and top >= LEVEL_RANK["Municipality"]:
+        return ()
+    return tuple(codes)
+
+def load_gazetteer(path: str = PSGC_RDF_PATH) -> Gazetteer:
+    g = Graph()
+    g.parse(path)
+
+    gazetteer = Gazetteer()
+    for uri, psgc in g.subject_objects(SKG["psgc"]):
+        label = g.value(subject=uri, predicate=RDFS.label)
+        if label is not None:
+            gazetteer.add(str(label), int(psgc))
+    return gazetteer
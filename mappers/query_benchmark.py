@@ -0,0 +1,128 @@
+import sys
+import time
+import statistics
+
+from query_service import QueryService
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+RUNS = 20   # timed runs per query after the first (cold) run
+
+# Representative dashboard queries and their latency targets (milliseconds)
+#   cold_ms → first run on a freshly loaded graph (prepared + evaluated)
+#   warm_ms → repeated run served from the result cache
+BENCHMARK_QUERIES = [
+    {
+        "name": "municipalities_per_region",
+        "cold_ms": 1500,
+        "warm_ms": 5,
+        "query": """
+            SELECT ?region (COUNT(?muni) AS ?n) WHERE {
+                ?region a :Region .
+                ?muni a :Municipality ;
+                      :isPartOf ?region .
+            } GROUP BY ?region
+        """,
+    },
+    {
+        "name": "locations_in_region",
+        "cold_ms": 300,
+        "warm_ms": 5,
+        "query": """
+            SELECT ?loc ?label WHERE {
+                ?loc :isPartOf :Region_III ;
+                     rdfs:label ?label .
+            }
+        """,
+    },
+    {
+        "name": "events_per_region",
+        "cold_ms": 1500,
+        "warm_ms": 5,
+        "query": """
+            SELECT ?region (COUNT(DISTINCT ?event) AS ?n) WHERE {
+                ?event :hasLocation ?loc .
+                ?loc :isPartOf ?region .
+                ?region a :Region .
+            } GROUP BY ?region
+        """,
+    },
+    {
+        "name": "dead_per_province",
+        "cold_ms": 1500,
+        "warm_ms": 5,
+        "query": """
+            SELECT ?province (SUM(?dead) AS ?total) WHERE {
+                ?event :hasLocation ?loc ;
+                       :hasImpact ?impact .
+                ?impact :dead ?dead .
+                ?loc :isPartOf ?province .
+                ?province a :Province .
+            } GROUP BY ?province
+        """,
+    },
+    {
+        "name": "events_per_type_and_year",
+        "cold_ms": 1000,
+        "warm_ms": 5,
+        "query": """
+            SELECT ?type ?year (COUNT(?event) AS ?n) WHERE {
+                ?event :hasType ?type ;
+                       :startDate ?start .
+                BIND(SUBSTR(STR(?start), 1, 4) AS ?year)
+            } GROUP BY ?type ?year
+        """,
+    },
+]
+
+
+# -----------------------------------------------------------------------
+# Benchmark runner
+# -----------------------------------------------------------------------
+def time_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def run_benchmark(service: QueryService, runs: int = RUNS) -> list:
+    results = []
+    for spec in BENCHMARK_QUERIES:
+        query = spec["query"]
+
+        cold = time_ms(lambda: service.query(query))
+        uncached = [time_ms(lambda: service.query(query, use_cache=False)) for _ in range(runs)]
+        warm = [time_ms(lambda: service.query(query)) for _ in range(runs)]
+
+        results.append({
+            "name": spec["name"],
+            "rows": len(service.query(query)),
+            "cold_ms": cold,
+            "uncached_p50_ms": statistics.median(uncached),
+            "warm_p95_ms": percentile(warm, 0.95),
+            "passed": cold <= spec["cold_ms"] and percentile(warm, 0.95) <= spec["warm_ms"],
+        })
+    return results
+
+
+# -----------------------------------------------------------------------
+# Run → python query_benchmark.py
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    start = time.perf_counter()
+    service = QueryService()
+    print(f"🔎 Loaded {len(service.graph)} triples in {time.perf_counter() - start:.2f}s "
+          f"({len(service.ancestors)} locations in the isPartOf closure)")
+
+    results = run_benchmark(service)
+    for r in results:
+        mark = "✔" if r["passed"] else "❌"
+        print(f"{mark} {r['name']:<28} rows={r['rows']:<6} cold={r['cold_ms']:8.1f}ms "
+              f"uncached p50={r['uncached_p50_ms']:8.1f}ms  cached p95={r['warm_p95_ms']:6.2f}ms")
+
+    sys.exit(0 if all(r["passed"] for r in results) else 1)
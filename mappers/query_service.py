@@ -0,0 +1,208 @@
+import os
+import glob
+from rdflib import Graph, URIRef, Namespace
+from rdflib.namespace import RDF, RDFS, XSD
+from rdflib.plugins.sparql import prepareQuery
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+ONTOLOGY_PATH = "../ontology/sakunagraph.ttl"
+PSGC_RDF_PATH = "psgc_rdf.ttl"
+EVENT_GRAPH_GLOB = "events/*.ttl"       # mapped event data, one Turtle file per source/batch
+INFERRED_PATH = "inferred.ttl"          # RDFS / OWL-RL entailments materialized by owl_inference.py
+RESULT_CACHE_SIZE = 256
+
+SKG = Namespace("https://sakuna.ph/")
+IS_PART_OF = SKG["isPartOf"]
+
+PREFIXES = {
+    "skg": SKG,
+    "rdf": RDF,
+    "rdfs": RDFS,
+    "xsd": XSD,
+}
+
+ADMIN_LEVELS = ["Barangay", "Municipality", "Province", "Region"]
+
+
+# -----------------------------------------------------------------------
+# Helper function → cheap change check for a loaded file
+# -----------------------------------------------------------------------
+def file_stamp(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+# -----------------------------------------------------------------------
+# Query service
+# -----------------------------------------------------------------------
+class QueryService:
+    """
+    Loads the combined graph (ontology + PSGC locations + event data) once and serves
+    SPARQL queries over it.
+
+    - `:isPartOf` is transitive in the ontology; its closure is materialized into the graph
+      (and into Python lookup tables) so hierarchy aggregates need no property paths.
+    - Prepared queries are cached by query text.
+    - Results are cached per (query, bindings) and dropped whenever the graph changes; a
+      loaded file edited on disk is picked up by reloading every source.
+    """
+
+    def __init__(self, paths=None):
+        self.graph = Graph()
+        for prefix, namespace in PREFIXES.items():
+            self.graph.bind(prefix, namespace, override=True)
+
+        self.version = 0
+        self._prepared = {}
+        self._results = {}
+        self._closure_triples = set()
+        self._asserted = set()  # triples passed to add(): kept across closure refreshes and reloads
+        self._sources = {}      # loaded file → size:mtime when parsed
+        self._seen_len = None
+
+        self.ancestors = {}     # location → (parent, grandparent, ...)
+        self.descendants = {}   # location → set of every location inside it
+        self.level = {}         # location → Barangay / Municipality / Province / Region
+
+        if paths is None:
+            paths = [ONTOLOGY_PATH, PSGC_RDF_PATH] + sorted(glob.glob(EVENT_GRAPH_GLOB))
+            if os.path.exists(INFERRED_PATH):
+                paths.append(INFERRED_PATH)     # type roll-ups become plain triple lookups
+        for path in paths:
+            self._parse(path)
+        self._refresh()
+
+    # ---------------- graph changes ----------------
+
+    def _parse(self, path: str):
+        self._sources[path] = file_stamp(path)
+        self.graph.parse(path)
+
+    def load(self, path: str):
+        """Parse another Turtle file (e.g. a newly mapped event batch) into the graph."""
+        self._parse(path)
+        self._refresh()
+
+    def add(self, triples):
+        for triple in triples:
+            self.graph.add(triple)
+            self._asserted.add(triple)
+            self._closure_triples.discard(triple)   # now stated, so a refresh must not remove it
+        self._refresh()
+
+    def remove(self, triples):
+        for triple in triples:
+            self.graph.remove(triple)
+            self._asserted.discard(triple)
+            self._closure_triples.discard(triple)
+        self._refresh()
+
+    def reload(self):
+        """Re-parse every loaded file (one was edited on disk), keeping the triples added since."""
+        self.graph.remove((None, None, None))
+        self._closure_triples = set()
+        for path in list(self._sources):
+            if os.path.exists(path):
+                self._parse(path)
+            else:
+                del self._sources[path]
+        for triple in self._asserted:
+            self.graph.add(triple)
+        self._refresh()
+
+    def _refresh(self):
+        """Recompute the isPartOf closure and invalidate cached results."""
+        for triple in self._closure_triples:
+            self.graph.remove(triple)
+        self._closure_triples = set()
+        self._build_closure()
+        self.version += 1
+        self._results.clear()
+        self._seen_len = len(self.graph)
+
+    def _check_external_changes(self):
+        # a loaded file rewritten on disk (even with as many triples as before): reload all sources
+        if any(file_stamp(path) != stamp for path, stamp in self._sources.items()):
+            self.reload()
+        # the graph is a public attribute; a size change means someone edited it directly
+        elif len(self.graph) != self._seen_len:
+            self._refresh()
+
+    # ---------------- isPartOf closure ----------------
+
+    def _build_closure(self):
+        parents = {}
+        for child, parent in self.graph.subject_objects(IS_PART_OF):
+            parents.setdefault(child, []).append(parent)
+
+        self.level = {}
+        for level in ADMIN_LEVELS:
+            for location in self.graph.subjects(RDF.type, SKG[level]):
+                self.level[location] = level
+
+        self.ancestors = {}
+        for location in parents:
+            chain, stack, seen = [], list(parents[location]), {location}
+            while stack:
+                parent = stack.pop(0)
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                chain.append(parent)
+                stack.extend(parents.get(parent, ()))
+            self.ancestors[location] = tuple(chain)
+
+        self.descendants = {}
+        for location, chain in self.ancestors.items():
+            for ancestor in chain:
+                self.descendants.setdefault(ancestor, set()).add(location)
+                triple = (location, IS_PART_OF, ancestor)
+                if triple not in self.graph:
+                    self.graph.add(triple)
+                    self._closure_triples.add(triple)
+
+    def rollup(self, location: URIRef, level: str = "Region"):
+        """The enclosing location at `level` (a location at that level rolls up to itself)."""
+        if self.level.get(location) == level:
+            return location
+        for ancestor in self.ancestors.get(location, ()):
+            if self.level.get(ancestor) == level:
+                return ancestor
+        return None
+
+    def is_within(self, location: URIRef, container: URIRef) -> bool:
+        return location == container or container in self.ancestors.get(location, ())
+
+    # ---------------- queries ----------------
+
+    def prepare(self, query: str):
+        prepared = self._prepared.get(query)
+        if prepared is None:
+            # rdflib's initNs cannot carry the default ":" prefix, so declare it in the query
+            prepared = prepareQuery(f"PREFIX : <{SKG}>\n{query}", initNs=PREFIXES)
+            self._prepared[query] = prepared
+        return prepared
+
+    def query(self, query: str, bindings: dict = None, use_cache: bool = True) -> list:
+        """Run a SPARQL query; rows are returned as tuples and cached until the graph changes."""
+        self._check_external_changes()
+        key = (query, tuple(sorted((bindings or {}).items())))
+        if use_cache and key in self._results:
+            return self._results[key]
+
+        rows = [tuple(row) for row in self.graph.query(self.prepare(query), initBindings=bindings or {})]
+
+        if use_cache:
+            if len(self._results) >= RESULT_CACHE_SIZE:
+                self._results.pop(next(iter(self._results)))
+            self._results[key] = rows
+        return rows
+
+    def clear_cache(self):
+        self._results.clear()
@@ -0,0 +1,347 @@
+import os
+import sys
+import json
+import glob
+import zlib
+import struct
+from bisect import bisect_right
+
+import numpy as np
+from rdflib import Graph
+from rdflib.util import from_n3
+
+from query_service import EVENT_GRAPH_GLOB
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+ONTOLOGY_PATH = "../ontology/sakunagraph.ttl"
+PSGC_RDF_PATH = "psgc_rdf.ttl"
+INFERRED_PATH = "inferred.ttl"
+BUNDLE_PATH = "sakunagraph.rdfb"
+
+MAGIC = b"SKGRDFB2"
+ALIGN = 8
+TERM_BLOCK = 16                 # terms per front-coded dictionary block
+TRIPLE_BLOCK = 4096             # rows per compressed index block
+ZLIB_LEVEL = 9
+# each index stores its rows sorted by these three columns
+INDEXES = {"spo": (0, 1, 2), "pos": (1, 2, 0), "osp": (2, 0, 1)}
+MAX_ID = 2**32 - 1
+
+
+# -----------------------------------------------------------------------
+# Encoding → front-coded dictionary blocks, delta + zlib index blocks
+# -----------------------------------------------------------------------
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+def read_varint(data, position: int) -> tuple:
+    n = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, position
+        shift += 7
+
+def front_code(terms: list) -> bytes:
+    """
+    One dictionary block: the first term whole, every later one as (length of the prefix it
+    shares with the term before it, suffix length, suffix). Sorted IRIs share long prefixes.
+    """
+    out = bytearray()
+    previous = b""
+    for term in terms:
+        shared = len(os.path.commonprefix((previous, term)))
+        out += varint(shared) + varint(len(term) - shared) + term[shared:]
+        previous = term
+    return bytes(out)
+
+def front_decode(block: bytes) -> list:
+    terms = []
+    previous = b""
+    position = 0
+    while position < len(block):
+        shared, position = read_varint(block, position)
+        length, position = read_varint(block, position)
+        previous = previous[:shared] + block[position : position + length]
+        position += length
+        terms.append(previous)
+    return terms
+
+def encode_rows(rows: np.ndarray) -> bytes:
+    """
+    Sorted (n, 3) id rows → zlib of three uint32 columns: the first as deltas, the others as
+    deltas while the columns before them repeat and as plain ids where those change.
+    """
+    rows = rows.astype(np.int64)
+    deltas = rows.copy()
+    deltas[1:, 0] = np.diff(rows[:, 0])
+    same = np.ones(len(rows) - 1, dtype=bool)
+    for column in (1, 2):
+        same &= rows[1:, column - 1] == rows[:-1, column - 1]
+        deltas[1:, column] = np.where(same, rows[1:, column] - rows[:-1, column], rows[1:, column])
+    return zlib.compress(np.ascontiguousarray(deltas.T, dtype="<u4").tobytes(), ZLIB_LEVEL)
+
+def _restart_cumsum(values: np.ndarray, restarts: np.ndarray) -> np.ndarray:
+    """Running sum of `values` that starts over wherever `restarts` is True."""
+    total = np.cumsum(values)
+    return total - np.maximum.accumulate(np.where(restarts, total - values, 0))
+
+def decode_rows(payload: bytes, n: int) -> np.ndarray:
+    deltas = np.frombuffer(zlib.decompress(payload), dtype="<u4").reshape(3, n).astype(np.int64)
+    columns = [np.cumsum(deltas[0])]
+    restarts = np.zeros(n, dtype=bool)
+    restarts[0] = True
+    for column in (1, 2):
+        restarts[1:] |= columns[-1][1:] != columns[-1][:-1]
+        columns.append(_restart_cumsum(deltas[column], restarts))
+    return np.stack(columns, axis=1).astype(np.uint32)
+
+
+# -----------------------------------------------------------------------
+# Writer → sorted term dictionary + three sorted triple indexes, all in blocks
+# -----------------------------------------------------------------------
+def write_bundle(graph: Graph, path: str = BUNDLE_PATH) -> dict:
+    """
+    File layout (little endian):
+
+        MAGIC | uint32 header length | JSON header | sections, each 8-byte aligned
+
+    Sections:
+        term_offsets / terms    the N-Triples form of every distinct term, UTF-8, sorted
+                                bytewise (so term → id is a binary search), front-coded in
+                                blocks of TERM_BLOCK; uint64 byte offset of each block
+        <index>_first           uint32 (blocks, 3): first row of each block, for the search
+        <index>_offsets         uint64: byte offset of each block in <index>_blocks
+        <index>_blocks          TRIPLE_BLOCK rows per block, delta-coded and zlib'd
+    for each of the SPO / POS / OSP indexes. Offsets and first rows are memory-mapped as is;
+    a lookup decompresses only the blocks its key range touches.
+    """
+    encoded = sorted({term.n3().encode("utf-8") for triple in graph for term in triple})
+    ids = {term: i for i, term in enumerate(encoded)}
+    if len(encoded) > MAX_ID:
+        raise ValueError("bundle term ids are uint32")
+
+    blocks = [front_code(encoded[i : i + TERM_BLOCK]) for i in range(0, len(encoded), TERM_BLOCK)]
+    offsets = np.zeros(len(blocks) + 1, dtype="<u8")
+    np.cumsum([len(b) for b in blocks], out=offsets[1:])
+    triples = np.array(
+        [(ids[s.n3().encode("utf-8")], ids[p.n3().encode("utf-8")], ids[o.n3().encode("utf-8")]) for s, p, o in graph],
+        dtype="<u4",
+    ).reshape(-1, 3)
+
+    sections = [("term_offsets", offsets.tobytes()), ("terms", b"".join(blocks))]
+    for name, order in INDEXES.items():
+        keys = triples[:, order]
+        keys = keys[np.lexsort(keys.T[::-1])]
+        payloads = [encode_rows(keys[i : i + TRIPLE_BLOCK]) for i in range(0, len(keys), TRIPLE_BLOCK)]
+        block_offsets = np.zeros(len(payloads) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in payloads], out=block_offsets[1:])
+        sections.append((f"{name}_first", np.ascontiguousarray(keys[::TRIPLE_BLOCK], dtype="<u4").tobytes()))
+        sections.append((f"{name}_offsets", block_offsets.tobytes()))
+        sections.append((f"{name}_blocks", b"".join(payloads)))
+
+    # section positions depend on the header's length and vice versa: grow the reserved length
+    # until the header fits, then pad it with spaces (valid JSON whitespace) to exactly that
+    header = {
+        "terms": len(encoded), "triples": len(triples),
+        "term_block": TERM_BLOCK, "triple_block": TRIPLE_BLOCK, "sections": {},
+    }
+    reserved = 0
+    while True:
+        position = len(MAGIC) + 4 + reserved
+        position += -position % ALIGN
+        for name, data in sections:
+            header["sections"][name] = [position, len(data)]
+            position += len(data) + (-len(data) % ALIGN)
+        header_bytes = json.dumps(header).encode()
+        if len(header_bytes) <= reserved:
+            header_bytes = header_bytes.ljust(reserved)
+            break
+        reserved = len(header_bytes)
+    start = len(MAGIC) + 4 + len(header_bytes)
+
+    with open(path, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes)
+        f.write(b"\0" * (header["sections"]["term_offsets"][0] - start))
+        for name, data in sections:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % ALIGN))
+    return header
+
+
+# -----------------------------------------------------------------------
+# Reader → memory-mapped triple pattern lookups, nothing parsed up front
+# -----------------------------------------------------------------------
+class RdfBundle:
+    """
+    Open a bundle without loading it: the file is memory-mapped and only the blocks a lookup
+    touches are read and decoded.
+
+        bundle = RdfBundle("sakunagraph.rdfb")
+        for s, p, o in bundle.triples((None, RDF.type, SKG.Region)): ...
+    """
+
+    def __init__(self, path: str = BUNDLE_PATH):
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(self.data[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not an RDF bundle (or was written by an older version)")
+        (length,) = struct.unpack("<I", bytes(self.data[len(MAGIC) : len(MAGIC) + 4]))
+        self.header = json.loads(bytes(self.data[len(MAGIC) + 4 : len(MAGIC) + 4 + length]))
+        self.term_block = self.header["term_block"]
+        self.triple_block = self.header["triple_block"]
+        self.term_offsets = self._section("term_offsets", "<u8")
+        self.terms = self._section("terms", np.uint8)
+        self.indexes = {
+            name: (
+                self._section(f"{name}_first", "<u4").reshape(-1, 3),
+                self._section(f"{name}_offsets", "<u8"),
+                self._section(f"{name}_blocks", np.uint8),
+            )
+            for name in INDEXES
+        }
+        self._decoded = {}
+        self._first_terms = {}
+
+    def _section(self, name: str, dtype):
+        start, length = self.header["sections"][name]
+        return self.data[start : start + length].view(dtype)
+
+    def __len__(self):
+        return self.header["triples"]
+
+    # ---------------- dictionary ----------------
+
+    def _term_block(self, block: int) -> list:
+        return front_decode(bytes(self.terms[self.term_offsets[block] : self.term_offsets[block + 1]]))
+
+    def _first_term(self, block: int) -> bytes:
+        """First term of a dictionary block (stored whole, so no neighbours are decoded)."""
+        term = self._first_terms.get(block)
+        if term is None:
+            data = self.terms[self.term_offsets[block] : self.term_offsets[block + 1]]
+            _, position = read_varint(data, 0)
+            length, position = read_varint(data, position)
+            term = self._first_terms[block] = bytes(data[position : position + length])
+        return term
+
+    def term(self, term_id: int):
+        term = self._decoded.get(term_id)
+        if term is None:
+            encoded = self._term_block(term_id // self.term_block)[term_id % self.term_block]
+            term = self._decoded[term_id] = from_n3(encoded.decode("utf-8"))
+        return term
+
+    def term_id(self, term):
+        """Binary search over the blocks' first terms, then within one block; None when the term does not occur."""
+        key = term.n3().encode("utf-8")
+        lo, hi = 0, len(self.term_offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._first_term(mid) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        block = lo - 1
+        terms = self._term_block(block)
+        position = bisect_right(terms, key) - 1
+        return block * self.term_block + position if position >= 0 and terms[position] == key else None
+
+    # ---------------- triple patterns ----------------
+
+    def _index_for(self, bound):
+        s, p, o = bound
+        if s is not None:
+            return ("osp", (o, s, p)) if o is not None and p is None else ("spo", (s, p, o))
+        if p is not None:
+            return "pos", (p, o, s)
+        return "osp", (o, s, p)
+
+    def _rows(self, name: str, prefix: list) -> np.ndarray:
+        """Rows of one index whose leading columns equal `prefix`, decoding only the blocks they can be in."""
+        first, offsets, payload = self.indexes[name]
+        if not len(first):
+            return np.empty((0, 3), dtype=np.uint32)
+        low = tuple(prefix + [0] * (3 - len(prefix)))
+        high = tuple(prefix + [MAX_ID] * (3 - len(prefix)))
+        begin = max(self._last_block_at_or_before(first, low), 0)
+        end = max(self._last_block_at_or_before(first, high), 0) + 1
+
+        rows = []
+        for block in range(begin, end):
+            n = min(self.triple_block, len(self) - block * self.triple_block)
+            rows.append(decode_rows(bytes(payload[offsets[block] : offsets[block + 1]]), n))
+        rows = np.concatenate(rows)
+
+        lo, hi = 0, len(rows)
+        for column, value in enumerate(prefix):
+            window = rows[lo:hi, column]
+            lo, hi = lo + int(np.searchsorted(window, value, "left")), lo + int(np.searchsorted(window, value, "right"))
+        return rows[lo:hi]
+
+    @staticmethod
+    def _last_block_at_or_before(first: np.ndarray, key: tuple) -> int:
+        """Index of the last block whose first row is <= key (lexicographically); -1 if none."""
+        lo, hi = 0, len(first)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tuple(first[mid]) <= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def ids(self, pattern):
+        """Matching triples as an (n, 3) array of term ids in s, p, o order."""
+        bound = []
+        for term in pattern:
+            if term is None:
+                bound.append(None)
+                continue
+            term_id = self.term_id(term)
+            if term_id is None:
+                return np.empty((0, 3), dtype=np.uint32)
+            bound.append(term_id)
+
+        name, key = self._index_for(bound)
+        prefix = []
+        for value in key:
+            if value is None:
+                break
+            prefix.append(value)
+        return self._rows(name, prefix)[:, np.argsort(INDEXES[name])]
+
+    def count(self, pattern) -> int:
+        return len(self.ids(pattern))
+
+    def triples(self, pattern=(None, None, None)):
+        for s, p, o in self.ids(pattern):
+            yield self.term(int(s)), self.term(int(p)), self.term(int(o))
+
+    def __contains__(self, triple) -> bool:
+        return self.count(triple) > 0
+
+
+# -----------------------------------------------------------------------
+# Run → bundle the ontology, PSGC locations, event data and inferences
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    out_path = sys.argv[1] if len(sys.argv) > 1 else BUNDLE_PATH
+    paths = sys.argv[2:] or [ONTOLOGY_PATH, PSGC_RDF_PATH] + sorted(glob.glob(EVENT_GRAPH_GLOB)) + glob.glob(INFERRED_PATH)
+
+    g = Graph()
+    for path in paths:
+        g.parse(path)
+    header = write_bundle(g, out_path)
+    print(f"✔ Saved {header['triples']} triples / {header['terms']} terms: {out_path}")
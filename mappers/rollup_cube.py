@@ -0,0 +1,342 @@
+import os
+import json
+import hashlib
+from array import array
+
+import numpy as np
+
+from event_store import EventStore, Vocabulary, IMPACT_MEASURES, STORE_PATH, NO_DATE
+from psgc_gazetteer import load_gazetteer, psgc_level, region_of, province_of, within, LEVEL_RANK
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+CUBE_PATH = "rollup_cube.npz"
+ROLLUP_MEASURES = ["events"] + IMPACT_MEASURES     # "events" counts events; the rest sum reported impacts
+ALL_PLACES = 0                  # place code of the whole-country rows
+ALL_HAZARDS = "*"               # hazard of the every-hazard rows
+
+
+# -----------------------------------------------------------------------
+# Helper functions → months, event identity, the cells an event rolls up into
+# -----------------------------------------------------------------------
+def day_to_month(day: int) -> int:
+    """Months since 1970-01 for a day number from event_store.to_day."""
+    return int(np.datetime64(int(day), "D").astype("datetime64[M]").astype(np.int64))
+
+def to_month(value, year_end: bool = False) -> int:
+    """Months since 1970-01 for "YYYY", "YYYY-MM" or "YYYY-MM-DD"; a bare year is its January (or December)."""
+    value = str(value)
+    if len(value) < 7:
+        value = f"{value[:4]}-{12 if year_end else 1:02d}"
+    return int(np.datetime64(value[:7], "M").astype(np.int64))
+
+def month_label(month: int) -> str:
+    return str(np.datetime64(int(month), "M"))
+
+def event_keys(store: EventStore) -> list:
+    """Content hash of every stored event, with an occurrence suffix so identical events stay distinct."""
+    seen = {}
+    keys = []
+    for event_id in range(len(store)):
+        record = store.record(event_id)
+        content = [record.source, record.name, record.startDate, record.endDate, record.hazards, record.locations, record.impacts]
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        seen[digest] = seen.get(digest, 0) + 1
+        keys.append(f"{digest}#{seen[digest]}")
+    return keys
+
+def event_places(store: EventStore, event_id: int) -> set:
+    """The whole country plus every region and province the event touches."""
+    l0, l1 = store.location_offsets[event_id], store.location_offsets[event_id + 1]
+    places = {ALL_PLACES}
+    for code in store.location_codes[l0:l1]:
+        for psgc in store.location_psgc[code]:
+            places.add(region_of(psgc))
+            if LEVEL_RANK[psgc_level(psgc)] >= LEVEL_RANK["Province"]:
+                places.add(province_of(psgc))
+    return places
+
+def event_hazards(store: EventStore, event_id: int) -> list:
+    h0, h1 = store.hazard_offsets[event_id], store.hazard_offsets[event_id + 1]
+    return [ALL_HAZARDS] + [store.hazards.decode(c) for c in store.hazard_codes[h0:h1]]
+
+
+# -----------------------------------------------------------------------
+# Rollup cube
+# -----------------------------------------------------------------------
+class RollupCube:
+    """
+    Impact totals by (month × place × hazard), for dashboards that would otherwise group
+    the raw events on every request.
+
+    Every event adds its impacts to each cell it belongs to: its start month, each of
+    {whole country, every region and province it touches} and each of {every hazard, its
+    type, each subtype}. A multi-region event therefore counts fully in each of its
+    regions — per-place totals answer "events touching this place", and only the
+    ALL_PLACES / ALL_HAZARDS rows add up without double counting.
+
+    Only cells that occur are stored, as rows of prefix sums over the months that occur,
+    so the total over any month range is two lookups and a subtraction. Adding events that
+    fall into existing cells and months updates the prefix sums in place; a new cell or
+    month re-materializes the (compact) cube from the stored facts.
+    """
+
+    def __init__(self, measures=ROLLUP_MEASURES):
+        self.measures = list(measures)
+        self.keys = []                      # event key per cube event (see event_keys)
+        self.key_set = set()
+        self.undated = 0                    # events without a start date (not in the cube)
+
+        # facts: one per (event, place, hazard) cell membership; event values are stored once
+        self.event_month = array("i")
+        self.event_values = array("d")      # len(measures) per event, NaN → 0
+        self.places = Vocabulary([ALL_PLACES])
+        self.hazards = Vocabulary([ALL_HAZARDS])
+        self.fact_event = array("I")
+        self.fact_place = array("I")
+        self.fact_hazard = array("I")
+
+        self.months = np.empty(0, dtype=np.int64)           # months that occur, sorted
+        self.first_month = 0
+        self.month_position = np.zeros(1, dtype=np.int64)   # month - first_month → index into the prefix axis
+        self.cell_row = np.full((1, 1), -1, dtype=np.int64) # (place, hazard) → row, -1 = no events
+        self.prefix = np.zeros((0, 1, len(self.measures)))  # row × (months + 1) × measure
+        self._pending = []                  # events not yet in the prefix sums
+        self._dirty = False                 # a new cell or month: rebuild instead of patching
+
+    def __len__(self):
+        return len(self.event_month)
+
+    # ---------------- writing ----------------
+
+    def add_event(self, store: EventStore, event_id: int, key: str) -> bool:
+        if store.start[event_id] == NO_DATE:
+            self.undated += 1
+            self.keys.append(key)
+            self.key_set.add(key)
+            return False
+
+        index = len(self.event_month)
+        month = day_to_month(store.start[event_id])
+        values = [1.0] + [store.impacts[m][event_id] for m in self.measures[1:]]
+        self.event_month.append(month)
+        self.event_values.extend(0.0 if np.isnan(v) else v for v in values)
+        self.keys.append(key)
+        self.key_set.add(key)
+
+        if not (self.first_month <= month < self.first_month + len(self.month_position) - 1) \
+                or self.month_position[month - self.first_month] == self.month_position[month - self.first_month + 1]:
+            self._dirty = True      # month not on the axis yet
+        for place in event_places(store, event_id):
+            for hazard in event_hazards(store, event_id):
+                p, h = self.places.encode(place), self.hazards.encode(hazard)
+                self.fact_event.append(index)
+                self.fact_place.append(p)
+                self.fact_hazard.append(h)
+                if p >= self.cell_row.shape[0] or h >= self.cell_row.shape[1] or self.cell_row[p, h] < 0:
+                    self._dirty = True
+        self._pending.append(index)
+        return True
+
+    def update(self, store: EventStore) -> int:
+        """
+        Bring the cube in line with `store`: events it has not seen are added; if any event
+        the cube holds is gone from the store (edited or deleted), the cube is rebuilt.
+        Returns how many events were added.
+        """
+        keys = event_keys(store)
+        current = set(keys)
+        if any(key not in current for key in self.key_set):
+            self.__init__(self.measures)
+        added = 0
+        for event_id, key in enumerate(keys):
+            if key not in self.key_set:
+                self.add_event(store, event_id, key)
+                added += 1
+        return added
+
+    # ---------------- materializing ----------------
+
+    def _values(self) -> np.ndarray:
+        return np.array(self.event_values, dtype=np.float64).reshape(-1, len(self.measures))
+
+    def _rebuild(self):
+        event_month = np.array(self.event_month, dtype=np.int64)
+        fact_event = np.array(self.fact_event, dtype=np.int64)
+        fact_place = np.array(self.fact_place, dtype=np.int64)
+        fact_hazard = np.array(self.fact_hazard, dtype=np.int64)
+
+        self.months = np.unique(event_month)
+        self.first_month = int(self.months[0]) if len(self.months) else 0
+        span = int(self.months[-1]) - self.first_month + 1 if len(self.months) else 0
+        # month → number of axis months before it, for every month in the span (and one past it)
+        self.month_position = np.searchsorted(self.months, np.arange(self.first_month, self.first_month + span + 1))
+
+        self.cell_row = np.full((len(self.places), len(self.hazards)), -1, dtype=np.int64)
+        cells = np.unique(fact_place * len(self.hazards) + fact_hazard)
+        self.cell_row.flat[cells] = np.arange(len(cells))
+
+        self.prefix = np.zeros((len(cells), len(self.months) + 1, len(self.measures)))
+        rows = self.cell_row[fact_place, fact_hazard]
+        columns = self.month_position[event_month[fact_event] - self.first_month] + 1
+        np.add.at(self.prefix, (rows, columns), self._values()[fact_event])
+        np.cumsum(self.prefix, axis=1, out=self.prefix)
+        self._pending, self._dirty = [], False
+
+    def _apply_pending(self):
+        values = self._values()
+        fact_event = np.array(self.fact_event, dtype=np.int64)
+        pending = np.isin(fact_event, self._pending)
+        for index, p, h in zip(fact_event[pending], np.array(self.fact_place)[pending], np.array(self.fact_hazard)[pending]):
+            column = self.month_position[self.event_month[index] - self.first_month] + 1
+            self.prefix[self.cell_row[p, h], column:] += values[index]
+        self._pending = []
+
+    def _refresh(self):
+        if self._dirty:
+            self._rebuild()
+        elif self._pending:
+            self._apply_pending()
+
+    # ---------------- reading ----------------
+
+    def _columns(self, start=None, end=None):
+        """Prefix-axis bounds (lo, hi) of the months from `start` through `end` (inclusive)."""
+        last = len(self.month_position) - 1
+        lo = 0 if start is None else int(np.clip(to_month(start) - self.first_month, 0, last))
+        hi = last if end is None else int(np.clip(to_month(end, year_end=True) - self.first_month + 1, 0, last))
+        return self.month_position[lo], self.month_position[max(lo, hi)]
+
+    def _row(self, psgc=None, hazard=None) -> int:
+        p = self.places.codes.get(ALL_PLACES if psgc is None else int(psgc))
+        h = self.hazards.codes.get(ALL_HAZARDS if hazard is None else hazard)
+        return -1 if p is None or h is None else int(self.cell_row[p, h])
+
+    def total(self, measure: str, psgc=None, hazard=None, start=None, end=None) -> float:
+        """
+        Sum of `measure` over events starting from `start` through `end` ("YYYY", "YYYY-MM"
+        or a date; both inclusive) that touch `psgc` (a region or province code; None = the
+        whole country) and have `hazard` as type or subtype (None = any).
+        """
+        self._refresh()
+        row = self._row(psgc, hazard)
+        if row < 0:
+            return 0.0
+        lo, hi = self._columns(start, end)
+        m = self.measures.index(measure)
+        return float(self.prefix[row, hi, m] - self.prefix[row, lo, m])
+
+    def breakdown(self, measure: str, by: str, psgc=None, hazard=None, start=None, end=None) -> dict:
+        """
+        `total` for every region / province (by="region", "province"; within `psgc` when given)
+        or every hazard (by="hazard"), skipping zeros.
+        """
+        self._refresh()
+        lo, hi = self._columns(start, end)
+        m = self.measures.index(measure)
+
+        if by == "hazard":
+            p = self.places.codes.get(ALL_PLACES if psgc is None else int(psgc))
+            if p is None:
+                return {}
+            keys = self.hazards.values[1:]
+            rows = self.cell_row[p, 1:]
+        else:
+            h = self.hazards.codes.get(ALL_HAZARDS if hazard is None else hazard)
+            if h is None:
+                return {}
+            level = "Region" if by == "region" else "Province"
+            codes = [
+                (i, code) for i, code in enumerate(self.places.values)
+                if code != ALL_PLACES and psgc_level(code) == level
+                and (psgc is None or within(code, int(psgc)))
+            ]
+            keys = [code for _, code in codes]
+            rows = self.cell_row[[i for i, _ in codes], h] if codes else np.empty(0, dtype=np.int64)
+
+        present = rows >= 0
+        sums = self.prefix[rows[present], hi, m] - self.prefix[rows[present], lo, m]
+        return {key: float(v) for key, v in zip(np.array(keys, dtype=object)[present], sums) if v}
+
+    def series(self, measure: str, psgc=None, hazard=None, start=None, end=None, freq: str = "year") -> dict:
+        """`total` per month ("YYYY-MM") or per year ("YYYY") over the range, skipping zeros."""
+        self._refresh()
+        row = self._row(psgc, hazard)
+        if row < 0 or not len(self.months):
+            return {}
+        lo, hi = self._columns(start, end)
+        m = self.measures.index(measure)
+        months = self.months[lo:hi]
+        if freq == "month":
+            values = np.diff(self.prefix[row, lo:hi + 1, m])
+            return {month_label(k): float(v) for k, v in zip(months, values) if v}
+
+        years = np.unique(months.astype("datetime64[M]").astype("datetime64[Y]"))
+        bounds = np.searchsorted(self.months, years.astype("datetime64[M]").astype(np.int64))
+        bounds = np.clip(np.append(bounds, hi), lo, hi)
+        values = self.prefix[row, bounds[1:], m] - self.prefix[row, bounds[:-1], m]
+        return {str(y): float(v) for y, v in zip(years, values) if v}
+
+    # ---------------- persistence ----------------
+
+    def save(self, path: str = CUBE_PATH):
+        """Store the facts; the prefix sums are rebuilt on load (one vectorized pass)."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            event_month=np.array(self.event_month, dtype=np.int32),
+            event_values=self._values(),
+            fact_event=np.array(self.fact_event, dtype=np.uint32),
+            fact_place=np.array(self.fact_place, dtype=np.uint32),
+            fact_hazard=np.array(self.fact_hazard, dtype=np.uint32),
+            vocabularies=np.array(json.dumps({
+                "measures": self.measures,
+                "places": self.places.values,
+                "hazards": self.hazards.values,
+                "keys": self.keys,
+                "undated": self.undated,
+            })),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CUBE_PATH) -> "RollupCube":
+        data = np.load(path)
+        vocab = json.loads(str(data["vocabularies"]))
+
+        cube = cls(measures=vocab["measures"])
+        cube.places = Vocabulary(vocab["places"])
+        cube.hazards = Vocabulary(vocab["hazards"])
+        cube.keys = vocab["keys"]
+        cube.key_set = set(cube.keys)
+        cube.undated = vocab["undated"]
+
+        cube.event_month = array("i", data["event_month"].tobytes())
+        cube.event_values = array("d", data["event_values"].astype(np.float64).tobytes())
+        cube.fact_event = array("I", data["fact_event"].tobytes())
+        cube.fact_place = array("I", data["fact_place"].tobytes())
+        cube.fact_hazard = array("I", data["fact_hazard"].tobytes())
+        cube._dirty = True
+        return cube
+
+
+# -----------------------------------------------------------------------
+# Run → fold newly stored events into the saved cube
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    if not os.path.exists(STORE_PATH):
+        raise SystemExit(f"❌ {STORE_PATH} not found — run event_store.py first")
+
+    store = EventStore.load(STORE_PATH)
+    cube = RollupCube.load(CUBE_PATH) if os.path.exists(CUBE_PATH) else RollupCube()
+    added = cube.update(store)
+    cube.save(CUBE_PATH)
+    print(f"✔ Rollup cube: +{added} events ({len(cube)} dated, {cube.undated} undated) → {CUBE_PATH}")
+
+    # e.g. deaths per region from tropical cyclones, 2000–2018
+    labels = load_gazetteer().labels
+    by_region = cube.breakdown("dead", by="region", hazard="Tropical Cyclone", start="2000", end="2018")
+    for psgc, dead in sorted(by_region.items(), key=lambda item: -item[1])[:5]:
+        print(f"   {labels.get(psgc, psgc)}: {dead:.0f} dead")
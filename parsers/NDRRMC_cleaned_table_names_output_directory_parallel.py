@@ -1,5 +1,6 @@
 import os
-import pdfplumber
+import socket
+import sys
 import pandas as pd
 import re
 import json
@@ -7,6 +8,14 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from layout_templates import LayoutCache, CharIndex, page_rulings, ruling_fingerprint
+from sitrep_version_store import SitRepVersionStore, VERSION_DB_NAME, JOURNAL_MODE
+from extraction_backends import open_pdf, CHOICES_FILE
+from ocr_pages import OcrPage, OCR_CACHE_DIR, is_image_only, ocr_pages
+
+sys.path.insert(0, "..")     # repo root
+import pipeline_profiler
+
 # --------------------------
 # CONFIGURATION
 # --------------------------
@@ -16,6 +25,14 @@ OUTPUT_FOLDER = "NDRRMC_PARSED_VER1"    # where parsed folders will be created
 FOLDER_LENGTH = 0
 HEADER_SEARCH_DISTANCE = 80
 ALIGNMENT_TOLERANCE = 5
+EXTRACTION_BACKEND = "auto"             # "auto" benchmarks per PDF; or "pdfplumber" / "pypdfium2"
+TABLE_SETTINGS = {
+    "vertical_strategy": "lines",
+    "horizontal_strategy": "lines",
+    "snap_tolerance": 5,
+}
+VERSION_DB_JOURNAL = JOURNAL_MODE       # work_queue.py switches this to "DELETE" for multi-host runs
+ISO_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$")   # lastUpdateDate once parsed
 
 @dataclass
 class Event:
@@ -43,7 +60,7 @@ def get_lastUpdateDateTime(event, lastUpdateDateTime):
     for fmt in formats:
         try:
             FormatDate = datetime.strptime(lastUpdateDateTime, fmt)
-            event.lastUpdateDateTime = FormatDate.strftime("%Y-%m-%d %H:%M:%S")             # Save in ISO format (YYYY-MM-DD HH:MM:SS)
+            event.lastUpdateDate = FormatDate.strftime("%Y-%m-%d %H:%M:%S")             # Save in ISO format (YYYY-MM-DD HH:MM:SS)
             parsed_date = True
             break
         except ValueError:
@@ -124,12 +141,13 @@ def generate_json(event, output_dir):
     metadata_path = os.path.join(output_dir, "metadata.json")
     source_path = os.path.join(output_dir, "source.json")
 
-    # Save to JSON files
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=4)
-
-    with open(source_path, "w") as f:
-        json.dump(source, f, indent=4)
+    # Save to JSON files (tmp + rename: a re-parsed report never leaves a half-written file;
+    # host + pid in the tmp name, since work_queue.py workers on several hosts share OUTPUT_FOLDER)
+    for path, data in ((metadata_path, metadata), (source_path, source)):
+        tmp_path = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
 
     print(f"✔ Saved metadata: {metadata_path}")
     print(f"✔ Saved source: {source_path}")
@@ -137,15 +155,21 @@ def generate_json(event, output_dir):
 # -----------------------------------------------------------------------
 # Detect alignment + casing of a cell in a table
 # -----------------------------------------------------------------------
-def get_text_alignment_and_case(page, cell_bbox):
-    """Analyze the text geometry and casing inside a table cell."""
+def get_text_alignment_and_case(page, cell_bbox, char_index=None):
+    """
+    Analyze the text geometry and casing inside a table cell. With a `char_index` (layout
+    template hit) the cell's words come from the index instead of cropping the whole page.
+    """
     if not cell_bbox:
         return None, None, ""
 
     # Crop around the cell
     try:
-        cell_crop = page.crop(cell_bbox)
-        words = cell_crop.extract_words()
+        if char_index is not None and char_index.covers(cell_bbox):
+            words = char_index.extract_words(cell_bbox)
+        else:
+            cell_crop = page.crop(cell_bbox)
+            words = cell_crop.extract_words()
     except ValueError:
         return None, None, ""
 
@@ -185,6 +209,24 @@ def get_text_alignment_and_case(page, cell_bbox):
     return alignment, case_type, text
 
 
+# -----------------------------------------------------------------------
+# What an extraction backend has to reproduce on a page
+# -----------------------------------------------------------------------
+def page_rows(page):
+    """Table titles, cell text and location-cell alignment/casing: everything process_pdf reads."""
+    rows = []
+    for table_obj in page.find_tables(TABLE_SETTINGS):
+        top = table_obj.bbox[1]
+        try:
+            rows.append(page.crop((0, max(0, top - HEADER_SEARCH_DISTANCE), page.width, top)).extract_text())
+        except ValueError:
+            rows.append(None)
+        for row_obj, row_text in zip(table_obj.rows, table_obj.extract()):
+            location = get_text_alignment_and_case(page, row_obj.cells[0]) if row_obj.cells else None
+            rows.append((location, row_text))
+    return rows
+
+
 # -----------------------------------------------------------------------
 # MAIN PROCESSOR FOR ONE PDF
 # -----------------------------------------------------------------------
@@ -200,36 +242,61 @@ def process_pdf(pdf_event = Event, file_counter = int, pdf_path = str):
 
     current_title = "Unknown_Section"
     all_tables_buffer = {}  # title → list of row dicts
+    table_as_of = {}        # title → "as of" timestamp from the table title
+    layout_cache = LayoutCache(output_dir)  # layouts already seen in this event's reports
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_index, page in enumerate(pdf.pages, start=1):
+    backend_choices = os.path.join(OUTPUT_FOLDER, CHOICES_FILE)
+    with open_pdf(pdf_path, EXTRACTION_BACKEND, page_rows, backend_choices) as pdf:
+        # scanned pages have no text layer: OCR them up front (cached by page hash) and parse the result like text
+        scanned = {n: page for n, page in enumerate(pdf.pages, start=1) if not page.rotation and is_image_only(page)}
+        ocr_results = ocr_pages(pdf_path, scanned, os.path.join(OUTPUT_FOLDER, OCR_CACHE_DIR)) if scanned else {}
 
-            # detect table structures
-            tables_found = page.find_tables(
-                {
-                    "vertical_strategy": "lines",
-                    "horizontal_strategy": "lines",
-                    "snap_tolerance": 5,
-                }
-            )
+        for page_index, page in enumerate(pdf.pages, start=1):
+            if page_index in ocr_results:
+                page = OcrPage(page, ocr_results[page_index])
+
+            # known layout → build the tables from its column lines, reuse its location column
+            # and title position; full table detection only for new layouts or when that fails
+            vertical_edges, horizontal_edges = page_rulings(page)
+            fingerprint = ruling_fingerprint(page, vertical_edges)
+            template = layout_cache.get(fingerprint)
+            tables_found = template.find_tables(page, vertical_edges, horizontal_edges, TABLE_SETTINGS) if template else None
+            if tables_found is None:
+                # detect table structures
+                tables_found = page.find_tables(TABLE_SETTINGS)
 
             if not tables_found:
                 continue  # skip pages with no tables
 
-            for table_obj in tables_found:
+            page_chars = CharIndex(page) if template else None
+            cell_index = CharIndex(page, template.location_column) if template else None
+
+            for table_index, table_obj in enumerate(tables_found):
                 # extract possible header title above this table
                 x0, top, x1, bottom = table_obj.bbox
+                use_template = template is not None and template.matches(table_obj)
 
                 try:
-                    header_text = page.crop(
-                        (0, max(0, top - HEADER_SEARCH_DISTANCE), page.width, top)
-                    ).extract_text() or ""
+                    header_band = (0, max(0, top - HEADER_SEARCH_DISTANCE), page.width, top)
+                    header_text = ""
+                    if use_template:
+                        header_text = page_chars.title_band_text(template, top, page.width, HEADER_SEARCH_DISTANCE)
+                    if not header_text.strip():
+                        header_crop = page.crop(header_band)
+                        header_text = header_crop.extract_text() or ""
+
+                        # new or changed layout → learn it from the page's first table
+                        if table_index == 0 and not use_template:
+                            title_chars = [c for c in header_crop.chars if c["text"].strip()]
+                            title_top = max((c["top"] for c in title_chars), default=None)
+                            layout_cache.learn(fingerprint, table_obj, title_top)
 
                     lines = [l.strip() for l in header_text.split("\n") if l.strip()]
                     if lines:
                         potential_title = lines[-1]
                         if potential_title.isupper() or len(potential_title) < 100:
                             current_title = clean_tablename(pdf_event, potential_title)
+                            table_as_of[current_title] = pdf_event.lastUpdateDate
                 except Exception:
                     pass
 
@@ -252,7 +319,7 @@ def process_pdf(pdf_event = Event, file_counter = int, pdf_path = str):
                         continue
 
                     loc_bbox = row_obj.cells[0]
-                    align, casing, text = get_text_alignment_and_case(page, loc_bbox)
+                    align, casing, text = get_text_alignment_and_case(page, loc_bbox, cell_index if use_template else None)
 
                     # classify hierarchical location levels
                     if text and "REGION" in text and "PROVINCE" in text:
@@ -299,18 +366,51 @@ def process_pdf(pdf_event = Event, file_counter = int, pdf_path = str):
     # SAVE ALL TABLES FOR THIS PDF
     # ------------------------------
 
+    version_store = SitRepVersionStore(os.path.join(OUTPUT_FOLDER, VERSION_DB_NAME), VERSION_DB_JOURNAL)
+    versioned = False
+    # a title whose "as of" did not parse was still published with the rest of this report
+    report_as_of = max((as_of for as_of in table_as_of.values() if ISO_TIMESTAMP.match(as_of)), default=None)
+
     for title, rows in all_tables_buffer.items():
         if not rows:
             continue
 
         df = pd.DataFrame(rows)
 
+        # keep every "as of" version; the CSV always shows the newest one, whichever report was parsed last
+        as_of = table_as_of.get(title, "")
+        if not ISO_TIMESTAMP.match(as_of) and report_as_of is not None:
+            print(f"   ⚠️ {title}: as of {as_of!r} not understood, using the report's {report_as_of}")
+            as_of = report_as_of
+        if ISO_TIMESTAMP.match(as_of):
+            changed = version_store.put(pdf_event.eventName, title, as_of, df, pdf_event.reportName)
+            df = version_store.latest(pdf_event.eventName, title)
+            versioned = True
+            print(f"   ✔ Versioned table: {title} as of {as_of} ({changed} rows changed)")
+        elif version_store.versions(pdf_event.eventName, title):
+            # undated: can't tell whether it is older than what the CSV shows, so leave that alone
+            print(f"   ⚠️ Skipped undated table {title}: dated versions are already stored")
+            versioned = True    # the CSV still shows a stored version
+            continue
+
         csv_path = os.path.join(output_dir, f"{title}.csv")
-        df.to_csv(csv_path, index=False)
+        tmp_path = f"{csv_path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, csv_path)
 
         print(f"   ✔ Saved table: {csv_path}")
-    
-    generate_json(pdf_event, output_dir)
+
+    newest = version_store.newest_report(pdf_event.eventName)
+    version_store.close()
+
+    # metadata.json / source.json describe the report the CSVs now show
+    if versioned and newest is not None and newest[1] != pdf_event.reportName:
+        print(f"   ✔ Kept metadata of newer report {newest[1]} (as of {newest[0]})")
+    else:
+        generate_json(pdf_event, output_dir)
+
+    layout_cache.save()
+    print(f"   ✔ Layout templates: {layout_cache.hits} pages reused, {layout_cache.misses} detected")
 
 
 
@@ -367,5 +467,5 @@ def process_all_pdfs_parallel():
 # Run
 # -----------------------------------------------------------------------
 if __name__ == "__main__":
-    # process_all_pdfs_parallel()
+    pipeline_profiler.enable_from_argv()
     process_all_pdfs_parallel()
@@ -1,6 +1,10 @@
+import sys
 import pdfplumber
 import pandas as pd
 
+sys.path.insert(0, "..")     # repo root
+import pipeline_profiler
+
 # --- CONFIGURATION ---
 pdf_file = "../data/ndrrmc/_Breakdown__Final_Report_for_Taal_Volcano_Eruption_2020.pdf" 
 HEADER_SEARCH_DISTANCE = 80 
@@ -64,6 +68,7 @@ def get_text_alignment_and_case(page, cell_bbox):
         
     return alignment, case_type, text
 
+pipeline_profiler.enable_from_argv()
 print(f"Processing {pdf_file}...")
 all_rows_data = []
 
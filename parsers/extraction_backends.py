@@ -0,0 +1,368 @@
+import os
+import socket
+import json
+import time
+import ctypes
+
+import pdfplumber
+from pdfplumber.page import Page
+
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+SAMPLE_PAGES = 3                # pages compared (and timed) per document when choosing a backend
+VERIFY_PAGES = 1                # pages re-checked against the reference when a stored choice is reused
+CHOICES_FILE = "extraction_backends.json"   # producer → chosen backend, in the parser's OUTPUT_FOLDER
+COORD_DIGITS = 3                # pdfium coordinates go through float matrices; round away the noise
+FONT_NAME_BUFFER = 256
+
+
+# -----------------------------------------------------------------------
+# pdfplumber backend → pdfminer parses every content stream in Python
+# -----------------------------------------------------------------------
+class PdfplumberBackend:
+    name = "pdfplumber"
+
+    def open(self, pdf_path: str):
+        return pdfplumber.open(pdf_path)
+
+
+# -----------------------------------------------------------------------
+# pypdfium2 backend → chars and rulings from PDFium, same page objects
+# -----------------------------------------------------------------------
+def _multiply(m, n):
+    """PDF matrix product m × n (apply m, then n)."""
+    a, b, c, d, e, f = m
+    A, B, C, D, E, F = n
+    return (a * A + b * C, a * B + b * D, c * A + d * C, c * B + d * D, e * A + f * C + E, e * B + f * D + F)
+
+def _object_matrix(obj):
+    matrix = pdfium_c.FS_MATRIX()
+    if not pdfium_c.FPDFPageObj_GetMatrix(obj, matrix):
+        return (1, 0, 0, 1, 0, 0)
+    return (matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f)
+
+def _path_segments(path, matrix):
+    """Straight segments of a path object in page space, as ((x0, y0), (x1, y1))."""
+    x, y = ctypes.c_float(), ctypes.c_float()
+    a, b, c, d, e, f = matrix
+    segments = []
+    start = current = None
+    for i in range(pdfium_c.FPDFPath_CountSegments(path)):
+        segment = pdfium_c.FPDFPath_GetPathSegment(path, i)
+        pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+        point = (a * x.value + c * y.value + e, b * x.value + d * y.value + f)
+        kind = pdfium_c.FPDFPathSegment_GetType(segment)
+        if kind == pdfium_c.FPDF_SEGMENT_MOVETO:
+            start = point
+        elif kind == pdfium_c.FPDF_SEGMENT_LINETO and current is not None:
+            segments.append((current, point))
+        current = point
+        if pdfium_c.FPDFPathSegment_GetClose(segment) and start is not None:
+            segments.append((current, start))
+            current = start
+    return segments
+
+def _path_rect(path, matrix):
+    """(x0, y0, x1, y1) when the path is one axis-aligned rectangle ("re", or m-l-l-l-h), else None."""
+    x, y = ctypes.c_float(), ctypes.c_float()
+    a, b, c, d, e, f = matrix
+    count = pdfium_c.FPDFPath_CountSegments(path)
+    if count not in (4, 5):
+        return None
+    points, closed = [], False
+    for i in range(count):
+        segment = pdfium_c.FPDFPath_GetPathSegment(path, i)
+        kind = pdfium_c.FPDFPathSegment_GetType(segment)
+        if kind != (pdfium_c.FPDF_SEGMENT_MOVETO if i == 0 else pdfium_c.FPDF_SEGMENT_LINETO):
+            return None
+        pdfium_c.FPDFPathSegment_GetPoint(segment, x, y)
+        points.append((round(a * x.value + c * y.value + e, COORD_DIGITS), round(b * x.value + d * y.value + f, COORD_DIGITS)))
+        closed = closed or pdfium_c.FPDFPathSegment_GetClose(segment)
+    if count == 5:
+        if points.pop() != points[0]:
+            return None
+    elif not closed:
+        return None
+    for (ax, ay), (bx, by) in zip(points, points[1:] + points[:1]):
+        if (ax != bx) == (ay != by):
+            return None     # a diagonal or zero-length side
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def _iter_objects(parent, count, get, matrix):
+    """(page object, type, page-space matrix) for every object, descending into form XObjects."""
+    for i in range(count(parent)):
+        obj = get(parent, i)
+        kind = pdfium_c.FPDFPageObj_GetType(obj)
+        if kind == pdfium_c.FPDF_PAGEOBJ_FORM:
+            yield from _iter_objects(
+                obj, pdfium_c.FPDFFormObj_CountObjects, pdfium_c.FPDFFormObj_GetObject,
+                _multiply(_object_matrix(obj), matrix),
+            )
+        else:
+            yield obj, kind, _multiply(_object_matrix(obj), matrix)
+
+
+def char_object(page: Page, text: str, x0, y0, x1, y1, size, upright: bool = True, fontname: str = "") -> dict:
+    """A pdfplumber char dict from a box in PDF space (y grows upwards)."""
+    top = page.height - y1
+    return {
+        "object_type": "char",
+        "page_number": page.page_number,
+        "text": text,
+        "fontname": fontname,
+        "size": size,
+        "upright": upright,
+        "x0": x0, "x1": x1, "y0": y0, "y1": y1,
+        "width": x1 - x0, "height": y1 - y0,
+        "top": top, "bottom": top + (y1 - y0), "doctop": page.initial_doctop + top,
+    }
+
+def line_object(page: Page, ax, ay, bx, by) -> dict:
+    """A pdfplumber line dict from two points in PDF space (y grows upwards)."""
+    x0, x1 = min(ax, bx), max(ax, bx)
+    y0, y1 = min(ay, by), max(ay, by)
+    top = page.height - y1
+    return {
+        "object_type": "line",
+        "page_number": page.page_number,
+        "x0": x0, "x1": x1, "y0": y0, "y1": y1,
+        "width": x1 - x0, "height": y1 - y0,
+        "top": top, "bottom": top + (y1 - y0), "doctop": page.initial_doctop + top,
+        "pts": [(ax, page.height - ay), (bx, page.height - by)],
+    }
+
+def rect_object(page: Page, x0, y0, x1, y1, fill: bool = False, stroke: bool = True) -> dict:
+    """A pdfplumber rect dict from its corners in PDF space (y grows upwards)."""
+    top = page.height - y1
+    bottom = page.height - y0
+    return {
+        "object_type": "rect",
+        "page_number": page.page_number,
+        "x0": x0, "x1": x1, "y0": y0, "y1": y1,
+        "width": x1 - x0, "height": y1 - y0,
+        "top": top, "bottom": bottom, "doctop": page.initial_doctop + top,
+        "fill": fill, "stroke": stroke,
+        "pts": [(x0, top), (x1, top), (x1, bottom), (x0, bottom)],
+    }
+
+
+class PdfiumPage(Page):
+    """
+    A pdfplumber Page whose chars, lines and rects come from PDFium instead of pdfminer, so
+    find_tables / crop / extract_words run unchanged on top of it. Rectangular paths are
+    "rect" objects like pdfminer's; other straight path segments are "line" objects and
+    curves are dropped. Rotated or offset pages, and pages that draw images, fall back to pdfminer.
+    """
+
+    def __init__(self, plumber_page: Page, pdfium_doc):
+        super().__init__(plumber_page.pdf, plumber_page.page_obj, plumber_page.page_number, plumber_page.initial_doctop)
+        self.pdfium_doc = pdfium_doc
+
+    def parse_objects(self):
+        if self.rotation or self.mediabox[0] or self.mediabox[1]:
+            return super().parse_objects()
+        pdfium_page = self.pdfium_doc[self.page_number - 1]
+        try:
+            objects = list(_iter_objects(
+                pdfium_page.raw, pdfium_c.FPDFPage_CountObjects, pdfium_c.FPDFPage_GetObject, (1, 0, 0, 1, 0, 0)
+            ))
+            if any(kind == pdfium_c.FPDF_PAGEOBJ_IMAGE for _, kind, _ in objects):
+                return super().parse_objects()      # page.images (and what is drawn over them) need pdfminer
+            lines, rects = self.pdfium_rulings(objects)
+            return {"char": self.pdfium_chars(pdfium_page), "line": lines, "rect": rects}
+        finally:
+            pdfium_page.close()
+
+    def pdfium_chars(self, pdfium_page) -> list:
+        textpage = pdfium_page.get_textpage()
+        raw = textpage.raw
+        box = pdfium_c.FS_RECTF()
+        font_name = ctypes.create_string_buffer(FONT_NAME_BUFFER)
+        font_flags = ctypes.c_int()
+        chars = []
+        for i in range(pdfium_c.FPDFText_CountChars(raw)):
+            if pdfium_c.FPDFText_IsGenerated(raw, i):
+                continue    # spaces / line breaks PDFium inferred; pdfminer only reports drawn glyphs
+            text = chr(pdfium_c.FPDFText_GetUnicode(raw, i))
+            if text in "\r\n\x00￾":
+                continue
+            pdfium_c.FPDFText_GetLooseCharBox(raw, i, box)
+            size = pdfium_c.FPDFText_GetFontSize(raw, i)
+            angle = pdfium_c.FPDFText_GetCharAngle(raw, i)
+            pdfium_c.FPDFText_GetFontInfo(raw, i, font_name, FONT_NAME_BUFFER, font_flags)
+
+            # pdfminer's box: advance width wide, font size tall, starting at the descent
+            chars.append(char_object(
+                self, text,
+                round(box.left, COORD_DIGITS), round(box.bottom, COORD_DIGITS),
+                round(box.right, COORD_DIGITS), round(box.bottom + size, COORD_DIGITS),
+                size, upright=angle < 0.01 or angle > 6.27,
+                fontname=font_name.value.decode("utf-8", errors="replace"),
+            ))
+        textpage.close()
+        return chars
+
+    def pdfium_rulings(self, objects: list) -> tuple:
+        """(lines, rects) drawn by the page's path objects."""
+        lines, rects = [], []
+        fill_mode, stroke = ctypes.c_int(), ctypes.c_int()
+        for path, kind, matrix in objects:
+            if kind != pdfium_c.FPDF_PAGEOBJ_PATH:
+                continue
+            rect = _path_rect(path, matrix)
+            if rect is not None:
+                pdfium_c.FPDFPath_GetDrawMode(path, fill_mode, stroke)
+                rects.append(rect_object(self, *rect, fill=bool(fill_mode.value), stroke=bool(stroke.value)))
+                continue
+            for (ax, ay), (bx, by) in _path_segments(path, matrix):
+                ax, ay, bx, by = (round(v, COORD_DIGITS) for v in (ax, ay, bx, by))
+                if (ax != bx) == (ay != by):
+                    continue    # diagonal or zero-length: never a table ruling
+                lines.append(line_object(self, ax, ay, bx, by))
+        return lines, rects
+
+
+class PdfiumDocument:
+    """pdfplumber.PDF look-alike: page geometry from pdfplumber, page content from PDFium."""
+
+    def __init__(self, pdf_path: str):
+        self.plumber = pdfplumber.open(pdf_path)
+        self.pdfium = pdfium.PdfDocument(pdf_path)
+        self.pages = [PdfiumPage(page, self.pdfium) for page in self.plumber.pages]
+
+    def close(self):
+        self.pdfium.close()
+        self.plumber.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PdfiumBackend:
+    name = "pypdfium2"
+
+    def open(self, pdf_path: str):
+        return PdfiumDocument(pdf_path)
+
+
+BACKENDS = {backend.name: backend for backend in (PdfplumberBackend(), PdfiumBackend())}
+REFERENCE_BACKEND = "pdfplumber"        # what every other backend has to reproduce
+
+
+# -----------------------------------------------------------------------
+# Backend selection → fastest backend that reproduces the reference rows
+# -----------------------------------------------------------------------
+def sample_page_numbers(page_count: int, sample_size: int = SAMPLE_PAGES) -> list:
+    """Page indexes spread over the document (first, last and in between)."""
+    if page_count <= sample_size:
+        return list(range(page_count))
+    step = (page_count - 1) / max(sample_size - 1, 1)
+    return sorted({round(i * step) for i in range(sample_size)})
+
+def run_sample(backend, pdf_path: str, page_numbers: list, page_rows):
+    """(seconds, rows) for `page_rows(page)` over the sampled pages."""
+    started = time.perf_counter()
+    with backend.open(pdf_path) as pdf:
+        rows = [page_rows(pdf.pages[i]) for i in page_numbers]
+    return time.perf_counter() - started, rows
+
+def select_backend(pdf_path: str, page_rows, page_numbers: list):
+    """
+    Time every backend on the sampled pages and return the fastest one whose `page_rows`
+    output is identical to the reference backend's. Returns (backend name, {name: seconds or None});
+    None marks a backend that failed or disagreed.
+    """
+    best, expected = REFERENCE_BACKEND, None
+    timings = {}
+    for name in sorted(BACKENDS, key=lambda n: n != REFERENCE_BACKEND):     # reference first
+        try:
+            seconds, rows = run_sample(BACKENDS[name], pdf_path, page_numbers, page_rows)
+        except Exception:
+            if name == REFERENCE_BACKEND:
+                raise
+            timings[name] = None
+            continue
+        if name == REFERENCE_BACKEND:
+            expected = rows
+        timings[name] = seconds if rows == expected else None
+        if timings[name] is not None and seconds < timings[best]:
+            best = name
+    return best, timings
+
+def verify_backend(pdf_path: str, backend_name: str, page_rows, page_numbers: list) -> bool:
+    """Whether `backend_name` still reproduces the reference backend's rows on these pages."""
+    if backend_name == REFERENCE_BACKEND:
+        return True
+    try:
+        _, rows = run_sample(BACKENDS[backend_name], pdf_path, page_numbers, page_rows)
+    except Exception:
+        return False
+    _, expected = run_sample(BACKENDS[REFERENCE_BACKEND], pdf_path, page_numbers, page_rows)
+    return rows == expected
+
+
+# -----------------------------------------------------------------------
+# Choices per PDF producer → benchmark once per generator, re-check one page per report
+# -----------------------------------------------------------------------
+def pdf_producer(pdf) -> str:
+    """Software that wrote the PDF; reports from the same generator extract the same way."""
+    meta = pdf.metadata
+    return f"{meta.get('Producer', '')} | {meta.get('Creator', '')}"
+
+class BackendChoices:
+    """Backend picked for each PDF producer, stored as JSON next to the parsed output."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.choices = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.choices = json.load(f)
+
+    def get(self, producer: str):
+        choice = self.choices.get(producer)
+        return choice["backend"] if choice and choice["backend"] in BACKENDS else None
+
+    def remember(self, producer: str, backend_name: str, timings: dict):
+        self.choices[producer] = {"backend": backend_name, "timings": timings}
+        # parallel workers may race; the last writer wins and each writes a complete file
+        tmp_path = f"{self.path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.choices, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+def open_pdf(pdf_path: str, backend_name: str = "auto", page_rows=None, choices_path: str = None):
+    """
+    Open a PDF with the named backend. "auto" reuses the choice made for the PDF's producer
+    once it reproduces the reference rows on VERIFY_PAGES of this PDF's pages; otherwise it
+    benchmarks the backends on SAMPLE_PAGES pages (see select_backend) and remembers the winner.
+    """
+    if backend_name != "auto":
+        return BACKENDS[backend_name].open(pdf_path)
+
+    with pdfplumber.open(pdf_path) as pdf:
+        producer = pdf_producer(pdf)
+        page_numbers = sample_page_numbers(len(pdf.pages))
+
+    choices = BackendChoices(choices_path) if choices_path else None
+    backend_name = choices.get(producer) if choices else None
+    middle = len(page_numbers) // 2
+    if backend_name is not None and not verify_backend(pdf_path, backend_name, page_rows, page_numbers[middle:middle + VERIFY_PAGES]):
+        print(f"   ⚠️ {backend_name} differs from {REFERENCE_BACKEND} on this report, choosing again")
+        backend_name = None
+    if backend_name is None:
+        backend_name, timings = select_backend(pdf_path, page_rows, page_numbers)
+        summary = ", ".join(f"{n} {'rows differ' if t is None else f'{t:.2f}s'}" for n, t in timings.items())
+        print(f"   ✔ Backend for '{producer}': {backend_name} ({summary})")
+        if choices:
+            choices.remember(producer, backend_name, timings)
+    return BACKENDS[backend_name].open(pdf_path)
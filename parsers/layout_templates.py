@@ -0,0 +1,200 @@
+import os
+import socket
+import json
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, asdict
+
+from pdfplumber import utils
+from pdfplumber.page import test_proposed_bbox
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+TEMPLATE_FILE = "layout_templates.json"     # one per event folder, shared by every report of the series
+RULING_GRID = 2                 # pt; ruling positions are rounded to this grid before hashing
+MIN_RULING_LENGTH = 10          # pt; shorter vertical strokes are not column rulings
+COLUMN_TOLERANCE = 3            # pt; how far a detected column boundary may drift from the template
+TITLE_BAND_PAD = 4              # pt of slack above the remembered title line
+
+
+# -----------------------------------------------------------------------
+# Page fingerprint → page size + x positions of the vertical rulings
+# -----------------------------------------------------------------------
+def page_rulings(page) -> tuple:
+    """
+    (vertical, horizontal) edges of the page's drawn lines and rects: page.edges without the
+    curves, and without pdfplumber snapping and joining them for table detection.
+    """
+    edges = [utils.line_to_edge(line) for line in page.lines]
+    for rect in page.rects:
+        edges.extend(utils.rect_to_edges(rect))
+    edges = utils.filter_edges(edges, min_length=1)
+    return [e for e in edges if e["orientation"] == "v"], [e for e in edges if e["orientation"] == "h"]
+
+def ruling_fingerprint(page, vertical_edges: list) -> str:
+    """
+    Successive SitReps of one event draw the same column rulings; only the number of rows
+    (and so the horizontal rulings) changes. The vertical rulings identify the layout.
+    """
+    xs = sorted({
+        round(edge["x0"] / RULING_GRID)
+        for edge in vertical_edges
+        if edge["height"] >= MIN_RULING_LENGTH
+    })
+    return f"{round(page.width)}x{round(page.height)}:" + ",".join(map(str, xs))
+
+def table_columns(table_obj) -> list:
+    """x boundaries of a detected table's columns."""
+    xs = set()
+    for row in table_obj.rows:
+        for cell in row.cells:
+            if cell:
+                xs.update((round(cell[0], 1), round(cell[2], 1)))
+    return sorted(xs)
+
+def location_column(table_obj):
+    """[x0, x1] spanned by the first (location) column's cells."""
+    cells = [row.cells[0] for row in table_obj.rows if row.cells and row.cells[0]]
+    if not cells:
+        return None
+    return [min(c[0] for c in cells), max(c[2] for c in cells)]
+
+
+@dataclass
+class LayoutTemplate:
+    fingerprint: str
+    columns: list               # column boundaries of the page's first table
+    location_column: list       # [x0, x1] of the location column (alignment is measured in it)
+    title_offset: float = None  # table top − top of the title line above it
+    hits: int = 0
+
+    def matches(self, table_obj) -> bool:
+        columns = table_columns(table_obj)
+        return len(columns) == len(self.columns) and all(
+            abs(a - b) <= COLUMN_TOLERANCE for a, b in zip(columns, self.columns)
+        )
+
+    def find_tables(self, page, vertical_edges: list, horizontal_edges: list, settings: dict):
+        """
+        The page's tables built from explicit lines: vertical rulings snapped onto this layout's
+        columns, plus the page's horizontal rulings (the rows change from report to report).
+        Returns None when full detection is needed instead: a ruling sits outside the columns
+        (some other table is drawn on the page) or a table found doesn't match the layout.
+        """
+        vertical = []
+        for edge in vertical_edges:
+            column = min(self.columns, key=lambda x: abs(x - edge["x0"]))
+            if abs(column - edge["x0"]) <= COLUMN_TOLERANCE:
+                vertical.append(dict(edge, x0=column, x1=column))
+            elif edge["height"] >= MIN_RULING_LENGTH:
+                return None
+        if len(vertical) < 2 or len(horizontal_edges) < 2:
+            return None
+
+        tables = page.find_tables(dict(
+            settings,
+            vertical_strategy="explicit", explicit_vertical_lines=vertical,
+            horizontal_strategy="explicit", explicit_horizontal_lines=horizontal_edges,
+        ))
+        if not tables or not all(self.matches(table_obj) for table_obj in tables):
+            return None
+        return tables
+
+
+class LayoutCache:
+    """Templates of one report series, keyed by ruling fingerprint and stored next to its tables."""
+
+    def __init__(self, directory: str):
+        self.path = os.path.join(directory, TEMPLATE_FILE)
+        self.templates = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.templates = {t["fingerprint"]: LayoutTemplate(**t) for t in json.load(f)}
+
+    def get(self, fingerprint: str):
+        template = self.templates.get(fingerprint)
+        if template is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            template.hits += 1
+        return template
+
+    def learn(self, fingerprint: str, table_obj, title_top: float = None):
+        """Remember the layout of a page from its first table, as found by full detection."""
+        bounds = location_column(table_obj)
+        if bounds is None:
+            return None
+        title_offset = table_obj.bbox[1] - title_top if title_top is not None else None
+        template = LayoutTemplate(fingerprint, table_columns(table_obj), bounds, title_offset)
+        self.templates[fingerprint] = template
+        return template
+
+    def save(self):
+        # reports of one event are parsed in parallel; replace the file atomically
+        tmp_path = f"{self.path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump([asdict(t) for t in self.templates.values()], f, indent=4)
+        os.replace(tmp_path, self.path)
+
+
+# -----------------------------------------------------------------------
+# Char index → the same crops as page.crop(bbox), without scanning every object per crop
+# -----------------------------------------------------------------------
+class CharIndex:
+    """
+    The chars of one page (optionally only those overlapping `x_range`), sorted by top.
+    `crop(bbox)` returns exactly what page.crop(bbox).chars would, in page order.
+    """
+
+    def __init__(self, page, x_range=None):
+        self.page_bbox = page.bbox
+        self.x_range = x_range
+        chars = page.chars
+        if x_range is not None:
+            chars = [c for c in chars if c["x1"] >= x_range[0] and c["x0"] <= x_range[1]]
+        order = sorted(range(len(chars)), key=lambda i: chars[i]["top"])
+        self.chars = [chars[i] for i in order]
+        self.order = order
+        self.tops = [c["top"] for c in self.chars]
+        self.max_height = max((c["bottom"] - c["top"] for c in self.chars), default=0)
+
+    def covers(self, bbox) -> bool:
+        return self.x_range is None or (self.x_range[0] <= bbox[0] and bbox[2] <= self.x_range[1])
+
+    def crop(self, bbox) -> list:
+        x0, top, x1, bottom = bbox
+        lo = bisect_left(self.tops, top - self.max_height)
+        hi = bisect_right(self.tops, bottom)
+        candidates = [
+            (self.order[i], self.chars[i]) for i in range(lo, hi)
+            if self.chars[i]["x1"] >= x0 and self.chars[i]["x0"] <= x1
+        ]
+        candidates.sort(key=lambda pair: pair[0])
+        return utils.crop_to_bbox([c for _, c in candidates], bbox)
+
+    def extract_words(self, bbox) -> list:
+        """page.crop(bbox).extract_words(); raises ValueError like page.crop for bad boxes."""
+        test_proposed_bbox(bbox, self.page_bbox)
+        return utils.extract_words(self.crop(bbox))
+
+    def title_band_text(self, template: LayoutTemplate, table_top: float, page_width: float, search_distance: float) -> str:
+        """
+        Text between the remembered title line and the table top. Returns "" when the band holds
+        no text, so the caller can fall back to the full search band.
+        """
+        if template.title_offset is None:
+            return ""
+        band_top = max(0, table_top - search_distance, table_top - template.title_offset - TITLE_BAND_PAD)
+        return self.extract_text((0, band_top, page_width, table_top))
+
+    def extract_text(self, bbox) -> str:
+        """page.crop(bbox).extract_text()."""
+        test_proposed_bbox(bbox, self.page_bbox)
+        x0, top, x1, bottom = bbox
+        return utils.chars_to_textmap(
+            self.crop(bbox), layout_bbox=bbox, layout_width=x1 - x0, layout_height=bottom - top
+        ).as_string
@@ -0,0 +1,205 @@
+import os
+import socket
+import io
+import csv
+import json
+import hashlib
+import subprocess
+
+import numpy as np
+import pypdfium2 as pdfium
+from pdfminer.pdftypes import resolve1, PDFStream
+from pdfplumber.page import Page
+
+from extraction_backends import char_object, line_object
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+OCR_CACHE_DIR = "ocr_cache"     # one JSON per page hash, inside the parser's OUTPUT_FOLDER
+OCR_DPI = 300
+TESSERACT = "tesseract"
+TESSERACT_LANG = "eng"
+TESSERACT_PSM = "11"            # sparse text: table cells, not paragraphs
+MIN_CONFIDENCE = 30             # drop words tesseract itself doubts
+DARK_LEVEL = 128                # grayscale below this is ink
+MIN_RULING_LENGTH = 20          # pt; shorter dark runs are text strokes, not table rulings
+
+OCR_SETTINGS = f"{TESSERACT_LANG}|{TESSERACT_PSM}|{OCR_DPI}|{DARK_LEVEL}|{MIN_RULING_LENGTH}"
+
+
+# -----------------------------------------------------------------------
+# Detection → pages with images but no text layer
+# -----------------------------------------------------------------------
+def page_images(page) -> list:
+    """Image XObject streams drawn by a page (straight from its resources; no rendering)."""
+    xobjects = resolve1((page.page_obj.resources or {}).get("XObject")) or {}
+    images = []
+    for ref in xobjects.values():
+        stream = resolve1(ref)
+        if isinstance(stream, PDFStream) and getattr(resolve1(stream.get("Subtype")), "name", None) == "Image":
+            images.append(stream)
+    return images
+
+def is_image_only(page) -> bool:
+    return not page.chars and bool(page_images(page))
+
+def page_hash(page) -> str:
+    """Hash of the page's drawing instructions, its images and the OCR settings."""
+    digest = hashlib.sha1(OCR_SETTINGS.encode())
+    digest.update(repr(page.bbox).encode())
+    for stream in page.page_obj.contents:
+        digest.update(resolve1(stream).get_rawdata() or b"")
+    for stream in page_images(page):
+        digest.update(stream.get_rawdata() or b"")
+    return digest.hexdigest()
+
+
+# -----------------------------------------------------------------------
+# OCR worker → words and rulings of one rendered page, in page points
+# -----------------------------------------------------------------------
+def dark_runs(dark, length: int):
+    """True where a pixel belongs to a horizontal run of at least `length` dark pixels."""
+    height, width = dark.shape
+    if width < length:
+        return np.zeros_like(dark, dtype=bool)
+    sums = np.cumsum(np.pad(dark, ((0, 0), (1, 0))), axis=1, dtype=np.int32)       # dark pixels before column k
+    starts = (sums[:, length:] - sums[:, :-length]) == length                     # a full run starts at column j
+    starts = np.pad(starts, ((0, 0), (0, length - 1)))
+    count = np.cumsum(np.pad(starts, ((0, 0), (1, 0))), axis=1, dtype=np.int32)    # run starts before column k
+    lagged = np.pad(count, ((0, 0), (length, 0)))[:, : width + 1]
+    return (count - lagged)[:, 1:] > 0      # some run started within the last `length` columns
+
+def raster_rulings(gray, scale: float) -> list:
+    """Table rulings as (orientation, position, start, end) in pixels, one per drawn line."""
+    dark = gray < DARK_LEVEL
+    length = max(2, int(MIN_RULING_LENGTH * scale))
+    rulings = []
+    for orientation, mask in (("h", dark_runs(dark, length)), ("v", dark_runs(dark.T, length))):
+        rows = np.flatnonzero(mask.any(axis=1))
+        if not len(rows):
+            continue
+        # a ruling is several pixels thick: collapse adjacent rows into one line at their centre
+        groups = np.split(rows, np.flatnonzero(np.diff(rows) > 1) + 1)
+        for group in groups:
+            band = mask[group].any(axis=0).astype(np.int8)
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], band, [0]))))
+            for start, end in zip(edges[::2], edges[1::2]):
+                rulings.append((orientation, float(group.mean()), int(start), int(end)))
+    return rulings
+
+def tesseract_words(image_png: bytes) -> list:
+    """(line id, text, left, top, width, height) per confident word, in pixels."""
+    result = subprocess.run(
+        [TESSERACT, "stdin", "stdout", "-l", TESSERACT_LANG, "--psm", TESSERACT_PSM, "tsv"],
+        input=image_png, capture_output=True, check=True,
+    )
+    words = []
+    for row in csv.DictReader(io.StringIO(result.stdout.decode("utf-8", errors="replace")), delimiter="\t", quoting=csv.QUOTE_NONE):
+        text = (row.get("text") or "").strip()
+        if not text or float(row["conf"]) < MIN_CONFIDENCE:
+            continue
+        line_id = f"{row['block_num']}.{row['par_num']}.{row['line_num']}"
+        words.append((line_id, text, int(row["left"]), int(row["top"]), int(row["width"]), int(row["height"])))
+    return words
+
+def ocr_page(pdf_path: str, page_number: int) -> dict:
+    """Render one page and OCR it. Coordinates are points from the page's top-left corner."""
+    scale = OCR_DPI / 72
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        bitmap = pdf[page_number - 1].render(scale=scale, grayscale=True)
+        gray = bitmap.to_numpy()
+        if gray.ndim == 3:
+            gray = gray[:, :, 0]
+        buffer = io.BytesIO()
+        bitmap.to_pil().save(buffer, format="PNG")
+    finally:
+        pdf.close()
+
+    words = [
+        [line_id, text, left / scale, top / scale, (left + width) / scale, (top + height) / scale]
+        for line_id, text, left, top, width, height in tesseract_words(buffer.getvalue())
+    ]
+    lines = [
+        [orientation, position / scale, start / scale, end / scale]
+        for orientation, position, start, end in raster_rulings(gray, scale)
+    ]
+    return {"words": words, "lines": lines}
+
+
+# -----------------------------------------------------------------------
+# Batch → every scanned page of a PDF, cached by page hash
+# -----------------------------------------------------------------------
+def ocr_pages(pdf_path: str, pages: dict, cache_dir: str) -> dict:
+    """
+    OCR results for `pages` (page number → page). Cached pages are read from `cache_dir`;
+    the rest are rendered and OCR'd here, one page at a time. This already runs inside a
+    parser-pool worker and tesseract is multi-threaded itself, so there is no inner pool.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    results, todo = {}, {}
+    for page_number, page in pages.items():
+        cache_path = os.path.join(cache_dir, f"{page_hash(page)}.json")
+        if os.path.exists(cache_path):
+            with open(cache_path) as f:
+                results[page_number] = json.load(f)
+        else:
+            todo[page_number] = cache_path
+
+    for page_number, cache_path in todo.items():
+        try:
+            results[page_number] = ocr_page(pdf_path, page_number)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"   ⚠️ OCR failed on page {page_number}: {e}")
+            continue
+        tmp_path = f"{cache_path}.{socket.gethostname()}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(results[page_number], f)
+        os.replace(tmp_path, cache_path)
+
+    print(f"   ✔ OCR: {len(pages)} scanned pages, {len(pages) - len(todo)} from cache")
+    return results
+
+
+class OcrPage(Page):
+    """
+    A scanned page with OCR words as chars and raster rulings as lines, so find_tables and
+    the alignment/casing classifier run on it like on a text page. Each word's box is split
+    evenly over its letters, with a space char between words of one OCR line.
+    """
+
+    def __init__(self, plumber_page: Page, ocr_result: dict):
+        super().__init__(plumber_page.pdf, plumber_page.page_obj, plumber_page.page_number, plumber_page.initial_doctop)
+        self.ocr_result = ocr_result
+
+    def crop_origin(self) -> tuple:
+        """Top-left corner of the crop box (what PDFium renders) as (x, distance from the page top)."""
+        box = [resolve1(v) for v in (resolve1(self.page_obj.attrs.get("CropBox")) or self.page_obj.mediabox)]
+        return min(box[0], box[2]), self.height - max(box[1], box[3])    # PDF space: the larger y is the top edge
+
+    def parse_objects(self):
+        # OCR coordinates start at the rendered crop box's top-left corner
+        x_offset, top_offset = self.crop_origin()
+        chars = []
+        previous = None
+        for line_id, text, x0, top, x1, bottom in self.ocr_result["words"]:
+            x0, x1 = x0 + x_offset, x1 + x_offset
+            y0, y1 = self.height - (bottom + top_offset), self.height - (top + top_offset)
+            if previous and previous[0] == line_id and previous[1] < x0:
+                chars.append(char_object(self, " ", previous[1], y0, x0, y1, y1 - y0))
+            step = (x1 - x0) / len(text)
+            for i, letter in enumerate(text):
+                chars.append(char_object(self, letter, x0 + i * step, y0, x0 + (i + 1) * step, y1, y1 - y0))
+            previous = (line_id, x1)
+
+        lines = []
+        for orientation, position, start, end in self.ocr_result["lines"]:
+            if orientation == "h":
+                y = self.height - (position + top_offset)
+                lines.append(line_object(self, start + x_offset, y, end + x_offset, y))
+            else:
+                x = position + x_offset
+                lines.append(line_object(self, x, self.height - (start + top_offset), x, self.height - (end + top_offset)))
+        return {"char": chars, "line": lines}
@@ -0,0 +1,178 @@
+import json
+import hashlib
+import sqlite3
+import pandas as pd
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+VERSION_DB_NAME = "sitrep_versions.db"      # created inside the parser's OUTPUT_FOLDER
+JOURNAL_MODE = "WAL"                        # "DELETE" when processes on several hosts share the file (WAL is single-host)
+LAYOUT_COLUMNS = ["Page"]                   # where a row sits in the PDF, not part of its identity
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    event       TEXT NOT NULL,
+    table_name  TEXT NOT NULL,
+    as_of       TEXT NOT NULL,                  -- ISO timestamp from the table title
+    report      TEXT,
+    columns     TEXT NOT NULL,                  -- JSON list
+    row_order   TEXT NOT NULL,                  -- JSON list of row keys, in report order
+    PRIMARY KEY (event, table_name, as_of)
+);
+CREATE TABLE IF NOT EXISTS deltas (
+    event       TEXT NOT NULL,
+    table_name  TEXT NOT NULL,
+    as_of       TEXT NOT NULL,
+    row_key     TEXT NOT NULL,
+    op          TEXT NOT NULL,                  -- add / del, relative to the previous version
+    row_json    TEXT,
+    PRIMARY KEY (event, table_name, row_key, as_of)
+);
+"""
+
+
+# -----------------------------------------------------------------------
+# Helper function → stable row keys
+# -----------------------------------------------------------------------
+def row_keys(rows: list) -> list:
+    """
+    Content hash of each row (layout columns left out), with an occurrence suffix so
+    identical rows in one table stay distinct.
+    """
+    seen = {}
+    keys = []
+    for row in rows:
+        content = {k: v for k, v in row.items() if k not in LAYOUT_COLUMNS}
+        digest = hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        seen[digest] = seen.get(digest, 0) + 1
+        keys.append(f"{digest}#{seen[digest]}")
+    return keys
+
+def clean_value(value):
+    return None if pd.isna(value) else value
+
+
+# -----------------------------------------------------------------------
+# Versioned table store
+# -----------------------------------------------------------------------
+class SitRepVersionStore:
+    """
+    Every version of every SitRep table, keyed by (event, table, as-of). Only row-level deltas
+    against the previous as-of are stored; a row is present at time T when its newest delta at
+    or before T is an "add". A row keeps the Page of the version that added it.
+
+    Versions may arrive in any order (reports are parsed in parallel): inserting a version
+    between two others re-derives the later one's delta.
+    """
+
+    def __init__(self, path: str, journal_mode: str = JOURNAL_MODE):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # ---------------- reads ----------------
+
+    def versions(self, event: str, table: str) -> list:
+        return [r[0] for r in self.conn.execute(
+            "SELECT as_of FROM versions WHERE event = ? AND table_name = ? ORDER BY as_of", (event, table)
+        )]
+
+    def _version_at(self, event: str, table: str, as_of: str = None):
+        query = "SELECT as_of, columns, row_order FROM versions WHERE event = ? AND table_name = ?"
+        params = [event, table]
+        if as_of is not None:
+            query += " AND as_of <= ?"
+            params.append(as_of)
+        return self.conn.execute(query + " ORDER BY as_of DESC LIMIT 1", params).fetchone()
+
+    def _rows_at(self, event: str, table: str, as_of: str) -> dict:
+        """row key → row dict for every row present at `as_of`."""
+        rows = self.conn.execute(
+            """SELECT d.row_key, d.op, d.row_json FROM deltas d
+               JOIN (SELECT row_key, MAX(as_of) AS last FROM deltas
+                     WHERE event = ? AND table_name = ? AND as_of <= ? GROUP BY row_key) l
+                 ON d.row_key = l.row_key AND d.as_of = l.last
+               WHERE d.event = ? AND d.table_name = ?""",
+            (event, table, as_of, event, table),
+        )
+        return {key: json.loads(row_json) for key, op, row_json in rows if op == "add"}
+
+    def as_of(self, event: str, table: str, when: str = None) -> pd.DataFrame:
+        """The table as published in the newest version at or before `when` (None → latest)."""
+        version = self._version_at(event, table, when)
+        if version is None:
+            return pd.DataFrame()
+        version_as_of, columns, row_order = version
+        rows = self._rows_at(event, table, version_as_of)
+        return pd.DataFrame([rows[key] for key in json.loads(row_order)], columns=json.loads(columns))
+
+    def latest(self, event: str, table: str) -> pd.DataFrame:
+        return self.as_of(event, table)
+
+    def newest_report(self, event: str):
+        """(as_of, report) of the newest version of any of the event's tables; None if it has none."""
+        return self.conn.execute(
+            "SELECT as_of, report FROM versions WHERE event = ? ORDER BY as_of DESC, report DESC LIMIT 1", (event,)
+        ).fetchone()
+
+    def changes(self, event: str, table: str, as_of: str):
+        """(added, removed) rows of one version relative to the version before it."""
+        rows = self.conn.execute(
+            "SELECT op, row_json FROM deltas WHERE event = ? AND table_name = ? AND as_of = ?", (event, table, as_of)
+        ).fetchall()
+        added = [json.loads(r) for op, r in rows if op == "add"]
+        removed = [json.loads(r) for op, r in rows if op == "del"]
+        return pd.DataFrame(added), pd.DataFrame(removed)
+
+    # ---------------- writes ----------------
+
+    def _write_delta(self, event: str, table: str, as_of: str, before: dict, after: dict):
+        self.conn.execute("DELETE FROM deltas WHERE event = ? AND table_name = ? AND as_of = ?", (event, table, as_of))
+        delta = [(event, table, as_of, key, "add", json.dumps(row)) for key, row in after.items() if key not in before]
+        delta += [(event, table, as_of, key, "del", json.dumps(row)) for key, row in before.items() if key not in after]
+        self.conn.executemany(
+            "INSERT INTO deltas (event, table_name, as_of, row_key, op, row_json) VALUES (?, ?, ?, ?, ?, ?)", delta
+        )
+        return len(delta)
+
+    def put(self, event: str, table: str, as_of: str, df: pd.DataFrame, report: str = None) -> int:
+        """Store one version of a table; returns the number of rows added or removed."""
+        records = [{k: clean_value(v) for k, v in row.items()} for row in df.to_dict("records")]
+        keys = row_keys(records)
+        after = dict(zip(keys, records))
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous = self._version_at(event, table, as_of)
+            if previous is not None and previous[0] == as_of:
+                # same version parsed again: diff against the one before it
+                previous = self.conn.execute(
+                    "SELECT as_of FROM versions WHERE event = ? AND table_name = ? AND as_of < ? ORDER BY as_of DESC LIMIT 1",
+                    (event, table, as_of),
+                ).fetchone()
+            following = self.conn.execute(
+                "SELECT as_of FROM versions WHERE event = ? AND table_name = ? AND as_of > ? ORDER BY as_of LIMIT 1",
+                (event, table, as_of),
+            ).fetchone()
+
+            following_rows = self._rows_at(event, table, following[0]) if following else None
+            before = self._rows_at(event, table, previous[0]) if previous else {}
+
+            changed = self._write_delta(event, table, as_of, before, after)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO versions (event, table_name, as_of, report, columns, row_order) VALUES (?, ?, ?, ?, ?, ?)",
+                (event, table, as_of, report, json.dumps(list(df.columns)), json.dumps(keys)),
+            )
+            if following_rows is not None:
+                self._write_delta(event, table, following[0], after, following_rows)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return changed
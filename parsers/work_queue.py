@@ -0,0 +1,311 @@
+import os
+import sys
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import NDRRMC_cleaned_table_names_output_directory_parallel as ndrrmc_parser
+
+sys.path.insert(0, "..")     # repo root
+import pipeline_profiler
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+QUEUE_DB_NAME = "work_queue.db"     # created inside the parser's OUTPUT_FOLDER, shared by every host
+LEASE_SECONDS = 600                 # a claimed PDF goes back to the queue if its worker is silent this long
+HEARTBEAT_SECONDS = 60              # how often a busy worker renews its lease
+POLL_SECONDS = 15                   # idle workers re-check while other hosts still hold leases
+MAX_ATTEMPTS = 3                    # a PDF that failed (or lost its worker) this often is given up on
+WORKERS_PER_HOST = os.cpu_count()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    filename      TEXT PRIMARY KEY,             -- relative to INPUT_FOLDER, so hosts may mount it anywhere
+    stamp         TEXT NOT NULL,                -- size:mtime when queued; a changed file is queued again
+    status        TEXT NOT NULL,                -- queued / leased / done / failed
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    worker        TEXT,                         -- host:pid of the last claimant
+    lease_token   TEXT,
+    lease_beat    INTEGER,                      -- heartbeats of the current lease
+    seconds       REAL,
+    error         TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, filename);
+"""
+
+# columns added after the first queues were written: (name, definition)
+ADDED_JOB_COLUMNS = [("lease_beat", "INTEGER")]
+
+
+# -----------------------------------------------------------------------
+# Helper functions
+# -----------------------------------------------------------------------
+def file_stamp(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# -----------------------------------------------------------------------
+# Lease queue → one SQLite file next to the parsed output
+# -----------------------------------------------------------------------
+class WorkQueue:
+    """
+    PDFs to parse, claimed by workers on any host that can see OUTPUT_FOLDER. A claim is a
+    lease: the worker renews it while parsing, and a lease nobody renewed for LEASE_SECONDS
+    is handed to the next claimant (its worker crashed or its host went away).
+
+    Uses a rollback journal, not WAL, since WAL only works between processes on one host.
+    No timestamps are compared across hosts: a heartbeat only bumps the lease's beat counter,
+    and a claimant times how long it has seen the same (token, beat) on its own monotonic
+    clock. Host clocks may disagree; a lease is taken over LEASE_SECONDS after the claimant
+    first saw it stop moving.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=DELETE")
+        self.conn.executescript(SCHEMA)
+        self._transaction(self._migrate)
+        self._leases_seen = {}      # filename → (token, beat, monotonic time this process first saw them)
+
+    def _migrate(self):
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        for name, definition in ADDED_JOB_COLUMNS:
+            if name not in columns:
+                self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {definition}")
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self, statements):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements()
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return result
+
+    # ---------------- producers ----------------
+
+    def enqueue(self, input_folder: str) -> int:
+        """Queue every PDF in `input_folder` that is new or changed since it was queued; returns how many."""
+        stamps = {
+            filename: file_stamp(os.path.join(input_folder, filename))
+            for filename in sorted(os.listdir(input_folder)) if filename.lower().endswith(".pdf")
+        }
+
+        def add():
+            known = dict(self.conn.execute("SELECT filename, stamp FROM jobs"))
+            changed = [(f, s) for f, s in stamps.items() if known.get(f) != s]
+            self.conn.executemany(
+                """INSERT INTO jobs (filename, stamp, status) VALUES (?, ?, 'queued')
+                   ON CONFLICT (filename) DO UPDATE SET stamp = excluded.stamp, status = 'queued',
+                       attempts = 0, worker = NULL, lease_token = NULL, lease_beat = NULL, error = NULL""",
+                changed,
+            )
+            return len(changed)
+        return self._transaction(add)
+
+    # ---------------- workers ----------------
+
+    def expired_leases(self) -> list:
+        """
+        (filename, attempts) of leases whose (token, beat) this process has watched stand still
+        for LEASE_SECONDS of its own monotonic clock.
+        """
+        now = time.monotonic()
+        seen, expired = {}, []
+        for filename, token, beat, attempts in self.conn.execute(
+            "SELECT filename, lease_token, lease_beat, attempts FROM jobs WHERE status = 'leased'"
+        ):
+            first_seen = self._leases_seen.get(filename)
+            if first_seen is None or first_seen[:2] != (token, beat):
+                first_seen = (token, beat, now)
+            seen[filename] = first_seen
+            if now - first_seen[2] >= LEASE_SECONDS:
+                expired.append((filename, attempts))
+        self._leases_seen = seen
+        return expired
+
+    def claim(self, worker: str):
+        """Lease the next queued PDF (or one whose lease expired). Returns (filename, token) or None."""
+        def take():
+            expired = self.expired_leases()
+            for filename, attempts in expired:
+                if attempts >= MAX_ATTEMPTS:
+                    self.conn.execute(
+                        "UPDATE jobs SET status = 'failed', error = 'lease expired too often' WHERE filename = ?", (filename,)
+                    )
+            retry = sorted(filename for filename, attempts in expired if attempts < MAX_ATTEMPTS)
+
+            # fresh work first, then PDFs whose worker went silent
+            row = self.conn.execute("SELECT filename FROM jobs WHERE status = 'queued' ORDER BY filename LIMIT 1").fetchone()
+            filename = row[0] if row else retry[0] if retry else None
+            if filename is None:
+                return None
+            token = uuid.uuid4().hex
+            self.conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, worker = ?, lease_token = ?, lease_beat = 0 "
+                "WHERE filename = ?",
+                (worker, token, filename),
+            )
+            self._leases_seen.pop(filename, None)
+            return filename, token
+        return self._transaction(take)
+
+    def heartbeat(self, filename: str, token: str) -> bool:
+        """Renew a lease; False when it expired and another worker took the PDF over."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_beat = COALESCE(lease_beat, 0) + 1 WHERE filename = ? AND lease_token = ? AND status = 'leased'",
+            (filename, token),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, filename: str, token: str, seconds: float) -> bool:
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'done', seconds = ?, lease_token = NULL, lease_beat = NULL, error = NULL "
+            "WHERE filename = ? AND lease_token = ?",
+            (seconds, filename, token),
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, filename: str, token: str, error: str) -> bool:
+        """Put a failed PDF back in the queue, or give up on it after MAX_ATTEMPTS."""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END, "
+            "error = ?, lease_token = NULL, lease_beat = NULL WHERE filename = ? AND lease_token = ?",
+            (MAX_ATTEMPTS, error, filename, token),
+        )
+        return cursor.rowcount == 1
+
+    def counts(self) -> dict:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+
+class LeaseKeeper:
+    """Renews a lease from a background thread (with its own connection) while the PDF is parsed."""
+
+    def __init__(self, queue_path: str, filename: str, token: str):
+        self.queue_path, self.filename, self.token = queue_path, filename, token
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        queue = WorkQueue(self.queue_path)
+        try:
+            while not self._stop.wait(HEARTBEAT_SECONDS):
+                try:
+                    if not queue.heartbeat(self.filename, self.token):
+                        self.lost = True
+                        return
+                except sqlite3.OperationalError as e:
+                    print(f"   ⚠️ Heartbeat for {self.filename} failed: {e}")    # retried next beat
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# -----------------------------------------------------------------------
+# Worker → claim, parse, report, until nothing is left anywhere
+# -----------------------------------------------------------------------
+def worker_loop(slot: int = 0) -> int:
+    """
+    Parse queued PDFs until the queue is drained. Outputs are written exactly as
+    process_all_pdfs_parallel() writes them (each file replaced whole, versions merged in
+    the version store), so a PDF parsed twice after a lost lease leaves the same result.
+    """
+    ndrrmc_parser.VERSION_DB_JOURNAL = "DELETE"     # the version store is shared between hosts too
+    queue_path = os.path.join(ndrrmc_parser.OUTPUT_FOLDER, QUEUE_DB_NAME)
+    queue = WorkQueue(queue_path)
+    me = worker_id()
+    parsed = 0
+    try:
+        while True:
+            claim = queue.claim(me)
+            if claim is None:
+                if queue.counts().get("leased"):
+                    time.sleep(POLL_SECONDS)    # others still working: their leases may yet expire
+                    continue
+                return parsed
+
+            filename, token = claim
+            event = ndrrmc_parser.Event(reportName=filename, eventName=ndrrmc_parser.clean_filename(filename))
+            started = time.perf_counter()
+            with LeaseKeeper(queue_path, filename, token) as lease:
+                try:
+                    ndrrmc_parser.process_pdf(event, f"{me}#{parsed + 1}", os.path.join(ndrrmc_parser.INPUT_FOLDER, filename))
+                except Exception as e:
+                    queue.fail(filename, token, repr(e))
+                    print(f"❌ Error processing {filename}: {e}")
+                    continue
+
+            if queue.complete(filename, token, time.perf_counter() - started):
+                parsed += 1
+                print(f"✔ Finished {filename}")
+            elif lease.lost:
+                print(f"⚠️ Lease on {filename} expired while parsing; another worker re-parsed it")
+    finally:
+        queue.close()
+
+def run_workers(processes: int = WORKERS_PER_HOST):
+    """This host's share of the work: `processes` worker loops against the shared queue."""
+    print(f"🔎 {socket.gethostname()}: {processes} workers on {os.path.join(ndrrmc_parser.OUTPUT_FOLDER, QUEUE_DB_NAME)}")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(processes) as executor:
+        parsed = sum(executor.map(worker_loop, range(processes)))
+    print(f"\n🎉 {socket.gethostname()} parsed {parsed} PDFs in {time.perf_counter() - started:.0f}s")
+
+def print_status():
+    queue = WorkQueue(os.path.join(ndrrmc_parser.OUTPUT_FOLDER, QUEUE_DB_NAME))
+    counts = queue.counts()
+    print(", ".join(f"{status}: {counts.get(status, 0)}" for status in ("queued", "leased", "done", "failed")))
+    for filename, attempts, error in queue.conn.execute(
+        "SELECT filename, attempts, error FROM jobs WHERE status = 'failed' ORDER BY filename"
+    ):
+        print(f"   ❌ {filename} ({attempts} attempts): {error}")
+    queue.close()
+
+
+# -----------------------------------------------------------------------
+# Run
+#   python work_queue.py enqueue        (once, or whenever new PDFs were downloaded)
+#   python work_queue.py worker [N]     (on every host; N processes, default one per core)
+#   python work_queue.py status
+# -----------------------------------------------------------------------
+if __name__ == "__main__":
+    pipeline_profiler.enable_from_argv()
+    command = sys.argv[1] if len(sys.argv) > 1 else "worker"
+    os.makedirs(ndrrmc_parser.OUTPUT_FOLDER, exist_ok=True)
+
+    if command == "enqueue":
+        queue = WorkQueue(os.path.join(ndrrmc_parser.OUTPUT_FOLDER, QUEUE_DB_NAME))
+        added = queue.enqueue(ndrrmc_parser.INPUT_FOLDER)
+        print(f"✔ Queued {added} new or changed PDFs from {ndrrmc_parser.INPUT_FOLDER}")
+        queue.close()
+        print_status()
+    elif command == "worker":
+        run_workers(int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS_PER_HOST)
+    elif command == "status":
+        print_status()
+    else:
+        print(f"❌ Unknown command {command!r}: use enqueue, worker or status")
+        sys.exit(1)
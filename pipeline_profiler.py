@@ -0,0 +1,214 @@
+import os
+import sys
+import glob
+import time
+import atexit
+import threading
+from datetime import datetime
+from multiprocessing import util, current_process
+from multiprocessing.process import BaseProcess
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+PROFILE_FLAG = "--profile"              # `--profile` or `--profile=<output dir>` on any entry point
+PROFILE_ROOT = "profiles"               # default output: profiles/<script>_<timestamp>/
+PROFILE_ENV = "SKG_PROFILE_DIR"         # tells worker processes where to write their samples
+SAMPLE_INTERVAL = 0.005                 # seconds between samples (wall clock, so waits show up too)
+TOP_N = 30                              # functions listed in the hot-function report
+MERGED_FILE = "profile.collapsed"       # flamegraph.pl / speedscope / inferno input
+REPORT_FILE = "profile_top.txt"
+
+
+# -----------------------------------------------------------------------
+# Sampler → a daemon thread counting the main thread's call stacks
+# -----------------------------------------------------------------------
+def frame_label(code) -> str:
+    """`function (file:line)`; library files keep their path below site-packages."""
+    path = code.co_filename
+    if "site-packages" in path:
+        path = path.split("site-packages" + os.sep, 1)[-1]
+    elif path.startswith(sys.base_prefix):
+        path = os.path.relpath(path, sys.base_prefix)
+    else:
+        path = os.path.basename(path)
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+
+class StackSampler:
+    """
+    Every SAMPLE_INTERVAL, records the main thread's stack (outermost frame first) as a tuple
+    of code objects; labels are only built when the samples are written. `root_code` cuts
+    off the frames above it, so forked workers don't carry the parent's stack at fork time.
+    """
+
+    def __init__(self, role: str, interval: float = SAMPLE_INTERVAL, root_code=None):
+        self.role = role
+        self.interval = interval
+        self.root_code = root_code
+        self.counts = {}
+        self.target = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                if frame.f_code is self.root_code:
+                    break
+                frame = frame.f_back
+            if stack:
+                key = tuple(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def collapsed(self) -> dict:
+        """Folded stacks `role;outer;...;inner` → sample count."""
+        folded = {}
+        for stack, count in list(self.counts.items()):
+            line = ";".join([self.role] + [frame_label(code) for code in stack])
+            folded[line] = folded.get(line, 0) + count
+        return folded
+
+    def dump(self, folder: str) -> str:
+        self.stop()
+        path = os.path.join(folder, f"{self.role}-{os.getpid()}.collapsed")
+        write_collapsed(self.collapsed(), path)
+        return path
+
+
+# -----------------------------------------------------------------------
+# Collapsed stack files → merge per-process samples, rank functions
+# -----------------------------------------------------------------------
+def write_collapsed(folded: dict, path: str):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for line, count in sorted(folded.items()):
+            f.write(f"{line} {count}\n")
+    os.replace(tmp_path, path)
+
+def read_collapsed(path: str) -> dict:
+    folded = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            if stack:
+                folded[stack] = folded.get(stack, 0) + int(count)
+    return folded
+
+def hot_functions(folded: dict) -> list:
+    """(function, self samples, total samples) — self: on top of the stack; total: anywhere on it."""
+    own, total = {}, {}
+    for stack, count in folded.items():
+        frames = stack.split(";")[1:]       # drop the process role
+        if not frames:
+            continue
+        own[frames[-1]] = own.get(frames[-1], 0) + count
+        for frame in set(frames):
+            total[frame] = total.get(frame, 0) + count
+    return sorted(((f, own.get(f, 0), total[f]) for f in total), key=lambda row: (-row[1], -row[2], row[0]))
+
+def merge_profiles(folder: str, top_n: int = TOP_N) -> dict:
+    """
+    Merge every process' samples in `folder` into MERGED_FILE and write REPORT_FILE, ranked
+    per role: the main process mostly waits on its workers, which would drown their hot spots.
+    """
+    merged = {}
+    processes = {}
+    for path in sorted(glob.glob(os.path.join(folder, "*-*.collapsed"))):
+        role = os.path.basename(path).split("-", 1)[0]
+        processes[role] = processes.get(role, 0) + 1
+        for stack, count in read_collapsed(path).items():
+            merged[stack] = merged.get(stack, 0) + count
+    write_collapsed(merged, os.path.join(folder, MERGED_FILE))
+
+    summary = {"samples": sum(merged.values()), "processes": processes, "roles": {}}
+    lines = [f"{summary['samples']} samples every {SAMPLE_INTERVAL * 1000:g} ms"]
+    for role, count in sorted(processes.items()):
+        folded = {stack: n for stack, n in merged.items() if stack.split(";", 1)[0] == role}
+        samples = sum(folded.values())
+        rows = hot_functions(folded)[:top_n]
+        summary["roles"][role] = {"samples": samples, "top": rows}
+
+        lines += ["", f"== {role}: {count} process(es), {samples} samples", ""]
+        lines.append(f"{'self %':>7} {'total %':>8} {'self':>8} {'total':>8}  function")
+        for function, own, total in rows:
+            lines.append(f"{100 * own / samples:>6.1f}% {100 * total / samples:>7.1f}% {own:>8} {total:>8}  {function}")
+    with open(os.path.join(folder, REPORT_FILE), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    return summary
+
+
+# -----------------------------------------------------------------------
+# Process hooks → main process from the flag, workers from the environment
+# -----------------------------------------------------------------------
+_sampler = None
+
+def _finish_main(folder: str, started: float):
+    _sampler.dump(folder)
+    summary = merge_profiles(folder)
+    print(f"\n✔ Profile: {summary['samples']} samples over {time.perf_counter() - started:.1f}s → {folder}")
+    print(f"   flamegraph input: {os.path.join(folder, MERGED_FILE)}")
+    for role, ranked in summary["roles"].items():
+        print(f"   {role} ({summary['processes'][role]} process(es)):")
+        for function, own, total in ranked["top"][:5]:
+            print(f"     {100 * own / ranked['samples']:5.1f}%  {function}")
+
+def _start_worker(_anchor=None):
+    """Start sampling a multiprocessing child; its samples are written when it exits."""
+    global _sampler
+    folder = os.environ.get(PROFILE_ENV)
+    if not folder:
+        return
+    _sampler = StackSampler("worker", root_code=BaseProcess._bootstrap.__code__).start()
+    # multiprocessing children skip atexit; finalizers with an exitpriority still run on exit
+    util.Finalize(_sampler, _sampler.dump, args=(folder,), exitpriority=100)
+
+def enable(name: str, folder: str = None) -> str:
+    """Start sampling this process and every worker it starts; results are merged at exit."""
+    global _sampler
+    folder = folder or os.path.join(PROFILE_ROOT, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    folder = os.path.abspath(folder)
+    os.makedirs(folder, exist_ok=True)
+    os.environ[PROFILE_ENV] = folder
+    _sampler = StackSampler("main").start()
+    atexit.register(_finish_main, folder, time.perf_counter())
+    print(f"✔ Profiling {name} (every {SAMPLE_INTERVAL * 1000:g} ms) → {folder}")
+    return folder
+
+def enable_from_argv(name: str = None):
+    """
+    Handle `--profile[=<dir>]` for a script: removes the flag from sys.argv (so the script's
+    own argument handling never sees it) and starts profiling. Returns the output folder or None.
+    """
+    for i, arg in enumerate(sys.argv[1:], start=1):
+        if arg == PROFILE_FLAG or arg.startswith(PROFILE_FLAG + "="):
+            del sys.argv[i]
+            name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0]
+            return enable(name, arg.partition("=")[2] or None)
+    return None
+
+# fork / forkserver children run the after-fork hooks inherited from their parent; spawned
+# children run none, so they start while importing their entry script instead
+util.register_after_fork(StackSampler, _start_worker)
+if getattr(current_process(), "_inheriting", False):
+    _start_worker()
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    # re-merge a profile folder, e.g. after the profiled run was killed before it could
+    for folder in sys.argv[1:]:
+        summary = merge_profiles(folder)
+        print(f"✔ Merged {summary['samples']} samples → {os.path.join(folder, MERGED_FILE)}")
@@ -0,0 +1,232 @@
+# Crawl manifest shared by every crawler process
+
+import time
+import sqlite3
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+MANIFEST_PATH = "crawl_manifest.db"
+STALE_CLAIM_SECONDS = 15 * 60       # a claimed page not finished by then is handed to another worker
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    source      TEXT NOT NULL,
+    year        INTEGER NOT NULL,
+    page        INTEGER NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',    -- pending / claimed / done / skipped
+    worker      TEXT,
+    claimed_at  REAL,
+    finished_at REAL,
+    PRIMARY KEY (source, year, page)
+);
+CREATE TABLE IF NOT EXISTS posts (
+    url         TEXT PRIMARY KEY,
+    source      TEXT NOT NULL,
+    year        INTEGER,
+    page        INTEGER,
+    title       TEXT,
+    post_date   TEXT,                               -- ISO date
+    file_url    TEXT,
+    filename    TEXT,
+    status      TEXT NOT NULL,                      -- saved / no_link / failed / older / missing
+    fetched_at  REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,         -- failures in a row (fail_post)
+    retry_at    REAL                                -- a failed post is not retried before this
+);
+CREATE TABLE IF NOT EXISTS throttle (
+    name        TEXT PRIMARY KEY,
+    next_at     REAL NOT NULL
+);
+"""
+
+# posts in these states are never fetched again
+FINAL_POST_STATUSES = ("saved", "no_link")
+
+# columns added after the first manifests were written: (name, definition)
+ADDED_POST_COLUMNS = [("attempts", "INTEGER NOT NULL DEFAULT 0"), ("retry_at", "REAL")]
+
+
+def normalize_url(url: str) -> str:
+    """Scheme and host lower-cased, fragment and trailing slash dropped; path and query are kept
+    (a Google Docs export is only told apart from the next one by the document id in its path)."""
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/", parts.query, ""))
+
+
+class CrawlManifest:
+    """
+    SQLite record of which listing pages and posts have been crawled. Every worker process
+    opens its own connection to the same file; claims and the shared request slot are taken
+    inside IMMEDIATE transactions, so two workers never get the same page or the same slot.
+    """
+
+    def __init__(self, path: str = MANIFEST_PATH, source: str = "dromic"):
+        self.path = path
+        self.source = source
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def close(self):
+        self.conn.close()
+
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def _migrate(self):
+        self._transaction()
+        try:
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(posts)")}
+            for name, definition in ADDED_POST_COLUMNS:
+                if name not in columns:
+                    self.conn.execute(f"ALTER TABLE posts ADD COLUMN {name} {definition}")
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    # ---------------- pages ----------------
+
+    def add_pages(self, year: int, last_page: int):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO pages (source, year, page) VALUES (?, ?, ?)",
+            [(self.source, year, page) for page in range(1, last_page + 1)],
+        )
+
+    def claim_page(self, worker: str, stale_after: float = STALE_CLAIM_SECONDS):
+        """Next (year, page) nobody is working on, newest year first; None when the crawl is done."""
+        now = time.time()
+        self._transaction()
+        try:
+            row = self.conn.execute(
+                """SELECT year, page FROM pages
+                   WHERE source = ? AND (status = 'pending' OR (status = 'claimed' AND claimed_at < ?))
+                   ORDER BY year DESC, page LIMIT 1""",
+                (self.source, now - stale_after),
+            ).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE pages SET status = 'claimed', worker = ?, claimed_at = ? WHERE source = ? AND year = ? AND page = ?",
+                    (worker, now, self.source, *row),
+                )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row
+
+    def finish_page(self, year: int, page: int, status: str = "done"):
+        self.conn.execute(
+            "UPDATE pages SET status = ?, finished_at = ? WHERE source = ? AND year = ? AND page = ?",
+            (status, time.time(), self.source, year, page),
+        )
+
+    def mark_page(self, year: int, page: int, status: str = "done"):
+        """Record a page as finished whether or not it was planned (used when importing old logs)."""
+        self.conn.execute(
+            """INSERT INTO pages (source, year, page, status, finished_at) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (source, year, page) DO UPDATE SET status = excluded.status, finished_at = excluded.finished_at""",
+            (self.source, year, page, status, time.time()),
+        )
+
+    def skip_pages_after(self, year: int, page: int):
+        """Older posts only from here on (listings are newest first): drop the year's later pages."""
+        self.conn.execute(
+            "UPDATE pages SET status = 'skipped', finished_at = ? WHERE source = ? AND year = ? AND page > ? AND status = 'pending'",
+            (time.time(), self.source, year, page),
+        )
+
+    # ---------------- posts ----------------
+
+    def has_post(self, url: str) -> bool:
+        row = self.conn.execute(
+            f"SELECT 1 FROM posts WHERE source = ? AND url = ? AND status IN ({','.join('?' * len(FINAL_POST_STATUSES))})",
+            (self.source, url, *FINAL_POST_STATUSES),
+        ).fetchone()
+        return row is not None
+
+    def saved_filename(self, file_url: str):
+        """Filename this source already saved the document at `file_url` under (None if it wasn't).
+        Matched on the whole normalized URL: basenames repeat (every Google Docs export is `export`)."""
+        row = self.conn.execute(
+            "SELECT filename FROM posts WHERE source = ? AND status = 'saved' AND file_url = ? LIMIT 1",
+            (self.source, normalize_url(file_url)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def last_post_date(self):
+        """Publication date of the newest post fetched from this source (None before the first crawl)."""
+        row = self.conn.execute(
+            "SELECT MAX(post_date) FROM posts WHERE source = ? AND status IN ('saved', 'no_link')", (self.source,)
+        ).fetchone()
+        return datetime.fromisoformat(row[0]) if row and row[0] else None
+
+    def failed_posts(self, max_attempts: int = None) -> list:
+        """
+        (url, title, post date or None) of this source's posts whose download or parse failed and
+        whose retry time has come. Posts that failed `max_attempts` times in a row are left alone.
+        """
+        rows = self.conn.execute(
+            """SELECT url, title, post_date FROM posts
+               WHERE source = ? AND status = 'failed' AND (retry_at IS NULL OR retry_at <= ?) AND attempts < ?
+               ORDER BY post_date, url""",
+            (self.source, time.time(), max_attempts if max_attempts is not None else float("inf")),
+        ).fetchall()
+        return [(url, title, datetime.fromisoformat(day) if day else None) for url, title, day in rows]
+
+    def record_post(self, url: str, status: str, year: int = None, page: int = None, title: str = None,
+                    post_date=None, file_url: str = None, filename: str = None):
+        self.conn.execute(
+            """INSERT OR REPLACE INTO posts
+               (url, source, year, page, title, post_date, file_url, filename, status, fetched_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (url, self.source, year, page, title,
+             post_date.date().isoformat() if post_date is not None else None,
+             normalize_url(file_url) if file_url else None, filename, status, time.time()),
+        )
+
+    def fail_post(self, url: str, retry_seconds: float, title: str = None, post_date=None, file_url: str = None) -> int:
+        """
+        Record a failed download or parse and count it. The post is due again after
+        `retry_seconds`, doubling with every failure in a row. Returns the number of failures in a row.
+        """
+        row = self.conn.execute("SELECT attempts FROM posts WHERE url = ? AND status = 'failed'", (url,)).fetchone()
+        attempts = row[0] + 1 if row else 1
+        self.record_post(url, "failed", title=title, post_date=post_date, file_url=file_url)
+        self.conn.execute(
+            "UPDATE posts SET attempts = ?, retry_at = ? WHERE url = ?",
+            (attempts, time.time() + retry_seconds * 2 ** (attempts - 1), url),
+        )
+        return attempts
+
+    # ---------------- shared rate limit ----------------
+
+    def throttle(self, min_interval: float, name: str = "global"):
+        """
+        Block until this process may send its next request. Slots `min_interval` seconds apart
+        are handed out across all processes sharing the manifest.
+        """
+        self._transaction()
+        try:
+            row = self.conn.execute("SELECT next_at FROM throttle WHERE name = ?", (name,)).fetchone()
+            now = time.time()
+            slot = max(now, row[0]) if row else now
+            self.conn.execute("INSERT OR REPLACE INTO throttle (name, next_at) VALUES (?, ?)", (name, slot + min_interval))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        if slot > now:
+            time.sleep(slot - now)
+
+    # ---------------- progress ----------------
+
+    def summary(self) -> dict:
+        pages = dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM pages WHERE source = ? GROUP BY status", (self.source,)
+        ).fetchall())
+        posts = dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM posts WHERE source = ? GROUP BY status", (self.source,)
+        ).fetchall())
+        return {"pages": pages, "posts": posts}
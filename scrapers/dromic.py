@@ -1,6 +1,6 @@
 # Scrape pages
 
-import os, time, requests
+import os, time
 import re
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -11,55 +11,77 @@ import sys
 from datetime import datetime
 from urllib.parse import urlparse, parse_qs, unquote
 
-# === Setup logging ===
-LOG_FILE = f"2022_p18_scraper_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s — %(levelname)s — %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout)  # also print to console
-    ]
-)
+from request_scheduler import RequestScheduler
 
-log = logging.getLogger()
+sys.path.insert(0, "..")     # repo root
+import pipeline_profiler
 
 BASE_URL = "https://dromic.dswd.gov.ph/category/situation-reports/2025/"  # starting list page
+CATEGORY_URL = "https://dromic.dswd.gov.ph/category/situation-reports/{year}/"
 DOWNLOAD_DIR = "../data/dromic/2025"
 LAST_SCRAPE_DATE = datetime(2025, 9, 24)            
 
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+log = logging.getLogger()
+driver = None
+wait = None
+scheduler = RequestScheduler()     # paces and retries every page load and download
+
+# === Setup logging ===
+def setup_logging(log_prefix: str):
+    """Log to `<log_prefix>_scraper_log_<timestamp>.txt` and to the console."""
+    log_file = f"{log_prefix}_scraper_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s — %(levelname)s — %(message)s",
+        handlers=[
+            logging.FileHandler(log_file, encoding="utf-8"),
+            logging.StreamHandler(sys.stdout)  # also print to console
+        ],
+        force=True,     # crawl workers replace the handlers inherited from the parent
+    )
+    return log_file
 
 # === Setup Selenium ===
-opts = webdriver.ChromeOptions()
-prefs = {
-    "download.default_directory": os.path.abspath(DOWNLOAD_DIR),
-    "download.prompt_for_download": False,
-    "safebrowsing.enabled": True
-}
-opts.add_experimental_option("prefs", prefs)
-# opts.add_argument("--headless=new")  # uncomment for silent run
-driver = webdriver.Chrome(options=opts)
-wait = WebDriverWait(driver, 10)
-
-driver.get(BASE_URL)
+def start_driver(download_dir: str = DOWNLOAD_DIR, headless: bool = False):
+    """Start Chrome and make it the driver the helpers below use."""
+    global driver, wait
+
+    os.makedirs(download_dir, exist_ok=True)
+
+    opts = webdriver.ChromeOptions()
+    prefs = {
+        "download.default_directory": os.path.abspath(download_dir),
+        "download.prompt_for_download": False,
+        "safebrowsing.enabled": True
+    }
+    opts.add_experimental_option("prefs", prefs)
+    if headless:
+        opts.add_argument("--headless=new")  # silent run
+    driver = webdriver.Chrome(options=opts)
+    wait = WebDriverWait(driver, 10)
+    return driver
+
+def category_url(year: int, page: int = 1) -> str:
+    """Listing page `page` of one year's situation-report category."""
+    url = CATEGORY_URL.format(year=year)
+    return url if page == 1 else f"{url}page/{page}/"
 
 # === Helpers ===
 
-def last_date_post_reached():
-    """
-    Check post date if posted after the last scrape or dataset.
-    """
-
+def current_post_date():
+    """Publication date of the post the driver is on."""
     date_el = driver.find_element(By.CSS_SELECTOR, "span.published.updated")
     date_text = date_el.text.strip()
     log.info(f"Post date text: {date_text}")
 
-    post_date = datetime.strptime(date_text, "%B %d, %Y")
+    return datetime.strptime(date_text, "%B %d, %Y")
 
-    return post_date <= LAST_SCRAPE_DATE
+def last_date_post_reached(last_scrape_date: datetime = LAST_SCRAPE_DATE):
+    """
+    Check post date if posted after the last scrape or dataset.
+    """
+    return current_post_date() <= last_scrape_date
 
 def make_direct_download_link(url: str):
     """
@@ -82,14 +104,17 @@ def make_direct_download_link(url: str):
     # Default: return as-is
     return url
 
-def download_file(url: str, filename_hint: str = None):
-    """Download a file, preserving the actual filename from the server or URL."""
+def download_file(url: str, filename_hint: str = None, download_dir: str = DOWNLOAD_DIR):
+    """
+    Download a file, preserving the actual filename from the server or URL.
+    Returns the saved filename, or None if nothing was saved.
+    """
     try:
-        r = requests.get(url, timeout=30, allow_redirects=True)
+        r = scheduler.get(url, allow_redirects=True)
 
         if r.status_code != 200:
-            log.warning(f"⚠️  Skipped (HTTP {r.status_code}): {url}")
-            return
+            log.warning(f"⚠️  Skipped (HTTP {r.status_code}) after retries: {url}")
+            return None
 
         from urllib.parse import unquote
         filename = None
@@ -130,15 +155,17 @@ def download_file(url: str, filename_hint: str = None):
             else:
                 filename += ".bin"
 
-        path = os.path.join(DOWNLOAD_DIR, filename)
+        path = os.path.join(download_dir, filename)
 
         log.info(f"⬇️  Downloading {filename}")
         with open(path, "wb") as f:
             f.write(r.content)
         log.info(f"✅ Saved as: {filename}")
+        return filename
 
     except Exception as e:
         log.error(f"❌ Error downloading {url}: {e}")
+        return None
 
 def extract_first_download_link():
     """
@@ -182,10 +209,11 @@ def handle_page():
 
         driver.execute_script("arguments[0].scrollIntoView(true); window.scrollBy(0, -150);", btn)
         time.sleep(0.5)
-        driver.execute_script("arguments[0].click();", btn)
 
         try:
-            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.post-content")))
+            with scheduler.slot(driver.current_url):
+                driver.execute_script("arguments[0].click();", btn)
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.post-content")))
 
             # Stop after last scrape date
             if last_date_post_reached():
@@ -200,9 +228,9 @@ def handle_page():
             log.error("❌ Error processing post:", e)
 
         # Go back to listing
-        driver.back()
-        wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(.,'Read More')] | //button[contains(.,'Read More')]")))
-        time.sleep(1)
+        with scheduler.slot(driver.current_url):
+            driver.back()
+            wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(.,'Read More')] | //button[contains(.,'Read More')]")))
     
     return False
 
@@ -213,25 +241,47 @@ def goto_page(page_num):
             By.XPATH, f"//ul[contains(@class,'pagination')]//li//*[normalize-space()='{page_num}']"
         )))
         driver.execute_script("arguments[0].scrollIntoView();", pagination_el)
-        pagination_el.click()
-        wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(.,'Read More')]")))
+        with scheduler.slot(driver.current_url):
+            pagination_el.click()
+            wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(.,'Read More')]")))
         return True
     except:
         return False
 
-# === MAIN LOOP ===
-page = 1
-while page < 5:
-    log.info(f"\n📄 Processing page {page}...")
-
-    stop_scraping = handle_page()
-    if stop_scraping:
-        log.info("\n ✅ Last scraped date reached — stopping further scraping.")
-        break 
+def post_links():
+    """URLs behind every 'Read More' link on the current listing page."""
+    links = driver.find_elements(By.XPATH, "//a[contains(.,'Read More')]")
+    return [href for href in (a.get_attribute("href") for a in links) if href]
+
+def last_page_number():
+    """Highest page number in the current listing's pagination (1 if there is none)."""
+    numbers = [
+        int(el.text.strip())
+        for el in driver.find_elements(By.XPATH, "//ul[contains(@class,'pagination')]//li//*")
+        if el.text.strip().isdigit()
+    ]
+    return max(numbers, default=1)
 
-    page += 1
-    if not goto_page(page):
-        log.info("\n✅ All pages processed.")
-        break
+# === MAIN LOOP ===
+if __name__ == "__main__":
+    pipeline_profiler.enable_from_argv()
+    setup_logging("2022_p18")
+    start_driver(DOWNLOAD_DIR)
+    scheduler.navigate(driver, BASE_URL)
+
+    page = 1
+    while page < 5:
+        log.info(f"\n📄 Processing page {page}...")
+
+        stop_scraping = handle_page()
+        if stop_scraping:
+            log.info("\n ✅ Last scraped date reached — stopping further scraping.")
+            break 
+
+        page += 1
+        if not goto_page(page):
+            log.info("\n✅ All pages processed.")
+            break
 
-driver.quit()
+    scheduler.log_metrics()
+    driver.quit()
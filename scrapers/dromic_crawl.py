@@ -0,0 +1,148 @@
+# Parallel multi-year DROMIC crawl
+#
+#   python dromic_crawl.py 2017 2025 [workers] [since YYYY-MM-DD]
+#
+# Discovers how many listing pages each year's category has, records every (year, page) in
+# the crawl manifest, and lets `workers` browsers claim pages until none are left. Re-running
+# the same command resumes: finished pages and saved posts are skipped.
+
+import os
+import re
+import sys
+from datetime import datetime
+from multiprocessing import Process
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+import dromic
+from dromic import log
+from crawl_manifest import CrawlManifest, MANIFEST_PATH
+
+DOWNLOAD_ROOT = "../data/dromic"            # files go to <DOWNLOAD_ROOT>/<year>
+DEFAULT_WORKERS = 4
+HEADLESS = True
+
+
+# === Discovery ===
+
+def discover_last_page(year: int) -> int:
+    """Pagination extent of one year's category, read from the links on its first page."""
+    url = dromic.category_url(year)
+    r = dromic.scheduler.get(url)
+    if r.status_code != 200:
+        log.warning(f"⚠️  Skipped {year} (HTTP {r.status_code}): {url}")
+        return 0
+
+    pages = [int(n) for n in re.findall(re.escape(url) + r"page/(\d+)/", r.text)]
+    return max(pages, default=1)
+
+def plan_crawl(manifest: CrawlManifest, years):
+    for year in years:
+        last_page = discover_last_page(year)
+        manifest.add_pages(year, last_page)
+        log.info(f"📅 {year}: {last_page} pages")
+
+
+# === Worker ===
+
+def crawl_listing(manifest: CrawlManifest, year: int, page: int, since: datetime = None) -> bool:
+    """
+    Fetch every post on the listing page the driver is on.
+    Returns True once a post at or before `since` is found (the rest of the year is older).
+    """
+    download_dir = os.path.join(DOWNLOAD_ROOT, str(year))
+    os.makedirs(download_dir, exist_ok=True)
+
+    links = dromic.post_links()
+    log.info(f"Found {len(links)} posts on this page.")
+
+    for url in links:
+        if manifest.has_post(url):
+            continue
+
+        try:
+            dromic.scheduler.navigate(
+                dromic.driver, url, ready=lambda d: dromic.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.post-content")))
+            )
+            post_date = dromic.current_post_date()
+            if since is not None and post_date <= since:
+                manifest.record_post(url, "older", year, page, post_date=post_date)
+                return True
+
+            title = dromic.driver.find_element(By.CSS_SELECTOR, "h1.post-title").text.strip()
+            file_url, file_name = dromic.extract_first_download_link()
+            if not file_url:
+                log.warning("⚠️  No downloadable link found on this post.")
+                manifest.record_post(url, "no_link", year, page, title, post_date)
+                continue
+
+            saved_as = manifest.saved_filename(file_url)
+            if saved_as is not None:
+                log.info(f"⏭️  Already saved: {file_url}")
+                manifest.record_post(url, "saved", year, page, title, post_date, file_url, saved_as)
+                continue
+
+            filename = dromic.download_file(file_url, file_name, download_dir)
+            manifest.record_post(url, "saved" if filename else "failed", year, page, title, post_date, file_url, filename)
+        except Exception as e:
+            log.error(f"❌ Error processing post {url}: {e}")
+            manifest.record_post(url, "failed", year, page)
+
+    return False
+
+def crawl_worker(worker: str, manifest_path: str = MANIFEST_PATH, since: datetime = None):
+    dromic.setup_logging(f"crawl_{worker}")
+    manifest = CrawlManifest(manifest_path)
+    dromic.scheduler.shared_throttle = manifest.throttle     # one paced slot per host across all workers
+    dromic.start_driver(DOWNLOAD_ROOT, headless=HEADLESS)
+
+    try:
+        while (claim := manifest.claim_page(worker)) is not None:
+            year, page = claim
+            log.info(f"\n📄 Processing {year} page {page}...")
+
+            try:
+                dromic.scheduler.navigate(
+                    dromic.driver, dromic.category_url(year, page),
+                    ready=lambda d: dromic.wait.until(EC.presence_of_all_elements_located((By.XPATH, "//a[contains(.,'Read More')]"))),
+                )
+            except TimeoutException:
+                # the driver still shows the previous page: leave the claim to go stale so the
+                # page is handed out again (or picked up by the next run) instead of marking it done
+                log.warning(f"⚠️  {year} page {page} did not load, leaving it for a retry.")
+                continue
+
+            reached_since = crawl_listing(manifest, year, page, since)
+            manifest.finish_page(year, page)
+            if reached_since:
+                log.info(f"\n ✅ Last scraped date reached — skipping the rest of {year}.")
+                manifest.skip_pages_after(year, page)
+    finally:
+        dromic.scheduler.log_metrics()
+        dromic.driver.quit()
+        manifest.close()
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    first_year, last_year = int(sys.argv[1]), int(sys.argv[2])
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WORKERS
+    since = datetime.strptime(sys.argv[4], "%Y-%m-%d") if len(sys.argv) > 4 else None
+
+    dromic.setup_logging(f"{first_year}_{last_year}_crawl")
+    manifest = CrawlManifest()
+    dromic.scheduler.shared_throttle = manifest.throttle
+    plan_crawl(manifest, range(last_year, first_year - 1, -1))
+    manifest.close()
+
+    processes = [Process(target=crawl_worker, args=(f"w{i}", MANIFEST_PATH, since)) for i in range(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    manifest = CrawlManifest()
+    log.info(f"\n✅ Crawl finished: {manifest.summary()}")
+    manifest.close()
@@ -0,0 +1,184 @@
+# Import old scraper logs into the crawl manifest
+#
+#   python log_importer.py [log_dir] [download_root]
+#
+# Reads every *scraper_log_*.txt that dromic.py / dromic_crawl.py wrote, rebuilds which
+# listing pages were finished and which documents were saved, and checks each saved file
+# against <download_root>/<year>/. Files the log claims but that are not on disk are recorded
+# as "missing", and their pages are left for the next crawl to fetch again.
+
+import os
+import re
+import sys
+import glob
+from datetime import datetime
+
+from crawl_manifest import CrawlManifest, MANIFEST_PATH
+
+LOG_DIR = ".."
+LOG_GLOB = "*scraper_log_*.txt"
+DOWNLOAD_ROOT = "../data/dromic"
+
+LINE_START = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),\d+ — (\w+) — (.*)$")
+LOG_YEAR = re.compile(r"^(\d{4})_")                 # 2018_p1_4_scraper_log_... → 2018
+
+PAGE = re.compile(r"📄 Processing (?:(\d{4}) )?page (\d+)")
+POST_DATE = re.compile(r"^Post date text: (.+)$")
+EXTRACTED = re.compile(r"^🔍 Extracted direct file URL: (.+)$")
+DOWNLOADING = re.compile(r"^⬇️\s+Downloading (.+)$")
+SAVED = re.compile(r"^✅ Saved(?: as)?: (.+)$")
+SKIPPED = re.compile(r"^⚠️\s+Skipped \(([^)]*)\)(?: after retries)?: (.+)$")
+DOWNLOAD_ERROR = re.compile(r"^❌ Error downloading (\S+): (.*)$")
+NO_LINK = re.compile(r"^⚠️\s+No downloadable link found")
+ALREADY_SAVED = re.compile(r"^⏭️\s+Already saved: (.+)$")
+STOPPED = re.compile(r"Last scraped date reached|All pages processed")
+FOUND = re.compile(r"^Found \d+ posts on this page")
+
+# INFO messages that are neither a post title nor one of the patterns above
+OTHER_MESSAGES = (FOUND, re.compile(r"^[📄📅📊🔁✅⚠️❌⏭️🔍⬇️]"))
+
+
+def read_messages(path: str):
+    """(line number, timestamp, level, message) per log record; continuation lines are folded in."""
+    records = []
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            match = LINE_START.match(line)
+            if match:
+                records.append([number, match.group(1), match.group(2), match.group(3)])
+            elif records:
+                records[-1][3] = (records[-1][3] + "\n" + line).strip()
+    return records
+
+def parse_log(path: str):
+    """
+    Returns (started, pages, posts):
+        started → time of the first log record
+        pages → list of (year, page, finished)
+        posts → list of dicts with year, page, title, post_date, file_url, filename, status, line
+    A page counts as finished once the log moves to the next page or stops cleanly.
+    """
+    name = os.path.basename(path)
+    match = LOG_YEAR.match(name)
+    log_year = int(match.group(1)) if match else None
+
+    records = read_messages(path)
+    started = datetime.strptime(records[0][1], "%Y-%m-%d %H:%M:%S") if records else None
+
+    pages, posts = [], []
+    year, page = log_year, None
+    context = {}
+
+    def finish(status, line, **fields):
+        posts.append({"year": year, "page": page, "status": status, "line": line, **context, **fields})
+        context.clear()
+
+    for number, _, level, message in records:
+        if (m := PAGE.search(message)):
+            if page is not None:
+                pages.append((year, page, True))
+            year = int(m.group(1)) if m.group(1) else log_year
+            page = int(m.group(2))
+            context.clear()
+        elif STOPPED.search(message):
+            if page is not None:
+                pages.append((year, page, True))
+            page = None
+        elif (m := POST_DATE.match(message)):
+            context = {"post_date": m.group(1).strip()}
+        elif (m := EXTRACTED.match(message)):
+            context["file_url"] = m.group(1).strip()
+        elif (m := DOWNLOADING.match(message)):
+            context["filename"] = m.group(1).strip()
+        elif (m := SAVED.match(message)):
+            finish("saved", number, filename=m.group(1).strip())
+        elif (m := ALREADY_SAVED.match(message)):
+            finish("saved", number, file_url=m.group(1).strip())
+        elif (m := SKIPPED.match(message)):
+            finish("failed", number, file_url=m.group(2).strip())
+        elif (m := DOWNLOAD_ERROR.match(message)):
+            finish("failed", number, file_url=m.group(1))
+        elif NO_LINK.match(message):
+            finish("no_link", number)
+        elif level == "INFO" and not any(p.match(message) for p in OTHER_MESSAGES):
+            context["title"] = message.strip()
+
+    if page is not None:
+        pages.append((year, page, False))      # interrupted mid-page
+    return started, pages, posts
+
+def index_downloads(download_root: str) -> dict:
+    """filename → list of paths under download_root (files are usually in a per-year folder)."""
+    index = {}
+    for folder, _, files in os.walk(download_root):
+        for filename in files:
+            index.setdefault(filename, []).append(os.path.join(folder, filename))
+    return index
+
+def find_download(index: dict, download_root: str, year, filename: str):
+    if not filename:
+        return None
+    paths = index.get(filename, [])
+    year_dir = os.path.join(download_root, str(year))
+    for path in paths:
+        if os.path.dirname(path) == year_dir:
+            return path
+    return paths[0] if paths else None
+
+def parse_post_date(text: str):
+    try:
+        return datetime.strptime(text, "%B %d, %Y")
+    except (TypeError, ValueError):
+        return None
+
+def import_logs(log_paths, manifest: CrawlManifest, download_root: str = DOWNLOAD_ROOT) -> dict:
+    index = index_downloads(download_root)
+    totals = {"logs": 0, "pages": 0, "saved": 0, "missing": 0, "failed": 0, "no_link": 0}
+
+    for path in log_paths:
+        started, pages, posts = parse_log(path)
+        name = os.path.basename(path)
+        totals["logs"] += 1
+
+        incomplete = set()      # pages with a document to fetch again
+        for post in posts:
+            status = post["status"]
+            filename = post.get("filename")
+            if status == "saved" and post.get("file_url") and not filename:
+                filename = os.path.basename(post["file_url"].split("?")[0])
+            if status == "saved" and find_download(index, download_root, post["year"], filename) is None:
+                status = "missing"
+
+            manifest.record_post(
+                f"log://{name}#L{post['line']}", status, post["year"], post["page"], post.get("title"),
+                parse_post_date(post.get("post_date")), post.get("file_url"), filename,
+            )
+            totals[status] += 1
+            if status in ("missing", "failed"):
+                incomplete.add((post["year"], post["page"]))
+
+        for year, page, finished in pages:
+            # a year still being published shifts its pages as new posts arrive; only
+            # closed years keep their page numbers
+            closed = year is not None and started is not None and year < started.year
+            if finished and closed and (year, page) not in incomplete:
+                manifest.mark_page(year, page)
+                totals["pages"] += 1
+
+    return totals
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else LOG_DIR
+    download_root = sys.argv[2] if len(sys.argv) > 2 else DOWNLOAD_ROOT
+
+    log_paths = sorted(glob.glob(os.path.join(log_dir, LOG_GLOB)))
+    manifest = CrawlManifest(MANIFEST_PATH)
+    totals = import_logs(log_paths, manifest, download_root)
+    manifest.close()
+
+    print(f"✔ Imported {totals['logs']} logs → {MANIFEST_PATH}")
+    print(f"   {totals['pages']} finished pages, {totals['saved']} files on disk, {totals['missing']} missing, "
+          f"{totals['failed']} failed downloads, {totals['no_link']} posts without a document")
@@ -0,0 +1,213 @@
+# Incremental NDRRMC situation-report crawler feeding the parser
+#
+#   python ndrrmc.py            → fetch reports published since the last crawl, then exit
+#   python ndrrmc.py watch      → keep polling every POLL_MINUTES
+#
+# Reports are listed newest first. Crawling stops at the first report already in the crawl
+# manifest (or older than the newest one seen), like last_date_post_reached() in dromic.py.
+# Each new PDF is handed to the parser's process_pdf() as soon as it is saved. Reports whose
+# download or parse failed are recorded as such and retried on later crawls, backing off after
+# each failure and giving up after MAX_ATTEMPTS.
+
+import os
+import sys
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from selenium.webdriver.common.by import By
+
+import dromic
+from dromic import log
+from crawl_manifest import CrawlManifest, MANIFEST_PATH
+
+PARSERS_DIR = "../parsers"
+sys.path.insert(0, PARSERS_DIR)
+import NDRRMC_cleaned_table_names_output_directory_parallel as ndrrmc_parser
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+LIST_URL = "https://ndrrmc.gov.ph/index.php/situational-reports.html"      # newest reports first
+DOWNLOAD_DIR = os.path.join(PARSERS_DIR, ndrrmc_parser.INPUT_FOLDER)       # where the parser reads PDFs
+PARSED_DIR = os.path.join(PARSERS_DIR, ndrrmc_parser.OUTPUT_FOLDER)
+LAST_SCRAPE_DATE = datetime(2025, 9, 24)      # first run only; afterwards the manifest knows
+POLL_MINUTES = 10
+MAX_PAGES = 20
+PARSER_WORKERS = 4
+RETRY_MINUTES = 10          # a failed report is retried after this long, doubling per failure
+MAX_ATTEMPTS = 5            # then it is left alone
+
+# listing / report page structure
+REPORT_ROW = "table.category tbody tr, div.items-row, div.item"
+REPORT_LINK = "a[href]"
+REPORT_DATE = "td.list-date, time, .published, .create"
+NEXT_PAGE = "//a[contains(@class,'next') or normalize-space()='Next' or @title='Next']"
+PDF_LINKS = ["a[href$='.pdf']", "a[href*='.pdf?']", "iframe[src*='.pdf']", "embed[src*='.pdf']", "object[data*='.pdf']"]
+
+DATE_FORMATS = ["%B %d, %Y", "%d %B %Y", "%b %d, %Y", "%Y-%m-%d", "%d-%m-%Y", "%A, %d %B %Y"]
+
+
+# === Helpers ===
+
+def parse_date(text: str):
+    text = " ".join(text.replace("Published:", "").replace("Created:", "").split())
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+def list_reports():
+    """(title, url, published date or None) for every report on the current listing page."""
+    reports = []
+    for row in dromic.driver.find_elements(By.CSS_SELECTOR, REPORT_ROW):
+        links = row.find_elements(By.CSS_SELECTOR, REPORT_LINK)
+        if not links:
+            continue
+        dates = row.find_elements(By.CSS_SELECTOR, REPORT_DATE)
+        published = parse_date(dates[0].text) if dates else None
+        reports.append((links[0].text.strip(), links[0].get_attribute("href"), published))
+    return reports
+
+def report_pdf_link(url: str):
+    """The PDF behind a report: the link itself, or the first PDF linked/embedded on its page."""
+    if url.lower().split("?")[0].endswith(".pdf"):
+        return url
+
+    dromic.scheduler.navigate(dromic.driver, url)
+    for sel in PDF_LINKS:
+        for elem in dromic.driver.find_elements(By.CSS_SELECTOR, sel):
+            href = elem.get_attribute("href") or elem.get_attribute("src") or elem.get_attribute("data")
+            if href:
+                return dromic.make_direct_download_link(href)
+    return None
+
+def last_report_reached(manifest: CrawlManifest, url: str, published, last_seen: datetime) -> bool:
+    """
+    Stop at the first report that was already crawled, or that is older than the newest
+    report the previous crawl saw.
+    """
+    if manifest.has_post(url):
+        return True
+    return published is not None and published < last_seen
+
+def set_output_folder(output_folder: str):
+    # pool initializer: the parser writes relative to its own folder, not ours
+    ndrrmc_parser.OUTPUT_FOLDER = output_folder
+
+def record_failure(manifest: CrawlManifest, url: str, title: str, published, file_url: str = None):
+    attempts = manifest.fail_post(url, RETRY_MINUTES * 60, title=title, post_date=published, file_url=file_url)
+    if attempts >= MAX_ATTEMPTS:
+        log.error(f"❌ {title} failed {attempts} times; not retrying it.")
+
+def record_parse_failure(url: str, title: str, published):
+    # runs on the executor's callback thread, so it needs its own connection
+    manifest = CrawlManifest(MANIFEST_PATH, source="ndrrmc")
+    try:
+        record_failure(manifest, url, title, published)
+    finally:
+        manifest.close()
+
+def enqueue_report(executor, counter: int, filename: str, report_url: str, url: str, title: str, published):
+    event = ndrrmc_parser.Event(
+        reportName=filename,
+        eventName=ndrrmc_parser.clean_filename(filename),
+        obtainedDate=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        reportLink=report_url,
+    )
+    future = executor.submit(ndrrmc_parser.process_pdf, event, counter, os.path.join(DOWNLOAD_DIR, filename))
+
+    def done(f):
+        if f.exception() is not None:
+            log.error(f"❌ Error processing {filename}: {f.exception()}")
+            record_parse_failure(url, title, published)
+        else:
+            log.info(f"✔ Parsed {filename} → {os.path.join(PARSED_DIR, event.eventName)}")
+    future.add_done_callback(done)
+    return future
+
+
+# === Crawl ===
+
+def crawl_new_reports(manifest: CrawlManifest, executor) -> int:
+    """Fetch every report newer than the last crawl and enqueue it for parsing. Returns how many."""
+    last_seen = manifest.last_post_date() or LAST_SCRAPE_DATE
+    log.info(f"\n🔎 Checking for NDRRMC reports since {last_seen:%B %d, %Y}...")
+
+    dromic.scheduler.navigate(dromic.driver, LIST_URL)
+    new_reports = []
+    for page in range(1, MAX_PAGES + 1):
+        reports = list_reports()
+        log.info(f"Found {len(reports)} reports on page {page}.")
+
+        reached = False
+        for title, url, published in reports:
+            if last_report_reached(manifest, url, published, last_seen):
+                reached = True
+                break
+            new_reports.append((title, url, published))
+        if reached or not reports:
+            break
+
+        next_links = dromic.driver.find_elements(By.XPATH, NEXT_PAGE)
+        if not next_links:
+            break
+        dromic.scheduler.navigate(dromic.driver, next_links[0].get_attribute("href"))
+
+    # earlier failures sit below where the listing stopped; retry them alongside the new reports
+    listed = {url for _, url, _ in new_reports}
+    retries = [(title, url, published) for url, title, published in manifest.failed_posts(MAX_ATTEMPTS) if url not in listed]
+    if retries:
+        log.info(f"🔁 Retrying {len(retries)} reports that failed before.")
+
+    # oldest first, so the parser output follows publication order
+    fetched = 0
+    for title, url, published in retries + list(reversed(new_reports)):
+        log.info(f"{title}")
+        try:
+            pdf_url = report_pdf_link(url)
+            if not pdf_url:
+                log.warning("⚠️  No downloadable link found on this report.")
+                manifest.record_post(url, "no_link", title=title, post_date=published)
+                continue
+
+            filename = dromic.download_file(pdf_url, title, DOWNLOAD_DIR)
+            if not filename:
+                record_failure(manifest, url, title, published, file_url=pdf_url)
+                continue
+
+            manifest.record_post(url, "saved", title=title, post_date=published, file_url=pdf_url, filename=filename)
+            if filename.lower().endswith(".pdf"):
+                fetched += 1
+                enqueue_report(executor, fetched, filename, pdf_url, url, title, published)
+        except Exception as e:
+            log.error(f"❌ Error processing report {url}: {e}")
+            record_failure(manifest, url, title, published)
+
+    log.info(f"✅ {fetched} new reports queued for parsing.")
+    return fetched
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    watch = len(sys.argv) > 1 and sys.argv[1] == "watch"
+
+    dromic.setup_logging("ndrrmc")
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    dromic.start_driver(DOWNLOAD_DIR, headless=True)
+    manifest = CrawlManifest(MANIFEST_PATH, source="ndrrmc")
+
+    try:
+        with ProcessPoolExecutor(PARSER_WORKERS, initializer=set_output_folder, initargs=(PARSED_DIR,)) as executor:
+            while True:
+                crawl_new_reports(manifest, executor)
+                if not watch:
+                    break
+                time.sleep(POLL_MINUTES * 60)
+    finally:
+        dromic.scheduler.log_metrics()
+        dromic.driver.quit()
+        manifest.close()
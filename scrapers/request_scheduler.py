@@ -0,0 +1,252 @@
+# Shared request scheduler: per-host token bucket, AIMD concurrency, jittered retry
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+log = logging.getLogger()
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+INITIAL_RATE = 1.0          # requests per second per host
+MIN_RATE = 0.1
+MAX_RATE = 8.0
+RATE_STEP = 0.1             # additive increase after a clean round of requests
+BURST = 4                   # token bucket capacity
+MAX_CONCURRENCY = 8
+TARGET_LATENCY = 10.0       # seconds; slower responses count as congestion
+TIMEOUT = (10, 60)          # (connect, read) seconds
+
+MAX_RETRIES = 5
+BASE_DELAY = 1.0            # first retry waits up to this long, doubling per attempt
+MAX_DELAY = 120.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}      # retried, and treated as congestion
+LATENCY_WINDOW = 200        # latencies kept per host for the percentiles
+
+
+class HostLimiter:
+    """Token bucket plus an AIMD-controlled concurrency limit for one host."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self.rate = INITIAL_RATE
+        self.tokens = float(BURST)
+        self.updated = time.monotonic()
+        self.concurrency = 1
+        self.in_flight = 0
+        self.clean_streak = 0
+        self.blocked_until = 0.0        # set from Retry-After; pauses every request to the host
+        self.cond = threading.Condition()
+
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counts = {"requests": 0, "ok": 0, "retries": 0, "throttled": 0, "server_errors": 0, "failures": 0}
+
+    def _refill(self, now: float):
+        self.tokens = min(BURST, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                elif self.in_flight >= self.concurrency:
+                    delay = None            # woken by release()
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.in_flight += 1
+                    self.counts["requests"] += 1
+                    return
+                else:
+                    delay = (1 - self.tokens) / self.rate
+                self.cond.wait(delay)
+
+    def release(self, latency: float, congested: bool):
+        with self.cond:
+            self.in_flight -= 1
+            self.latencies.append(latency)
+
+            if congested or latency > TARGET_LATENCY:
+                # multiplicative decrease
+                self.concurrency = max(1, self.concurrency // 2)
+                self.rate = max(MIN_RATE, self.rate / 2)
+                self.clean_streak = 0
+            else:
+                # additive increase, once per "window" of clean requests
+                self.clean_streak += 1
+                if self.clean_streak >= self.concurrency:
+                    self.concurrency = min(MAX_CONCURRENCY, self.concurrency + 1)
+                    self.rate = min(MAX_RATE, self.rate + RATE_STEP)
+                    self.clean_streak = 0
+            self.cond.notify_all()
+
+    def block_for(self, seconds: float):
+        with self.cond:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def metrics(self) -> dict:
+        with self.cond:
+            latencies = sorted(self.latencies)
+            pick = lambda q: round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 3) if latencies else None
+            return {
+                **self.counts,
+                "rate": round(self.rate, 2),
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "latency_p50": pick(0.5),
+                "latency_p95": pick(0.95),
+            }
+
+
+def retry_after_seconds(response) -> float:
+    """Retry-After header as seconds (it may be a number or an HTTP date); None if absent."""
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(MAX_DELAY, BASE_DELAY * 2 ** attempt))
+
+
+class RequestScheduler:
+    """
+    Paces every outgoing request per host. Each host has a token bucket whose rate, together
+    with the number of requests allowed in flight, grows additively while responses are fast
+    and clean and halves on 429/5xx, timeouts or slow responses. Failed requests are retried
+    with jittered exponential backoff, honouring Retry-After.
+
+    `shared_throttle(min_interval, name)`, when set, is a limiter shared with other processes
+    (CrawlManifest.throttle): every request also waits for a slot there, spaced by this
+    process' current rate for the host, so parallel workers together keep to that rate.
+    """
+
+    def __init__(self, session: requests.Session = None, max_retries: int = MAX_RETRIES, shared_throttle=None):
+        self.session = session or requests.Session()
+        self.max_retries = max_retries
+        self.shared_throttle = shared_throttle
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def limiter(self, url: str) -> HostLimiter:
+        host = urlparse(url).netloc
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = HostLimiter(host)
+            return self.hosts[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Hold one paced request slot for `url`'s host. The body reports the HTTP status in
+        `outcome["status"]`; RETRY_STATUSES and exceptions count as congestion.
+        """
+        limiter = self.limiter(url)
+        limiter.acquire()
+        if self.shared_throttle is not None:
+            self.shared_throttle(1 / limiter.rate, limiter.host)
+        outcome = {"status": None}
+        start = time.monotonic()
+        try:
+            yield outcome
+        except Exception:
+            limiter.release(time.monotonic() - start, congested=True)
+            raise
+        limiter.release(time.monotonic() - start, congested=outcome["status"] in RETRY_STATUSES)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying connection errors, timeouts and RETRY_STATUSES.
+        Returns the last response (possibly non-200) or raises the last exception.
+        """
+        kwargs.setdefault("timeout", TIMEOUT)
+        limiter = self.limiter(url)
+
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            try:
+                with self.slot(url) as outcome:
+                    response = self.session.request(method, url, **kwargs)
+                    outcome["status"] = response.status_code
+            except requests.RequestException as e:
+                error = e
+
+            if error is None and response.status_code not in RETRY_STATUSES:
+                limiter.counts["ok" if response.ok else "failures"] += 1
+                return response
+
+            if response is not None:
+                limiter.counts["throttled" if response.status_code == 429 else "server_errors"] += 1
+            if attempt == self.max_retries:
+                limiter.counts["failures"] += 1
+                if error is not None:
+                    raise error
+                return response
+
+            wait = backoff_delay(attempt)
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                limiter.block_for(retry_after)
+                wait = max(wait, retry_after)
+
+            limiter.counts["retries"] += 1
+            reason = error or f"HTTP {response.status_code}"
+            log.warning(f"🔁 Retry {attempt + 1}/{self.max_retries} in {wait:.1f}s ({reason}): {url}")
+            time.sleep(wait)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def navigate(self, driver, url: str, ready=None):
+        """
+        driver.get(url) in a paced slot; driver and network errors are retried like `request`.
+        `ready(driver)` (e.g. a WebDriverWait condition) then runs once, outside the slot: a
+        page that loaded without the expected elements (an empty listing) raises to the
+        caller instead of being retried as congestion.
+        """
+        limiter = self.limiter(url)
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.slot(url):
+                    driver.get(url)
+                limiter.counts["ok"] += 1
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    limiter.counts["failures"] += 1
+                    raise
+                wait = backoff_delay(attempt)
+                limiter.counts["retries"] += 1
+                log.warning(f"🔁 Retry {attempt + 1}/{self.max_retries} in {wait:.1f}s ({type(e).__name__}): {url}")
+                time.sleep(wait)
+        if ready is not None:
+            ready(driver)
+
+    def metrics(self) -> dict:
+        with self.lock:
+            hosts = list(self.hosts.values())
+        return {limiter.host: limiter.metrics() for limiter in hosts}
+
+    def log_metrics(self):
+        for host, stats in self.metrics().items():
+            log.info(f"📊 {host}: {stats}")
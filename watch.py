@@ -0,0 +1,225 @@
+import os
+import sys
+import json
+import time
+import signal
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# --------------------------
+# CONFIGURATION
+# --------------------------
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSERS_DIR = os.path.join(ROOT_DIR, "parsers")
+MAPPERS_DIR = os.path.join(ROOT_DIR, "mappers")
+STATE_PATH = "watch_state.json"     # watched file → size:mtime it was last processed at
+POLL_SECONDS = 2                    # a file is picked up once it looks the same on two consecutive polls
+PARSER_WORKERS = 4
+RETRY_SECONDS = 30                  # a failed file is retried after this long, doubling per failure
+MAX_ATTEMPTS = 5                    # then it is left alone until it changes again
+
+sys.path.insert(0, PARSERS_DIR)
+sys.path.insert(0, MAPPERS_DIR)
+import pipeline_profiler
+import NDRRMC_cleaned_table_names_output_directory_parallel as ndrrmc_parser
+import geog_archive_mapper
+from psgc_gazetteer import load_gazetteer
+from event_store import EventStore, load_gda, load_ndrrmc, load_ndrrmc_event, GDA_PATH, NDRRMC_OUTPUT_FOLDER, STORE_PATH
+from rollup_cube import RollupCube, CUBE_PATH
+
+NDRRMC_PDF_DIR = os.path.normpath(os.path.join(PARSERS_DIR, ndrrmc_parser.INPUT_FOLDER))
+GDA_WORKBOOK = os.path.normpath(os.path.join(MAPPERS_DIR, geog_archive_mapper.WORKBOOK_PATH))
+
+
+# -----------------------------------------------------------------------
+# Warm workers → libraries, gazetteer and event store loaded once per process
+# -----------------------------------------------------------------------
+_warm = {}
+
+def warm_parser():
+    # pool initializer: the parser resolves INPUT_FOLDER / OUTPUT_FOLDER from its own folder
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl+C stops the watcher, which shuts the pools down
+    os.chdir(PARSERS_DIR)
+
+def parse_pdf(filename: str) -> float:
+    started = time.perf_counter()
+    _warm["parsed"] = _warm.get("parsed", 0) + 1
+    event = ndrrmc_parser.Event(reportName=filename, eventName=ndrrmc_parser.clean_filename(filename))
+    ndrrmc_parser.process_pdf(event, _warm["parsed"], os.path.join(ndrrmc_parser.INPUT_FOLDER, filename))
+    return time.perf_counter() - started
+
+def warm_mappers():
+    # pool initializer (one process, so mapper outputs are written by one writer in order)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    os.chdir(MAPPERS_DIR)
+    _warm["gazetteer"] = load_gazetteer()
+
+    # every source on disk once, as event_store.py builds it; afterwards only what changed
+    _warm["store"] = EventStore()
+    if os.path.exists(GDA_PATH):
+        load_gda(_warm["store"], GDA_PATH, _warm["gazetteer"])
+    if os.path.isdir(NDRRMC_OUTPUT_FOLDER):
+        load_ndrrmc(_warm["store"], NDRRMC_OUTPUT_FOLDER, _warm["gazetteer"])
+    _warm["cube"] = RollupCube.load(CUBE_PATH) if os.path.exists(CUBE_PATH) else RollupCube()
+
+def map_gda() -> float:
+    started = time.perf_counter()
+    geog_archive_mapper.map_archive()
+    return time.perf_counter() - started
+
+def refresh_events(event_names, reload_gda: bool) -> float:
+    """
+    Replace the warm store's events of the NDRRMC folders just parsed (and of gda.csv when it
+    was re-mapped), then fold the changes into the rollup cube.
+    """
+    started = time.perf_counter()
+    store = _warm["store"]
+    ndrrmc, gda = store.sources.codes.get("NDRRMC"), store.sources.codes.get("GDA")
+    store.remove_events([
+        i for i, (source, name) in enumerate(zip(store.source, store.names))
+        if (source == ndrrmc and name in event_names) or (reload_gda and source == gda)
+    ])
+
+    if reload_gda and os.path.exists(GDA_PATH):
+        load_gda(store, GDA_PATH, _warm["gazetteer"])
+    for name in sorted(event_names):
+        event_dir = os.path.join(NDRRMC_OUTPUT_FOLDER, name)
+        if os.path.exists(os.path.join(event_dir, "metadata.json")):
+            load_ndrrmc_event(store, event_dir, _warm["gazetteer"])
+    store.save(STORE_PATH)
+
+    added = _warm["cube"].update(store)
+    _warm["cube"].save(CUBE_PATH)
+    print(f"✔ Event store: {len(store)} events, rollup cube +{added}")
+    return time.perf_counter() - started
+
+
+# -----------------------------------------------------------------------
+# Polling → what changed since it was last processed
+# -----------------------------------------------------------------------
+def file_stamp(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+def scan() -> dict:
+    """Stamp of every watched file: NDRRMC PDFs and the Geog Archive workbook."""
+    stamps = {}
+    if os.path.isdir(NDRRMC_PDF_DIR):
+        for entry in os.scandir(NDRRMC_PDF_DIR):
+            if entry.name.lower().endswith(".pdf"):
+                stamps[entry.path] = file_stamp(entry.path)
+    stamps[GDA_WORKBOOK] = file_stamp(GDA_WORKBOOK)
+    return {path: stamp for path, stamp in stamps.items() if stamp is not None}
+
+def load_state(path: str = STATE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state: dict, path: str = STATE_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+# -----------------------------------------------------------------------
+# Daemon
+# -----------------------------------------------------------------------
+def watch(backfill: bool = False):
+    state = load_state()
+    if state is None:
+        state = {} if backfill else scan()
+        if not backfill:
+            print(f"⚠️ First run: {len(state)} existing files taken as processed (use --backfill to process them)")
+        save_state(state)
+
+    previous = {}
+    running = {}            # future → (kind, paths and stamps it covers, NDRRMC events it refreshes)
+    failures = {}           # path or job kind → (failed attempts, time of the next try, stamp that failed)
+    pending_events = set()  # NDRRMC event folders parsed since the event store was last refreshed
+    reload_gda = False      # gda.csv re-mapped since then
+
+    def backing_off(key, stamp=None) -> bool:
+        attempts, retry_at, failed_stamp = failures.get(key, (0, 0.0, None))
+        return failed_stamp == stamp and time.time() < retry_at
+
+    def record_failure(key, stamp=None) -> int:
+        attempts = failures[key][0] + 1 if key in failures and failures[key][2] == stamp else 1
+        delay = RETRY_SECONDS * 2 ** (min(attempts, MAX_ATTEMPTS) - 1)
+        failures[key] = (attempts, time.time() + delay, stamp)
+        return attempts
+
+    def kind_running(*kinds) -> bool:
+        return any(kind in kinds for kind, _, _ in running.values())
+
+    print(f"👀 Watching {NDRRMC_PDF_DIR}, {GDA_WORKBOOK}")
+    with ProcessPoolExecutor(PARSER_WORKERS, initializer=warm_parser) as parsers, \
+            ProcessPoolExecutor(1, initializer=warm_mappers) as mappers:
+        while True:
+            current = scan()
+            busy = {path for _, covered, _ in running.values() for path in covered}
+            ready = {
+                path: stamp for path, stamp in current.items()
+                if stamp == previous.get(path) and stamp != state.get(path) and path not in busy
+                and not backing_off(path, stamp)
+            }
+            previous = current
+
+            for path, stamp in ready.items():
+                if path.startswith(NDRRMC_PDF_DIR + os.sep):
+                    running[parsers.submit(parse_pdf, os.path.basename(path))] = ("parse", {path: stamp}, set())
+            if GDA_WORKBOOK in ready:
+                running[mappers.submit(map_gda)] = ("gda", {GDA_WORKBOOK: ready[GDA_WORKBOOK]}, set())
+
+            if (pending_events or reload_gda) and not kind_running("events", "gda") and not backing_off("events"):
+                running[mappers.submit(refresh_events, pending_events, reload_gda)] = ("events", {}, pending_events)
+                pending_events, reload_gda = set(), False
+
+            if not running:
+                time.sleep(POLL_SECONDS)
+                continue
+            done, _ = wait(running, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                kind, covered, events = running.pop(future)
+                name = ", ".join(os.path.basename(path) for path in covered) or kind
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    # left out of the state, so the next polls retry it (backing off) unless it keeps failing
+                    if kind == "events":
+                        record_failure(kind)
+                        pending_events |= events
+                    for path, stamp in covered.items():
+                        if record_failure(path, stamp) >= MAX_ATTEMPTS:
+                            state[path] = stamp
+                            print(f"❌ {kind}: {os.path.basename(path)} failed {MAX_ATTEMPTS} times; skipped until it changes: {e}")
+                        else:
+                            print(f"⚠️ {kind}: {os.path.basename(path)} failed, retrying in {failures[path][1] - time.time():.0f}s: {e}")
+                    if not covered:
+                        print(f"⚠️ {kind} failed, retrying in {failures[kind][1] - time.time():.0f}s: {e}")
+                    continue
+
+                print(f"✔ {kind}: {name} in {seconds:.2f}s")
+                for key in [kind, *covered]:
+                    failures.pop(key, None)
+                state.update(covered)
+                if kind == "parse":
+                    pending_events.update(ndrrmc_parser.clean_filename(os.path.basename(path)) for path in covered)
+                elif kind == "gda":
+                    reload_gda = True
+            if done:
+                save_state(state)
+
+
+# === MAIN ===
+if __name__ == "__main__":
+    pipeline_profiler.enable_from_argv()
+    try:
+        watch(backfill="--backfill" in sys.argv[1:])
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")